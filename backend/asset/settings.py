@@ -169,3 +169,65 @@ AUTH_LDAP_USER_ATTR_MAP = {
     "last_name": "sn",
     "email": "mail"
 }
+
+# 后台导出任务配置
+EXPORT_JOB_DIR = BASE_DIR / 'exports'  # 导出文件存放目录
+EXPORT_JOB_TTL = 24 * 60 * 60  # 导出文件保留时间（秒）
+EXPORT_WORKER_POLL_INTERVAL = 2  # worker轮询间隔（秒）
+JOB_STALE_TIMEOUT = 6 * 60 * 60  # 导入、导出任务开始执行超过该时间（秒）仍未结束时，视为worker已中断
+
+# 导出结果缓存配置
+EXPORT_CACHE_DIR = BASE_DIR / 'exports' / 'cache'  # 缓存文件目录
+EXPORT_CACHE_MAX_BYTES = 1024 * 1024 * 1024  # 缓存目录总大小上限（字节），超出后按LRU淘汰
+
+# 超大导出拆分配置
+EXPORT_ZIP_THRESHOLD_ROWS = 2 * 1048575  # xlsx导出超过该行数时拆分为多个工作簿打包为zip
+EXPORT_ROWS_PER_FILE = 1048575  # zip中每个工作簿的最大行数
+EXPORT_PARALLEL_WORKERS = 4  # 并行生成工作簿的进程数
+
+# 列表总数缓存配置
+COUNT_CACHE_TIMEOUT = 10 * 60  # 总数缓存时间（秒），表有写入时通过版本号自动失效
+COUNT_ESTIMATE_MIN_ROWS = 100000  # ?count=estimate 时表行数达到该值才抽样估算，否则精确计数
+COUNT_SAMPLE_WINDOWS = 20  # 抽样区间个数
+COUNT_SAMPLE_WINDOW_SIZE = 1000  # 每个抽样区间覆盖的id数
+
+# 增量同步配置
+CHANGE_FEED_PAGE_SIZE = 500  # 每次返回的默认变更条数
+CHANGE_FEED_MAX_PAGE_SIZE = 5000  # ?limit= 允许的最大条数
+CHANGE_FEED_TOMBSTONE_TTL = 30 * 24 * 60 * 60  # 删除墓碑保留时间（秒），更早签发的游标需要全量同步
+
+# 实时推送配置（SSE，由ASGI服务提供）
+LIVE_POLL_INTERVAL = 0.5  # 有订阅者时检查表版本号的间隔（秒）
+LIVE_HEARTBEAT_INTERVAL = 15  # 无事件时发送心跳的间隔（秒）
+LIVE_QUEUE_SIZE = 1000  # 每个连接最多积压的事件数，超出后通知客户端刷新
+LIVE_MAX_BATCH = 1000  # 一次轮询超过该变更数时不逐行推送，通知客户端刷新
+LIVE_RETRY_MS = 3000  # 断线后浏览器重连间隔（毫秒）
+
+# 统计接口配置
+AGGREGATE_FACET_LIMIT = 20  # 每个字段默认返回数量最多的取值个数
+AGGREGATE_MAX_FACET_LIMIT = 200  # ?facet_limit= 允许的最大值
+AGGREGATE_DAYS = 31  # 默认返回最近的扫描日期个数
+AGGREGATE_MAX_DAYS = 366  # ?days= 允许的最大值
+
+# 盘点批次对比接口配置
+ROUND_DIFF_PAGE_SIZE = 500  # 明细每页默认条数
+ROUND_DIFF_MAX_PAGE_SIZE = 5000  # ?limit= 允许的最大值
+
+# 批量处理配置
+BULK_UPDATE_MAX_ROWS = 10000  # 按 ids / items 批量处理时单次最多修改的行数
+
+# Excel上传导入配置（由导出worker在后台执行）
+IMPORT_JOB_DIR = BASE_DIR / 'imports'  # 上传文件暂存目录，导入结束后删除
+IMPORT_BATCH_SIZE = 2000  # 每批写入数据库的行数
+IMPORT_JOB_MAX_ERRORS = 100  # 任务记录中最多保留的错误信息条数
+IMPORT_MAX_UPLOAD_SIZE = 200 * 1024 * 1024  # 上传文件大小上限（字节）
+
+# 导入脚本的工作簿解析缓存（按文件内容哈希和工作表缓存 pd.read_excel 的结果）
+WORKBOOK_CACHE_DIR = BASE_DIR / 'cache' / 'workbooks'
+WORKBOOK_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 缓存目录大小上限（字节），超出时删除最久未使用的缓存
+
+# 盘点文件目录导入（ingest_folder 管理命令）
+INGEST_DIR = BASE_DIR.parent / 'data' / 'inbox'  # 默认扫描的目录，只放待导入的盘点文件
+INGEST_EXCLUDE = ['条码汇总*']  # 不导入的文件名模式（fnmatch），如条码汇总导出文件
+INGEST_POLL_INTERVAL = 30  # --watch 时的扫描间隔（秒）
+INGEST_SETTLE_SECONDS = 5  # 最近修改不足该秒数的文件可能仍在复制中，留到下次扫描
@@ -1,6 +1,11 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class AssetCodeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'asset_code'
+
+    def ready(self):
+        from .triggers import install_triggers_after_migrate
+        post_migrate.connect(install_triggers_after_migrate, sender=self)
@@ -0,0 +1,153 @@
+"""
+条码汇总批量处理
+- 按 id 列表、按筛选条件统一修改，或按行分别指定处理状态、预计处理时间、处理结果备注
+- 修改内容相同的行合并为一条 UPDATE ... WHERE id IN (...)，整个请求在一个事务中完成
+- 任一行校验失败或数据不存在时不做任何修改，返回每行的错误
+- QuerySet.update() 不会自动刷新 updated_at，需要显式写入；版本号、变更记录、分组计数由触发器维护
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .filters import BarcodeSummaryFilter
+from .models import BarcodeSummary
+from .search import search_barcode_summaries
+from .serializers import BarcodeSummaryBulkItemSerializer, BarcodeSummaryBulkValuesSerializer
+
+# 按筛选条件批量处理时接受的参数，与列表接口一致
+BULK_FILTER_PARAMS = ['search', *BarcodeSummaryFilter.base_filters]
+
+
+class RowErrors(Exception):
+    """存在校验失败的行，errors 为 [{'index', 'id', 'errors'}]"""
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+# id 列表分段查询和更新，避免超过 SQLite 单条语句的参数个数上限
+ID_CHUNK_SIZE = 500
+
+
+def _validate_values(values):
+    serializer = BarcodeSummaryBulkValuesSerializer(data=values)
+    if not serializer.is_valid():
+        raise ValidationError({'values': serializer.errors})
+    return serializer.validated_data
+
+
+def _filter_queryset(filters):
+    """按列表接口的筛选和搜索语义构造查询集，不允许空条件以免误改全表"""
+    if not isinstance(filters, dict):
+        raise ValidationError({'filters': '筛选条件必须是对象'})
+    unknown = set(filters) - set(BULK_FILTER_PARAMS)
+    if unknown:
+        raise ValidationError({'filters': f'不支持的筛选条件: {", ".join(sorted(unknown))}'})
+    filters = {key: str(value) for key, value in filters.items() if value is not None and value != ''}
+    if not filters:
+        raise ValidationError({'filters': '筛选条件不能为空'})
+
+    filterset = BarcodeSummaryFilter(data=filters, queryset=BarcodeSummary.objects.all())
+    if not filterset.is_valid():
+        raise ValidationError({'filters': filterset.errors})
+    queryset = filterset.qs
+    for term in filters.get('search', '').replace(',', ' ').split():
+        queryset = search_barcode_summaries(queryset, term)
+    return queryset
+
+
+def _validate_items(items):
+    """逐行校验，返回 (校验通过的 [(id, 修改内容)], 每行错误)"""
+    serializer = BarcodeSummaryBulkItemSerializer(data=items, many=True)
+    if serializer.is_valid():
+        return [(values.pop('id'), values) for values in map(dict, serializer.validated_data)], []
+    # 列表序列化器的错误按行号给出，只包含校验失败的行
+    errors = [
+        {'index': index, 'id': items[index].get('id') if isinstance(items[index], dict) else None,
+         'errors': item_errors}
+        for index, item_errors in sorted(serializer.errors.items())
+    ]
+    return [], errors
+
+
+def _update_rows(rows):
+    """修改内容相同的行合并为一条 UPDATE，返回每行错误（重复或不存在的 id）"""
+    ids = [row_id for row_id, _ in rows]
+    errors = []
+    seen = set()
+    for index, row_id in enumerate(ids):
+        if row_id in seen:
+            errors.append({'index': index, 'id': row_id, 'errors': {'id': ['id 重复']}})
+        seen.add(row_id)
+    if errors:
+        return 0, errors
+
+    groups = {}
+    for row_id, values in rows:
+        groups.setdefault(tuple(sorted(values.items())), []).append(row_id)
+
+    now = timezone.now()
+    existing = set()
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        chunk = ids[start:start + ID_CHUNK_SIZE]
+        existing.update(BarcodeSummary.objects.filter(id__in=chunk).values_list('id', flat=True))
+    errors = [
+        {'index': index, 'id': row_id, 'errors': {'id': ['数据不存在']}}
+        for index, row_id in enumerate(ids) if row_id not in existing
+    ]
+    if errors:
+        return 0, errors
+
+    updated = 0
+    for values, group_ids in groups.items():
+        for start in range(0, len(group_ids), ID_CHUNK_SIZE):
+            updated += BarcodeSummary.objects.filter(id__in=group_ids[start:start + ID_CHUNK_SIZE]).update(
+                **dict(values), updated_at=now,
+            )
+    return updated, []
+
+
+def apply_bulk_update(data):
+    """执行批量处理，返回更新行数；参数错误时抛出 ValidationError，任一行校验失败时抛出 RowErrors，均不做任何修改
+
+    请求体三选一:
+    - {"ids": [1, 2], "values": {"result": true}}
+    - {"filters": {"user": "张三", "result": "false"}, "values": {"result": true}}
+    - {"items": [{"id": 1, "result": true, "result_remarks": "已归还"}, ...]}
+    """
+    modes = [key for key in ('ids', 'filters', 'items') if key in data]
+    if len(modes) != 1:
+        raise ValidationError({'detail': '需要且只能指定 ids、filters、items 其中之一'})
+    mode = modes[0]
+
+    if mode == 'filters':
+        values = _validate_values(data.get('values'))
+        with transaction.atomic():
+            return _filter_queryset(data['filters']).update(**values, updated_at=timezone.now())
+
+    if mode == 'ids':
+        ids = data['ids']
+        if not isinstance(ids, list) or not all(isinstance(row_id, int) and not isinstance(row_id, bool) for row_id in ids):
+            raise ValidationError({'ids': 'ids 必须是整数列表'})
+        values = _validate_values(data.get('values'))
+        rows = [(row_id, values) for row_id in ids]
+    else:
+        items = data['items']
+        if not isinstance(items, list):
+            raise ValidationError({'items': 'items 必须是列表'})
+        rows, errors = _validate_items(items)
+        if errors:
+            raise RowErrors(errors)
+
+    if not rows:
+        return 0
+    if len(rows) > settings.BULK_UPDATE_MAX_ROWS:
+        raise ValidationError({mode: f'单次最多修改 {settings.BULK_UPDATE_MAX_ROWS} 行'})
+    with transaction.atomic():
+        updated, errors = _update_rows(rows)
+        if errors:
+            raise RowErrors(errors)
+    return updated
@@ -0,0 +1,86 @@
+"""
+条码汇总增量同步（变更流）
+- 触发器在每次写入时把该行的最新变更序号登记到 BarcodeSummaryChange，删除的行保留墓碑
+- 客户端携带上次返回的游标读取之后的变更，只传输新增、修改、删除的行
+- 墓碑超过 CHANGE_FEED_TOMBSTONE_TTL 后清理，早于该时间签发的游标需要重新全量同步
+"""
+
+import json
+import time
+import base64
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import BarcodeSummary, BarcodeSummaryChange
+from .serializers import BarcodeSummaryReadSerializer
+
+
+def encode_cursor(seq, issued_at):
+    payload = json.dumps({'s': seq, 't': int(issued_at)})
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(encoded):
+    """返回 (变更序号, 签发时间戳)，游标格式错误时抛出 ValueError"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+        return int(payload['s']), int(payload['t'])
+    except (TypeError, ValueError, KeyError, UnicodeError):
+        raise ValueError('无效的同步游标')
+
+
+def cursor_expired(issued_at):
+    """签发时间早于墓碑保留期的游标可能漏掉已清理的删除记录"""
+    return issued_at < time.time() - settings.CHANGE_FEED_TOMBSTONE_TTL
+
+
+def get_changes(since_seq, limit, fields):
+    """读取变更序号大于 since_seq 的变更，返回 (变更列表, 新游标, 是否还有更多)
+
+    since_seq 为 None 表示首次同步，此时不返回墓碑。
+    """
+    # 先记录签发时间再查询：之后出现的删除，其墓碑时间一定不早于签发时间
+    issued_at = time.time()
+    changes = BarcodeSummaryChange.objects.order_by('change_seq')
+    if since_seq is None:
+        changes = changes.filter(deleted=False)
+        since_seq = 0
+    else:
+        changes = changes.filter(change_seq__gt=since_seq)
+
+    # 变更表和数据表在同一个读事务中查询，保证二者一致
+    with transaction.atomic():
+        changes = list(changes.values('record_id', 'change_seq', 'deleted', 'changed_at')[:limit + 1])
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        upsert_ids = [change['record_id'] for change in changes if not change['deleted']]
+        rows = {
+            row['id']: row
+            for row in BarcodeSummary.objects.filter(id__in=upsert_ids).values(*fields)
+        } if upsert_ids else {}
+
+    serializer = BarcodeSummaryReadSerializer(fields=fields)
+    results = []
+    for change in changes:
+        item = {
+            'op': 'delete' if change['deleted'] else 'upsert',
+            'id': change['record_id'],
+            'seq': change['change_seq'],
+            'changed_at': serializer.to_datetime(change['changed_at']),
+        }
+        if not change['deleted']:
+            item['data'] = serializer.to_representation(rows[change['record_id']])
+        results.append(item)
+
+    last_seq = changes[-1]['change_seq'] if changes else since_seq
+    return results, encode_cursor(last_seq, issued_at), has_more
+
+
+def prune_tombstones():
+    """删除超过保留期的墓碑，返回清理数量"""
+    expire_before = timezone.now() - timedelta(seconds=settings.CHANGE_FEED_TOMBSTONE_TTL)
+    deleted, _ = BarcodeSummaryChange.objects.filter(deleted=True, changed_at__lt=expire_before).delete()
+    return deleted
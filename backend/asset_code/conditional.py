@@ -0,0 +1,46 @@
+"""
+条码汇总接口的条件请求（ETag / Last-Modified）
+- 弱 ETag 由表版本号和请求地址计算，Last-Modified 取表最后写入时间，二者都由触发器在写入时维护
+- 客户端的 If-None-Match / If-Modified-Since 仍然有效时直接返回304，只查询一次版本表
+"""
+
+import hashlib
+from functools import wraps
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .versioning import get_table_version
+
+
+def compute_etag(request, version):
+    """同一表版本下，请求地址和响应格式相同则内容相同"""
+    payload = f'{request.get_full_path()}|{getattr(request, "accepted_media_type", "")}'
+    digest = hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+    return f'W/"{version}-{digest}"'
+
+
+def conditional_get(handler):
+    """为只读接口加上 ETag / Last-Modified，条件命中时不执行视图逻辑"""
+
+    @wraps(handler)
+    def wrapper(view, request, *args, **kwargs):
+        # 必须在查询数据之前读取版本号：期间若有写入，ETag 只会偏旧，不会把新版本号标在旧数据上
+        version, updated_at = get_table_version()
+        if updated_at is None:
+            # 版本表未登记（非SQLite数据库没有触发器维护），不做条件请求
+            return handler(view, request, *args, **kwargs)
+
+        etag = compute_etag(request, version)
+        last_modified = int(updated_at.timestamp())
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(view, request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+            # 浏览器每次都带上 If-None-Match 重新验证，数据未变化时直接复用本地缓存
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    return wrapper
@@ -0,0 +1,126 @@
+"""
+条码汇总按资产数据补充使用人、型号、资产类型
+- 资产数据保存在 AssetRecord（资产编号唯一索引），每次导入资产数据Excel按资产编号增量写入，只改变有变化的行
+- 条码汇总新增行在写入前按条码批量查询资产数据补充（每块一次唯一索引查询），不再需要事后全表补充
+- 资产数据变化后，用一条 UPDATE（按资产编号唯一索引的关联子查询）只补充关联到本次有变化的资产编号的已有行；
+  只更新取值有变化的行
+- 表名和字段名（如 user）都由数据库后端加引号，不使用 SQLite 特有的 IS NOT、UPDATE ... FROM、ON CONFLICT 语法
+"""
+
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .models import AssetRecord, BarcodeSummary
+
+# 匹配到资产数据的行统一设置的资产类型
+ENRICH_ASSET_TYPE = '工厂借用'
+
+# 资产数据每块写入及按条码查询的数量
+ASSET_CHUNK_SIZE = 2000
+
+
+def lookup_assets(barcodes):
+    """按条码查询资产数据，返回 {资产编号: (使用人, 型号)}"""
+    return {
+        asset_code: (user, model)
+        for asset_code, user, model in AssetRecord.objects.filter(asset_code__in=set(barcodes))
+        .values_list('asset_code', 'user', 'model')
+    }
+
+
+def lookup_asset(barcode):
+    """查询单个条码对应的 (使用人, 型号)，没有资产数据时返回None"""
+    return AssetRecord.objects.filter(asset_code=barcode).values_list('user', 'model').first()
+
+
+def enrich_rows(rows, asset_type=ENRICH_ASSET_TYPE):
+    """写入前补充字段字典（就地修改）：条码有资产数据的行设置使用人、型号和资产类型，返回补充的行数"""
+    enriched = 0
+    for start in range(0, len(rows), ASSET_CHUNK_SIZE):
+        chunk = rows[start:start + ASSET_CHUNK_SIZE]
+        assets = lookup_assets(row['barcode'] for row in chunk)
+        for row in chunk:
+            asset = assets.get(row['barcode'])
+            if asset is not None:
+                row['user'], row['model'] = asset
+                row['asset_type'] = asset_type
+                enriched += 1
+    return enriched
+
+
+def load_asset_records(assets, source=''):
+    """按资产编号增量写入资产数据快照，assets 为 (资产编号, 使用人, 型号) 的可迭代对象，重复时以最后一行为准
+
+    返回 {'assets', 'inserted', 'updated', 'unchanged', 'loaded_at'}；本次新增或修改的行 updated_at 为 loaded_at。
+    """
+    latest = {}
+    for asset_code, user, model in assets:
+        latest[asset_code] = (user or '', model or '')
+
+    loaded_at = timezone.now()
+    now = connection.ops.adapt_datetimefield_value(loaded_at)
+    opts = AssetRecord._meta
+    qn = connection.ops.quote_name
+    # 与同步导入一样用参数化语句 executemany 写入，比 bulk_create / bulk_update 逐字段转换和 CASE WHEN 快数倍
+    insert_columns = ', '.join(qn(opts.get_field(field).column)
+                               for field in ['asset_code', 'user', 'model', 'source', 'created_at', 'updated_at'])
+    insert_sql = f"INSERT INTO {qn(opts.db_table)} ({insert_columns}) VALUES (%s, %s, %s, %s, %s, %s)"
+    assignments = ', '.join(f'{qn(opts.get_field(field).column)} = %s' for field in ['user', 'model', 'source', 'updated_at'])
+    update_sql = f"UPDATE {qn(opts.db_table)} SET {assignments} WHERE {qn(opts.pk.column)} = %s"
+
+    stats = {'assets': len(latest), 'inserted': 0, 'updated': 0, 'unchanged': 0, 'loaded_at': loaded_at}
+    items = list(latest.items())
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, len(items), ASSET_CHUNK_SIZE):
+            chunk = items[start:start + ASSET_CHUNK_SIZE]
+            existing = {
+                asset_code: (pk, user, model)
+                for pk, asset_code, user, model in AssetRecord.objects
+                .filter(asset_code__in=[code for code, _ in chunk])
+                .values_list('id', 'asset_code', 'user', 'model')
+            }
+            to_insert = []
+            to_update = []
+            for code, (user, model) in chunk:
+                current = existing.get(code)
+                if current is None:
+                    to_insert.append([code, user, model, source, now, now])
+                elif current[1:] != (user, model):
+                    to_update.append([user, model, source, now, current[0]])
+            if to_insert:
+                cursor.executemany(insert_sql, to_insert)
+            if to_update:
+                cursor.executemany(update_sql, to_update)
+            stats['inserted'] += len(to_insert)
+            stats['updated'] += len(to_update)
+            stats['unchanged'] += len(chunk) - len(to_insert) - len(to_update)
+    return stats
+
+
+def enrich_barcode_summaries(since=None, asset_type=ENRICH_ASSET_TYPE):
+    """按资产数据补充已有的条码汇总，since 不为空时只关联该时间之后新增或修改的资产数据
+
+    返回 {'matched': 关联到资产数据的行数, 'updated': 实际更新的行数}
+    """
+    assets = AssetRecord.objects.all()
+    if since is not None:
+        assets = assets.filter(updated_at__gte=since)
+    # 从有变化的资产编号出发按条码索引定位，不逐行扫描条码汇总
+    matched_rows = BarcodeSummary.objects.filter(barcode__in=assets.values('asset_code'))
+    asset = AssetRecord.objects.filter(asset_code=OuterRef('barcode'))
+    # 使用人、型号与资产数据不同（含为空）或资产类型不同的行；资产数据中的使用人、型号不为NULL
+    changed = (
+        Exists(asset.exclude(user=OuterRef('user'), model=OuterRef('model')))
+        | Q(user__isnull=True) | Q(model__isnull=True)
+        | Q(asset_type__isnull=True) | ~Q(asset_type=asset_type)
+    )
+    with transaction.atomic():
+        matched = matched_rows.count()
+        updated = matched_rows.filter(changed).update(
+            user=Subquery(asset.values('user')[:1]),
+            model=Subquery(asset.values('model')[:1]),
+            asset_type=asset_type,
+            updated_at=timezone.now(),
+        )
+    return {'matched': matched, 'updated': updated}
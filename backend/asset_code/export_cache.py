@@ -0,0 +1,87 @@
+"""
+导出结果缓存
+- 缓存键 = 规范化后的筛选条件 + 导出格式 + 条码汇总表版本号
+- 表有任何写入时版本号递增，旧缓存自然失效
+- 缓存目录按总大小做LRU淘汰（以文件修改时间作为最近使用时间）
+"""
+
+import os
+import json
+import uuid
+import hashlib
+
+from django.conf import settings
+
+from .files import evict_directory
+from .filters import EXPORT_FILTER_PARAMS, parse_result
+from .versioning import get_table_version
+
+
+def normalize_export_filters(params):
+    """只保留导出支持的非空参数，并统一取值形式"""
+    normalized = {}
+    for key in EXPORT_FILTER_PARAMS:
+        value = params.get(key, '')
+        if value is None:
+            continue
+        value = str(value).strip()
+        if value == '':
+            continue
+        if key in ('result', 'archived'):
+            value = 'true' if parse_result(value) else 'false'
+        normalized[key] = value
+    return normalized
+
+
+def get_cache_key(params, export_format, version=None):
+    """根据筛选条件、格式和表版本计算缓存键"""
+    if version is None:
+        version, _ = get_table_version()
+    payload = json.dumps({
+        'filters': normalize_export_filters(params),
+        'format': export_format,
+        'version': version,
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _cache_dir():
+    cache_dir = settings.EXPORT_CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def get_cached_file(key, extension):
+    """命中时返回缓存文件路径并刷新其最近使用时间，否则返回None"""
+    path = os.path.join(_cache_dir(), f'{key}.{extension}')
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+
+def evict_cache(max_bytes=None):
+    """按最近使用时间淘汰缓存文件，直到总大小不超过上限"""
+    if max_bytes is None:
+        max_bytes = settings.EXPORT_CACHE_MAX_BYTES
+    evict_directory(_cache_dir(), max_bytes)
+
+
+def tee_to_cache(chunks, key, extension):
+    """边向客户端输出边写入缓存，完整生成后才放入缓存目录"""
+    path = os.path.join(_cache_dir(), f'{key}.{extension}')
+    tmp_path = f'{path}.tmp-{uuid.uuid4().hex}'
+    completed = False
+    try:
+        with open(tmp_path, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
+        completed = True
+    finally:
+        if completed:
+            os.replace(tmp_path, path)
+            evict_cache()
+        elif os.path.exists(tmp_path):
+            os.remove(tmp_path)
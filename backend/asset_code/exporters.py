@@ -0,0 +1,271 @@
+"""
+条码汇总导出工具
+- 通过 values_list().iterator() 分块读取数据库，不一次性加载全部数据
+- 以流式方式生成 xlsx / csv / ndjson 文件内容，配合 StreamingHttpResponse 边生成边发送
+"""
+
+import re
+import io
+import csv
+import json
+import codecs
+import zipfile
+import itertools
+from xml.sax.saxutils import escape
+
+# 导出字段及对应的中文表头
+EXPORT_FIELDS = [
+    'barcode', 'model', 'location', 'scanner',
+    'scan_time', 'remarks', 'user', 'asset_type',
+    'result', 'expected_time', 'result_remarks',
+    'created_at', 'updated_at',
+]
+EXPORT_HEADERS = [
+    '条码', '型号', '位置', '扫描人员', '时间', '备注',
+    '使用人', '资产类型', '处理状态', '预计处理时间',
+    '处理结果备注', '创建时间', '更新时间',
+]
+
+RESULT_DISPLAY = {True: '已完成', False: '处理中', None: '未处理'}
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# 每次从数据库读取的行数
+EXPORT_CHUNK_SIZE = 2000
+
+# 单个工作表最多容纳的数据行数（Excel行数上限 1048576 减去表头）
+EXCEL_MAX_DATA_ROWS = 1048575
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+CSV_CONTENT_TYPE = 'text/csv; charset=utf-8'
+NDJSON_CONTENT_TYPE = 'application/x-ndjson; charset=utf-8'
+ZIP_CONTENT_TYPE = 'application/zip'
+
+# XML 1.0 不允许出现的控制字符
+_ILLEGAL_XML_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def format_export_value(field, value):
+    """将数据库值转换为导出文本"""
+    if field == 'result':
+        return RESULT_DISPLAY.get(value, '')
+    if value is None:
+        return ''
+    if field in ('expected_time', 'created_at', 'updated_at'):
+        return value.strftime(DATETIME_FORMAT)
+    return str(value)
+
+
+def iter_export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """分块遍历查询集，逐行返回格式化后的导出数据"""
+    rows = queryset.values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    for row in rows:
+        yield [format_export_value(field, value) for field, value in zip(EXPORT_FIELDS, row)]
+
+
+class StreamBuffer:
+    """只写缓冲区，供 zipfile 以不可 seek 的方式写入"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _column_letter(index):
+    """列序号（从0开始）转换为 Excel 列名"""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _row_xml(row_number, values, columns):
+    cells = []
+    for column, value in zip(columns, values):
+        if value == '':
+            continue
+        text = escape(_ILLEGAL_XML_CHARS.sub('', value))
+        cells.append(
+            f'<c r="{column}{row_number}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+        )
+    return f'<row r="{row_number}">{"".join(cells)}</row>'
+
+
+_CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '{sheets}'
+    '</Types>'
+)
+_SHEET_CONTENT_TYPE = (
+    '<Override PartName="/xl/worksheets/sheet{index}.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+_ROOT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets>{sheets}</sheets>'
+    '</workbook>'
+)
+_WORKBOOK_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '{sheets}'
+    '<Relationship Id="rIdStyles" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+_STYLES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+_SHEET_HEAD_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_TAIL_XML = '</sheetData></worksheet>'
+
+
+def _sheet_entries(sheet_count, template):
+    return ''.join(template.format(index=index) for index in range(1, sheet_count + 1))
+
+
+def iter_xlsx(rows, headers=EXPORT_HEADERS, sheet_rows=EXCEL_MAX_DATA_ROWS, flush_rows=EXPORT_CHUNK_SIZE):
+    """流式生成 xlsx 文件内容
+
+    工作表数据逐行写入 zip 条目，每 flush_rows 行产出一次已压缩的字节，
+    内存占用与总行数无关。超过 sheet_rows 行时自动拆分到 Sheet2、Sheet3……
+    """
+    buffer = StreamBuffer()
+    columns = [_column_letter(i) for i in range(len(headers))]
+    rows = iter(rows)
+    sheet_count = 0
+
+    with zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+        while True:
+            first = next(rows, None)
+            # 无数据时也要保留一个只有表头的工作表
+            if first is None and sheet_count:
+                break
+            sheet_count += 1
+            sheet_data = [] if first is None else itertools.chain([first], itertools.islice(rows, sheet_rows - 1))
+
+            with archive.open(f'xl/worksheets/sheet{sheet_count}.xml', mode='w', force_zip64=True) as sheet:
+                sheet.write(_SHEET_HEAD_XML.encode('utf-8'))
+                sheet.write(_row_xml(1, headers, columns).encode('utf-8'))
+                pending = []
+                for row_number, values in enumerate(sheet_data, start=2):
+                    pending.append(_row_xml(row_number, values, columns))
+                    if len(pending) >= flush_rows:
+                        sheet.write(''.join(pending).encode('utf-8'))
+                        pending = []
+                        yield buffer.pop()
+                if pending:
+                    sheet.write(''.join(pending).encode('utf-8'))
+                sheet.write(_SHEET_TAIL_XML.encode('utf-8'))
+
+            if first is None:
+                break
+
+        archive.writestr('[Content_Types].xml', _CONTENT_TYPES_XML.format(
+            sheets=_sheet_entries(sheet_count, _SHEET_CONTENT_TYPE)
+        ))
+        archive.writestr('_rels/.rels', _ROOT_RELS_XML)
+        archive.writestr('xl/workbook.xml', _WORKBOOK_XML.format(
+            sheets=_sheet_entries(sheet_count, '<sheet name="Sheet{index}" sheetId="{index}" r:id="rId{index}"/>')
+        ))
+        archive.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS_XML.format(
+            sheets=_sheet_entries(
+                sheet_count,
+                '<Relationship Id="rId{index}" '
+                'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+                'Target="worksheets/sheet{index}.xml"/>'
+            )
+        ))
+        archive.writestr('xl/styles.xml', _STYLES_XML)
+
+    yield buffer.pop()
+
+
+def iter_csv(rows, headers=EXPORT_HEADERS, flush_rows=EXPORT_CHUNK_SIZE):
+    """流式生成CSV内容，带UTF-8 BOM以便Excel正确识别中文"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    yield codecs.BOM_UTF8 + buffer.getvalue().encode('utf-8')
+    buffer.seek(0)
+    buffer.truncate()
+
+    pending = 0
+    for values in rows:
+        writer.writerow(values)
+        pending += 1
+        if pending >= flush_rows:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        yield buffer.getvalue().encode('utf-8')
+
+
+def iter_ndjson(rows, headers=EXPORT_HEADERS, flush_rows=EXPORT_CHUNK_SIZE):
+    """流式生成NDJSON内容，每行一个以中文表头为键的JSON对象"""
+    pending = []
+    for values in rows:
+        pending.append(json.dumps(dict(zip(headers, values)), ensure_ascii=False))
+        if len(pending) >= flush_rows:
+            yield ('\n'.join(pending) + '\n').encode('utf-8')
+            pending = []
+    if pending:
+        yield ('\n'.join(pending) + '\n').encode('utf-8')
+
+
+# 导出格式 -> (内容生成函数, Content-Type)，格式名同时作为文件扩展名
+EXPORT_FORMATS = {
+    'xlsx': (iter_xlsx, XLSX_CONTENT_TYPE),
+    'csv': (iter_csv, CSV_CONTENT_TYPE),
+    'ndjson': (iter_ndjson, NDJSON_CONTENT_TYPE),
+}
+
+# 文件扩展名 -> Content-Type（包含拆分导出使用的zip）
+CONTENT_TYPES = {
+    **{extension: content_type for extension, (_, content_type) in EXPORT_FORMATS.items()},
+    'zip': ZIP_CONTENT_TYPE,
+}
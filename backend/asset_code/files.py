@@ -0,0 +1,52 @@
+"""
+文件目录公共操作
+- file_hash()：分块计算文件内容哈希，盘点目录导入、断点续传和工作簿缓存共用
+- evict_directory()：缓存目录按最近使用时间（文件修改时间）淘汰，导出缓存和工作簿缓存共用
+"""
+
+import os
+import hashlib
+
+# 写入中的临时文件名含有该标记（导出缓存为 .tmp-<uuid>，工作簿缓存为 .tmp 后缀），淘汰时跳过
+TEMP_MARKER = '.tmp'
+
+
+def file_hash(path, block_size=1024 * 1024):
+    """文件内容的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def evict_directory(directory, max_bytes):
+    """按最近使用时间从旧到新删除目录中的文件，直到总大小不超过上限，返回删除的文件数
+
+    目录不存在时返回0；写入中的临时文件不计入也不删除。
+    """
+    try:
+        scanned = list(os.scandir(directory))
+    except FileNotFoundError:
+        return 0
+    entries = []
+    total = 0
+    for entry in scanned:
+        if not entry.is_file() or TEMP_MARKER in entry.name:
+            continue
+        stat = entry.stat()
+        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total += stat.st_size
+
+    entries.sort()
+    removed = 0
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
@@ -0,0 +1,94 @@
+import django_filters
+
+from .models import BarcodeSummary
+from .search import search_barcode_summaries
+
+# 导出接口支持的筛选参数（均为模糊匹配）
+EXPORT_FILTER_FIELDS = ['barcode', 'model', 'location', 'scanner', 'scan_time', 'remarks', 'user', 'asset_type']
+
+# 导出接口接受的全部筛选参数
+EXPORT_FILTER_PARAMS = ['search', *EXPORT_FILTER_FIELDS, 'result', 'archived']
+
+
+def parse_result(value):
+    """将处理状态参数转换为布尔值"""
+    if value.lower() in ('true', '1', 'yes', '是'):
+        return True
+    if value.lower() in ('false', '0', 'no', '否'):
+        return False
+    return bool(value)
+
+
+def filter_result(queryset, value):
+    """按处理状态筛选
+
+    BooleanField 的等值条件会被编译为 WHERE result / WHERE NOT result，SQLite 无法用索引定位；
+    改写为 IN 比较后才能使用 (result, created_at) 索引。
+    """
+    return queryset.filter(result__in=[value])
+
+
+def filter_archived(queryset, value):
+    """按归档状态筛选，未指定（None）时与 archived=false 相同，只保留未归档的行"""
+    return queryset.filter(archived_at__isnull=not value)
+
+
+class BarcodeSummaryFilter(django_filters.FilterSet):
+    """列表接口的字段筛选，均为精确匹配
+
+    已归档（同步时来源文件中已不存在）的行默认不返回，archived=true 只看已归档的行；
+    列表、统计、导出和批量处理都遵循这一默认值，与盘点批次列表和对比一致。
+    """
+
+    result = django_filters.BooleanFilter(method='filter_result')
+    archived = django_filters.BooleanFilter(method='filter_archived')
+
+    class Meta:
+        model = BarcodeSummary
+        fields = ['barcode', 'model', 'location', 'scanner', 'scan_time', 'remarks', 'user', 'asset_type', 'result', 'batch']
+
+    def filter_result(self, queryset, name, value):
+        return filter_result(queryset, value)
+
+    def filter_archived(self, queryset, name, value):
+        return filter_archived(queryset, value)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        # 未传 archived 时筛选方法不会被调用，在此应用默认值
+        if self.form.cleaned_data.get('archived') is None:
+            queryset = filter_archived(queryset, None)
+        return queryset
+
+
+def get_filter_params(query_params, filterset_class=BarcodeSummaryFilter):
+    """只保留影响结果集的查询参数（搜索及筛选类声明的全部筛选），并规范化为可比较的形式"""
+    names = ['search', *(filterset_class.base_filters if filterset_class is not None else [])]
+    params = {}
+    for name in names:
+        values = sorted(value.strip() for value in query_params.getlist(name) if value.strip())
+        if values:
+            params[name] = values
+    return params
+
+
+def filter_barcode_summaries(queryset, params):
+    """按导出接口的语义应用搜索和筛选条件
+
+    params 可以是 request.query_params，也可以是普通字典。
+    """
+    search = params.get('search', '')
+    if search:
+        queryset = search_barcode_summaries(queryset, search)
+
+    for field in EXPORT_FILTER_FIELDS:
+        value = params.get(field, '')
+        if value:
+            queryset = queryset.filter(**{f'{field}__icontains': value})
+
+    result = params.get('result', '')
+    if result is not None and result != '':
+        queryset = filter_result(queryset, parse_result(str(result)))
+
+    archived = params.get('archived', '')
+    return filter_archived(queryset, parse_result(str(archived)) if archived not in (None, '') else None)
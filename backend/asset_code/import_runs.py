@@ -0,0 +1,70 @@
+"""
+导入脚本的断点续传
+- 导入脚本开始时调用 start_run()：同一脚本、同一文件内容（SHA-256）、同一批次有未完成的运行记录时续传，否则新建
+- 每提交一块数据，在同一事务中调用 save_checkpoint() 记录已提交到的行位置和累计统计；
+  进程在任何位置退出，断点与已写入的数据一致，不会出现数据已提交而断点未记录（或相反）的情况
+- 续传时跳过断点之前的行，不再写入数据库；统计从断点累计，与一次运行完成的结果相同
+"""
+
+import os
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .files import file_hash
+from .models import ImportRun
+
+
+def start_run(script, path, batch='', options=None, restart=False):
+    """返回 (运行记录, 是否续传)；续传时沿用首次运行的参数（run.options）
+
+    restart 为 True 时把未完成的记录标记为已放弃，从头导入。
+    """
+    digest = file_hash(path)
+    unfinished_runs = ImportRun.objects.filter(
+        script=script, file_hash=digest, batch=batch,
+        status__in=[ImportRun.STATUS_RUNNING, ImportRun.STATUS_FAILED],
+    )
+    unfinished = unfinished_runs.order_by('-started_at').first()
+
+    if unfinished is not None and not restart:
+        unfinished.status = ImportRun.STATUS_RUNNING
+        unfinished.error = ''
+        unfinished.resumed += 1
+        unfinished.save(update_fields=['status', 'error', 'resumed'])
+        return unfinished, True
+
+    if unfinished is not None:
+        unfinished_runs.update(status=ImportRun.STATUS_ABANDONED, finished_at=timezone.now())
+    run = ImportRun.objects.create(
+        script=script, file_name=os.path.basename(path), file_hash=digest, batch=batch, options=options or {},
+    )
+    return run, False
+
+
+def save_checkpoint(run, rows_committed, stats, errors=()):
+    """记录断点：rows_committed 之前的行已全部提交；需在写入该块数据的同一事务中调用
+
+    errors 为本块新增的错误信息，累计保留前 IMPORT_JOB_MAX_ERRORS 条。
+    """
+    if not transaction.get_connection().in_atomic_block:
+        raise RuntimeError('断点需要与数据在同一事务中提交')
+    run.rows_committed = rows_committed
+    run.chunks_committed += 1
+    run.stats = dict(stats)
+    room = settings.IMPORT_JOB_MAX_ERRORS - len(run.errors)
+    if room > 0:
+        run.errors = run.errors + list(errors)[:room]
+    run.checkpoint_at = timezone.now()
+    run.save(update_fields=['rows_committed', 'chunks_committed', 'stats', 'errors', 'checkpoint_at'])
+
+
+def finish_run(run, stats=None, error=None):
+    """运行结束：成功时不再续传；失败时保留断点，下次运行同一文件时续传"""
+    run.status = ImportRun.STATUS_FAILED if error else ImportRun.STATUS_SUCCESS
+    run.error = error or ''
+    if stats is not None:
+        run.stats = dict(stats)
+    run.finished_at = timezone.now()
+    run.save(update_fields=['status', 'error', 'stats', 'finished_at'])
@@ -0,0 +1,175 @@
+"""
+条码汇总Excel导入解析
+- openpyxl 只读模式逐行读取，不使用 pd.read_excel 整表载入，内存占用与文件行数无关
+- 工作簿中的每个工作表都会导入，首个非空行作为表头，列名按别名映射到模型字段
+- 单元格统一转换为去除首尾空白的字符串，日期时间格式与 pandas 读取后 str() 的结果一致
+- iter_row_range() 按行区间读取，多个进程可以并行解析同一工作表的不同区间
+"""
+
+from datetime import datetime
+
+from openpyxl import load_workbook
+from openpyxl.worksheet._reader import WorkSheetParser
+
+from .models import BarcodeSummary
+
+# 导入字段
+IMPORT_FIELDS = ['barcode', 'model', 'location', 'scanner', 'scan_time', 'remarks', 'user', 'asset_type']
+
+# Excel列名到模型字段的映射
+COLUMN_ALIASES = {
+    '条码': 'barcode', '条形码': 'barcode', 'barcode': 'barcode', 'BARCODE': 'barcode',
+    '型号': 'model', '产品型号': 'model', 'model': 'model', 'MODEL': 'model',
+    '位置': 'location', '存放位置': 'location', 'location': 'location', 'LOCATION': 'location',
+    '扫描人员': 'scanner', '扫描人': 'scanner', '操作员': 'scanner', 'scanner': 'scanner', 'SCANNER': 'scanner',
+    '时间': 'scan_time', '扫描时间': 'scan_time', '时间戳': 'scan_time', 'scan_time': 'scan_time', 'SCAN_TIME': 'scan_time',
+    '备注': 'remarks', '说明': 'remarks', '注释': 'remarks', 'remarks': 'remarks', 'REMARKS': 'remarks',
+    '使用人': 'user', 'user': 'user',
+    '资产类型': 'asset_type', 'asset_type': 'asset_type',
+}
+
+# 有长度限制的字段
+FIELD_MAX_LENGTHS = {
+    field.name: field.max_length
+    for field in BarcodeSummary._meta.concrete_fields
+    if field.name in IMPORT_FIELDS and field.max_length
+}
+FIELD_LABELS = {field.name: field.verbose_name for field in BarcodeSummary._meta.concrete_fields}
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def format_cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.strftime(DATETIME_FORMAT)
+    # 纯数字条码被Excel存为数值时去掉多余的 .0
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def open_workbook(path):
+    return load_workbook(path, read_only=True, data_only=True)
+
+
+def estimate_rows(workbook):
+    """按各工作表记录的数据范围估算总行数（不含表头），仅用于显示进度"""
+    total = 0
+    for sheet in workbook.worksheets:
+        total += max((sheet.max_row or 0) - 1, 0)
+    return total
+
+
+def _map_header(row):
+    return [COLUMN_ALIASES.get(str(cell).strip()) if cell is not None else None for cell in row]
+
+
+def _find_header(rows):
+    """从 (行号, 单元格元组) 迭代器中取首个非空行作为表头，返回 (表头行号, 字段列)
+
+    空表返回 (None, None)；找不到条码列时字段列为None，否则为 [(列序号, 字段名)]。
+    """
+    for row_number, row in rows:
+        if any(cell not in (None, '') for cell in row):
+            header = _map_header(row)
+            if 'barcode' not in header:
+                return row_number, None
+            return row_number, [(index, field) for index, field in enumerate(header) if field]
+    return None, None
+
+
+def find_header(sheet):
+    """工作表的表头行号和字段列，含义同 _find_header"""
+    return _find_header(enumerate(sheet.iter_rows(values_only=True), 1))
+
+
+def iter_raw_sheets(workbook):
+    """逐个工作表产出 (工作表名, 字段列, 原始行迭代器)，不转换单元格
+
+    字段列为 [(列序号, 字段名)]，找不到条码列的工作表为None；原始行迭代器产出 (Excel行号, 单元格元组)。
+    解析与转换分开，导入脚本可以把转换交给其他进程。
+    """
+    for sheet in workbook.worksheets:
+        rows = enumerate(sheet.iter_rows(values_only=True), 1)
+        header_row, columns = _find_header(rows)
+        if header_row is None:
+            continue
+        if columns is None:
+            yield sheet.title, None, iter(())
+            continue
+        yield sheet.title, columns, rows
+
+
+class _RangeParser(WorkSheetParser):
+    """起始行之前的行只推进行号，不解析单元格"""
+
+    def __init__(self, *args, skip_before=1, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.skip_before = skip_before
+
+    def parse_row(self, row):
+        number = row.get('r')
+        if number is not None and number.isdigit() and int(number) < self.skip_before:
+            self.row_counter = int(number)
+            return self.row_counter, []
+        return super().parse_row(row)
+
+
+def iter_row_range(sheet, min_row, max_row=None):
+    """逐行产出只读工作表 [min_row, max_row] 范围内的 (Excel行号, 单元格元组)，max_row 为None时读到表尾
+
+    只读模式的 iter_rows(min_row=...) 会完整解析起始行之前的每个单元格，多个进程分区间读取时每个进程都要从头解析；
+    这里起始行之前的行只跳过XML元素，耗时约为完整解析的1/4。缺失的行按空行产出，与 iter_rows 一致。
+    依赖 openpyxl 只读工作表的内部接口（_get_source、_shared_strings、_get_row）。
+    """
+    workbook = sheet.parent
+    expected = min_row
+    with sheet._get_source() as source:
+        parser = _RangeParser(source, sheet._shared_strings, data_only=workbook.data_only, epoch=workbook.epoch,
+                              date_formats=workbook._date_formats, timedelta_formats=workbook._timedelta_formats,
+                              skip_before=min_row)
+        for row_number, cells in parser.parse():
+            if row_number < min_row:
+                continue
+            if max_row is not None and row_number > max_row:
+                break
+            for missing in range(expected, row_number):
+                yield missing, ()
+            yield row_number, tuple(sheet._get_row(cells, values_only=True))
+            expected = row_number + 1
+
+
+def normalize_row(row, columns):
+    """把原始行转换为字段字典；空行（只读模式会产出带格式的空行）返回None"""
+    if not any(cell not in (None, '') for cell in row):
+        return None
+    return {field: format_cell(row[index]) if index < len(row) else '' for index, field in columns}
+
+
+def iter_sheets(workbook):
+    """逐个工作表产出 (工作表名, 表头字段列表, 数据行迭代器)
+
+    数据行迭代器产出 (Excel行号, 字段字典)，跳过空行。找不到条码列的工作表，表头字段列表为None。
+    """
+    for title, columns, rows in iter_raw_sheets(workbook):
+        if columns is None:
+            yield title, None, rows
+        else:
+            yield title, [field for _, field in columns], _iter_rows(rows, columns)
+
+
+def _iter_rows(rows, columns):
+    for row_number, row in rows:
+        data = normalize_row(row, columns)
+        if data is not None:
+            yield row_number, data
+
+
+def validate_row(data):
+    """校验字段长度，返回错误说明，无错误时返回None"""
+    for field, max_length in FIELD_MAX_LENGTHS.items():
+        if len(data.get(field, '')) > max_length:
+            return f'{FIELD_LABELS[field]}超过{max_length}个字符'
+    return None
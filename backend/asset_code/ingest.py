@@ -0,0 +1,124 @@
+"""
+盘点文件目录导入
+- 扫描目录中的 .xlsx 文件，逐个与台账（IngestedFile）比对，只导入新文件或内容有变化的文件
+- 文件大小和修改时间与台账一致时直接跳过，不读取文件内容；整个目录只查询一次台账，已导入的文件再次扫描只需毫秒级
+- 大小或修改时间变化时计算内容哈希：哈希未变（如只是被复制或 touch）只更新台账指纹，不重新导入
+- 每个文件作为一个盘点批次（文件名去掉扩展名），与上传导入相同，逐行解析后按批同步写入，
+  内容变化后重新导入只写入新增和变化的行
+- 与已导入的其他文件内容完全相同的新文件记为内容重复，不再导入
+- 文件名匹配 INGEST_EXCLUDE 的文件不导入；没有任何工作表包含条码列的文件记为导入失败
+"""
+
+import os
+import time
+import fnmatch
+import logging
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from .files import file_hash
+from .jobs import import_workbook
+from .models import IngestedFile
+from .sync import MISSING_KEEP
+
+logger = logging.getLogger(__name__)
+
+INGEST_SUFFIX = '.xlsx'
+
+
+def list_workbooks(directory, settle_seconds=0, exclude=()):
+    """目录中待检查的工作簿 [(绝对路径, stat)]，按文件名排序
+
+    跳过 Excel 打开文件时生成的 ~$ 锁文件、文件名匹配 exclude 中任一模式的文件，
+    以及最近 settle_seconds 秒内修改过、可能仍在复制中的文件。
+    """
+    now = time.time()
+    files = []
+    for entry in os.scandir(directory):
+        if not entry.name.endswith(INGEST_SUFFIX) or entry.name.startswith('~$') or not entry.is_file():
+            continue
+        if any(fnmatch.fnmatch(entry.name, pattern) for pattern in exclude):
+            continue
+        stat = entry.stat()
+        if now - stat.st_mtime < settle_seconds:
+            continue
+        files.append((os.path.abspath(entry.path), stat))
+    files.sort()
+    return files
+
+
+def ingest_file(path, stat, digest, record=None, missing=MISSING_KEEP):
+    """导入一个工作簿并写入台账，返回台账记录；导入失败时记录失败原因，不抛出异常"""
+    if record is None:
+        record = IngestedFile(path=path)
+    record.file_name = os.path.basename(path)
+    record.batch = Path(path).stem[:100]
+    record.status = IngestedFile.STATUS_RUNNING
+    record.size, record.mtime_ns, record.sha256 = stat.st_size, stat.st_mtime_ns, digest
+    record.error = ''
+    record.errors = []
+    for name in ('total_rows', 'rows_parsed', 'rows_inserted', 'rows_updated', 'rows_skipped', 'rows_error'):
+        setattr(record, name, 0)
+    record.ingested_at = timezone.now()
+    record.save()
+
+    start = time.perf_counter()
+    try:
+        import_workbook(record, path, missing=missing)
+    except Exception as e:
+        logger.exception(f"导入文件 {path} 失败")
+        record.status = IngestedFile.STATUS_FAILED
+        record.error = str(e)
+    else:
+        record.status = IngestedFile.STATUS_SUCCESS
+    record.duration = time.perf_counter() - start
+    record.save()
+    return record
+
+
+def ingest_directory(directory, missing=MISSING_KEEP, retry_failed=False, settle_seconds=None, exclude=None):
+    """扫描目录并导入新文件或有变化的文件
+
+    返回 {'files', 'unchanged', 'ingested': [台账记录], 'duplicates': [台账记录]}；
+    导入失败的文件在内容变化或 retry_failed 时重试。
+    """
+    if settle_seconds is None:
+        settle_seconds = settings.INGEST_SETTLE_SECONDS
+    if exclude is None:
+        exclude = settings.INGEST_EXCLUDE
+    files = list_workbooks(directory, settle_seconds, exclude)
+    ledger = {record.path: record for record in IngestedFile.objects.filter(path__in=[path for path, _ in files])}
+
+    result = {'files': len(files), 'unchanged': 0, 'ingested': [], 'duplicates': []}
+    for path, stat in files:
+        record = ledger.get(path)
+        retry = retry_failed and record is not None and record.status == IngestedFile.STATUS_FAILED
+        if (record is not None and not retry
+                and record.size == stat.st_size and record.mtime_ns == stat.st_mtime_ns):
+            result['unchanged'] += 1
+            continue
+
+        digest = file_hash(path)
+        if record is not None and not retry and record.sha256 == digest:
+            # 内容未变，只更新指纹，下次扫描直接跳过
+            record.size, record.mtime_ns = stat.st_size, stat.st_mtime_ns
+            record.save(update_fields=['size', 'mtime_ns'])
+            result['unchanged'] += 1
+            continue
+
+        if record is None:
+            original = (IngestedFile.objects.filter(sha256=digest, status=IngestedFile.STATUS_SUCCESS)
+                        .exclude(path=path).first())
+            if original is not None:
+                record = IngestedFile.objects.create(
+                    path=path, file_name=os.path.basename(path), batch=original.batch,
+                    status=IngestedFile.STATUS_DUPLICATE, size=stat.st_size, mtime_ns=stat.st_mtime_ns,
+                    sha256=digest, error=f'内容与已导入的 {original.file_name} 相同',
+                )
+                result['duplicates'].append(record)
+                continue
+
+        result['ingested'].append(ingest_file(path, stat, digest, record, missing=missing))
+    return result
@@ -0,0 +1,258 @@
+"""
+后台导出、导入任务
+- Web 请求只负责创建 ExportJob / ImportJob 记录（导入时把上传文件保存到磁盘）
+- run_export_worker 管理命令在独立进程中领取并执行任务，定期写回进度
+- 过期的导出文件和任务记录按 EXPORT_JOB_TTL 清理；导入文件在任务结束后删除
+- worker 中断后遗留的执行中任务在 worker 启动时记为失败，并删除未写完的文件
+"""
+
+import os
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import reset_queries
+from django.utils import timezone
+
+from .models import BarcodeSummary, ExportJob, ImportJob
+from .filters import filter_barcode_summaries
+from .exporters import iter_export_rows, EXPORT_FORMATS
+from .parallel_export import needs_split, split_id_ranges, iter_parallel_xlsx_zip
+from .importers import open_workbook, estimate_rows, iter_sheets, validate_row
+from .sync import BarcodeSummarySync, MISSING_KEEP
+
+logger = logging.getLogger(__name__)
+
+# 每写入多少行更新一次进度
+PROGRESS_INTERVAL = 5000
+
+
+def get_export_dir():
+    """导出文件目录，不存在时自动创建"""
+    export_dir = settings.EXPORT_JOB_DIR
+    os.makedirs(export_dir, exist_ok=True)
+    return export_dir
+
+
+def get_import_dir():
+    """导入文件目录，不存在时自动创建"""
+    import_dir = settings.IMPORT_JOB_DIR
+    os.makedirs(import_dir, exist_ok=True)
+    return import_dir
+
+
+def claim_next_job(model=ExportJob):
+    """领取最早的等待中任务，通过条件更新保证多个worker不会重复领取"""
+    while True:
+        job = model.objects.filter(status=model.STATUS_PENDING).order_by('created_at').first()
+        if job is None:
+            return None
+        claimed = model.objects.filter(id=job.id, status=model.STATUS_PENDING).update(
+            status=model.STATUS_RUNNING, started_at=timezone.now()
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def _count_progress(job, rows):
+    """包装行迭代器，定期把已写入行数写回任务记录"""
+    written = 0
+    for row in rows:
+        yield row
+        written += 1
+        if written % PROGRESS_INTERVAL == 0:
+            ExportJob.objects.filter(id=job.id).update(rows_written=written)
+    job.rows_written = written
+
+
+def _export_file_path(job, extension):
+    return os.path.join(get_export_dir(), f'export_job_{job.id}.{extension}')
+
+
+def run_export_job(job):
+    """执行导出任务，将文件写入导出目录；任何异常都记为任务失败并删除未写完的文件
+
+    超过 EXPORT_ZIP_THRESHOLD_ROWS 行的 xlsx 导出拆分为多个工作簿并行生成，打包为zip。
+    """
+    extension = job.export_format
+    file_path = None
+    try:
+        queryset = filter_barcode_summaries(BarcodeSummary.objects.all(), job.filters).order_by('id')
+
+        job.total_rows = queryset.count()
+        job.save(update_fields=['total_rows'])
+
+        if needs_split(job.export_format, job.total_rows):
+            extension = 'zip'
+            id_ranges = split_id_ranges(queryset, settings.EXPORT_ROWS_PER_FILE)
+
+            def part_written(rows):
+                job.rows_written += rows
+                ExportJob.objects.filter(id=job.id).update(rows_written=job.rows_written)
+
+            chunks = iter_parallel_xlsx_zip(job.filters, id_ranges, on_part=part_written)
+        else:
+            render, _ = EXPORT_FORMATS[job.export_format]
+            chunks = render(_count_progress(job, iter_export_rows(queryset)))
+
+        file_path = _export_file_path(job, extension)
+        with open(file_path, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+    except Exception as e:
+        logger.exception(f"导出任务 {job.id} 失败")
+        if file_path and os.path.exists(file_path):
+            os.remove(file_path)
+        job.status = ExportJob.STATUS_FAILED
+        job.error = str(e)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'finished_at'])
+        return job
+
+    job.status = ExportJob.STATUS_SUCCESS
+    job.file_path = file_path
+    job.file_name = f'条码汇总导出_{timezone.localtime(job.created_at).strftime("%Y%m%d_%H%M%S")}.{extension}'
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'rows_written', 'file_path', 'file_name', 'finished_at'])
+    return job
+
+
+class _ImportProgress:
+    """累计导入计数，按块同步写入数据库并回写任务进度（导入任务或目录导入记录）"""
+
+    COUNTERS = ['rows_parsed', 'rows_inserted', 'rows_updated', 'rows_skipped', 'rows_error']
+
+    def __init__(self, job, missing=MISSING_KEEP):
+        self.job = job
+        # 批次内已存在的条码按来源字段比对，有变化才更新，保留用户填写的处理结果
+        self.sync = BarcodeSummarySync(job.batch, missing=missing, chunk_size=settings.IMPORT_BATCH_SIZE)
+        self.empty = 0
+
+    def add_error(self, message):
+        self.job.rows_error += 1
+        if len(self.job.errors) < settings.IMPORT_JOB_MAX_ERRORS:
+            self.job.errors.append(message)
+
+    def skip_empty(self):
+        self.empty += 1
+
+    def add(self, data):
+        self.sync.add(data)
+        if not self.sync.pending:
+            # 刚写入一块
+            self.save()
+
+    def finish(self):
+        self.sync.finish()
+        self.save()
+
+    def save(self):
+        stats = self.sync.stats
+        self.job.rows_inserted = stats['inserted']
+        self.job.rows_updated = stats['updated']
+        self.job.rows_skipped = self.empty + stats['duplicates'] + stats['unchanged']
+        # DEBUG 模式下查询日志会保留每块完整的写入语句，大文件导入时占用大量内存
+        reset_queries()
+        type(self.job).objects.filter(id=self.job.id).update(
+            errors=self.job.errors, **{name: getattr(self.job, name) for name in self.COUNTERS}
+        )
+
+
+def import_workbook(job, path, missing=MISSING_KEEP):
+    """逐行解析工作簿的所有工作表，同步写入 job.batch，计数和错误信息写回 job
+
+    job 为已保存的导入任务或目录导入记录，需有 batch、total_rows、errors 及 _ImportProgress.COUNTERS 字段。
+    没有任何工作表包含条码列时抛出 ValueError，任务记为失败，而不是按没有数据的成功导入处理。
+    """
+    workbook = open_workbook(path)
+    try:
+        job.total_rows = estimate_rows(workbook)
+        job.save(update_fields=['total_rows'])
+
+        progress = _ImportProgress(job, missing=missing)
+        imported_sheets = 0
+        for sheet, header, rows in iter_sheets(workbook):
+            if header is None:
+                progress.add_error(f'工作表「{sheet}」缺少条码列，已跳过')
+                continue
+            imported_sheets += 1
+            for row_number, data in rows:
+                job.rows_parsed += 1
+                if not data.get('barcode'):
+                    progress.skip_empty()
+                    continue
+                error = validate_row(data)
+                if error:
+                    progress.add_error(f'工作表「{sheet}」第 {row_number} 行: {error}')
+                    continue
+                progress.add(data)
+        if not imported_sheets:
+            raise ValueError('没有包含条码列的工作表')
+        progress.finish()
+    finally:
+        workbook.close()
+
+
+def run_import_job(job):
+    """执行导入任务：逐行解析上传的工作簿，按批写入数据库，结束后删除上传文件
+
+    中途失败时已写入的块会保留；同一文件重新导入时，批次内已存在且没有变化的条码会被跳过。
+    """
+    try:
+        import_workbook(job, job.file_path)
+    except Exception as e:
+        logger.exception(f"导入任务 {job.id} 失败")
+        job.status = ImportJob.STATUS_FAILED
+        job.error = str(e)
+    else:
+        job.status = ImportJob.STATUS_SUCCESS
+    finally:
+        if job.file_path and os.path.exists(job.file_path):
+            os.remove(job.file_path)
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'finished_at', *_ImportProgress.COUNTERS, 'errors'])
+    return job
+
+
+def reclaim_stale_jobs():
+    """把开始执行超过 JOB_STALE_TIMEOUT 仍未结束的任务记为失败，并删除未写完的文件，返回处理数量
+
+    worker 进程被强制结束时任务会一直停在执行中，worker 启动时调用；超时应大于最大导出或导入的耗时，
+    避免把其他 worker 正在执行的任务误判为中断。
+    """
+    started_before = timezone.now() - timedelta(seconds=settings.JOB_STALE_TIMEOUT)
+    count = 0
+    for model in (ExportJob, ImportJob):
+        stale = model.objects.filter(status=model.STATUS_RUNNING, started_at__lt=started_before)
+        for job in stale.iterator():
+            # 导出任务的文件在成功后才写入 file_path（拆分导出为zip）；导入任务的 file_path 是上传文件
+            if model is ExportJob:
+                paths = [_export_file_path(job, extension) for extension in (job.export_format, 'zip')]
+            else:
+                paths = [job.file_path]
+            for path in paths:
+                if path and os.path.exists(path):
+                    os.remove(path)
+            claimed = model.objects.filter(id=job.id, status=model.STATUS_RUNNING).update(
+                status=model.STATUS_FAILED, error='任务执行中断（worker已退出），请重新提交', finished_at=timezone.now()
+            )
+            count += claimed
+    return count
+
+
+def cleanup_expired_jobs():
+    """删除超过保留时间的已结束任务及其文件，返回清理数量"""
+    expire_before = timezone.now() - timedelta(seconds=settings.EXPORT_JOB_TTL)
+    expired = ExportJob.objects.filter(
+        status__in=[ExportJob.STATUS_SUCCESS, ExportJob.STATUS_FAILED],
+        finished_at__lt=expire_before,
+    )
+    count = 0
+    for job in expired.iterator():
+        if job.file_path and os.path.exists(job.file_path):
+            os.remove(job.file_path)
+        job.delete()
+        count += 1
+    return count
@@ -0,0 +1,208 @@
+"""
+条码汇总实时推送（Server-Sent Events）
+- 需要由ASGI服务提供（uvicorn asset.asgi:application）；WSGI下每个连接会长期占用一个工作线程
+- 进程内广播器在有订阅者时按 LIVE_POLL_INTERVAL 检查表版本号，有变化时从变更流读取新增、修改、删除并分发，
+  不依赖外部消息服务，也能感知其他进程（WSGI服务、导入脚本）的写入
+- 订阅时可带列表接口的字段筛选条件，只推送符合条件的行；修改后不再符合条件的行推送 remove
+- 与列表接口一致，已归档的行默认不推送（归档时推送 remove），订阅 archived=true 时只推送已归档的行
+- 事件 id 即变更流游标，断线重连时浏览器自动携带 Last-Event-ID，服务端先补发断线期间的变更
+"""
+
+import json
+import time
+import asyncio
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+
+from .changefeed import decode_cursor, cursor_expired, encode_cursor, get_changes
+from .filters import BarcodeSummaryFilter, parse_result
+from .serializers import READ_FIELDS, parse_fields
+from .versioning import get_table_version
+
+# 推送连接长期存在，数据库查询放到共享线程池执行，不使用请求专属的 thread_sensitive 线程
+run_sync = partial(sync_to_async, thread_sensitive=False)
+
+# 订阅支持的筛选字段，与列表接口的字段筛选一致（精确匹配，另有归档状态 archived）
+LIVE_FILTER_FIELDS = list(BarcodeSummaryFilter.base_filters)
+
+RESYNC_EVENT = {'op': 'resync'}
+
+
+class Subscription:
+    """一个推送连接：筛选条件、输出字段和待发送事件队列"""
+
+    def __init__(self, filters, fields):
+        self.filters = filters
+        self.fields = fields
+        self.queue = asyncio.Queue(maxsize=settings.LIVE_QUEUE_SIZE)
+
+    def matches(self, data):
+        # 未指定 archived 时只匹配未归档的行
+        archived = parse_result(self.filters['archived']) if 'archived' in self.filters else False
+        if (data['archived_at'] is not None) != archived:
+            return False
+        for name, value in self.filters.items():
+            if name == 'archived':
+                continue
+            if name == 'result':
+                if data['result'] != parse_result(value):
+                    return False
+            elif data[name] != value:
+                return False
+        return True
+
+    def prepare(self, change):
+        """把变更转换为发给该订阅者的事件"""
+        event = {'op': change['op'], 'id': change['id'], 'seq': change['seq'], 'changed_at': change['changed_at']}
+        if change['op'] == 'upsert':
+            if not self.matches(change['data']):
+                event['op'] = 'remove'
+            elif self.fields:
+                event['data'] = {name: change['data'][name] for name in self.fields}
+            else:
+                event['data'] = change['data']
+        return event
+
+    def offer(self, event):
+        """放入事件队列；客户端消费过慢导致队列已满时丢弃积压，改为通知其刷新"""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC_EVENT)
+
+
+class ChangeBroker:
+    """进程内广播器：只在有订阅者时轮询，变更读取一次后分发给所有订阅者"""
+
+    def __init__(self):
+        self.subscribers = set()
+        self.last_seq = None
+        self.task = None
+        self.loop = None
+
+    async def subscribe(self, subscription):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            # 事件循环变化（如测试中重复创建）时旧任务已失效
+            self.loop, self.task, self.last_seq = loop, None, None
+        if self.last_seq is None:
+            # 变更序号取自表版本号，当前版本号之前的变更都已提交
+            self.last_seq, _ = await run_sync(get_table_version)()
+        self.subscribers.add(subscription)
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    def unsubscribe(self, subscription):
+        self.subscribers.discard(subscription)
+
+    async def run(self):
+        try:
+            while self.subscribers:
+                await asyncio.sleep(settings.LIVE_POLL_INTERVAL)
+                version, _ = await run_sync(get_table_version)()
+                if version != self.last_seq:
+                    await self.poll(version)
+        finally:
+            # 无订阅者时停止轮询，下次订阅重新定位
+            self.last_seq = None
+
+    async def poll(self, version):
+        results, _, has_more = await run_sync(get_changes)(self.last_seq, settings.LIVE_MAX_BATCH, READ_FIELDS)
+        if has_more:
+            # 批量导入等大量变更不逐行推送，通知客户端重新加载
+            self.last_seq = version
+            for subscription in list(self.subscribers):
+                subscription.offer(RESYNC_EVENT)
+            return
+        for change in results:
+            for subscription in list(self.subscribers):
+                subscription.offer(subscription.prepare(change))
+        self.last_seq = results[-1]['seq'] if results else version
+
+
+broker = ChangeBroker()
+
+
+def format_event(event):
+    """按SSE格式输出；事件 id 使用变更流游标，断线重连时据此补发"""
+    if event['op'] == 'resync':
+        return 'event: resync\ndata: {}\n\n'
+    cursor = encode_cursor(event['seq'], time.time())
+    return f"id: {cursor}\nevent: change\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+async def replay_changes(subscription, since_seq):
+    """补发 since_seq 之后的变更，返回 (事件列表, 最后的变更序号)；积压过多时返回刷新事件"""
+    results, _, has_more = await run_sync(get_changes)(since_seq, settings.LIVE_MAX_BATCH, READ_FIELDS)
+    if has_more:
+        version, _ = await run_sync(get_table_version)()
+        return [RESYNC_EVENT], version
+    last_seq = results[-1]['seq'] if results else since_seq
+    return [subscription.prepare(change) for change in results], last_seq
+
+
+async def stream_events(subscription, since):
+    await broker.subscribe(subscription)
+    try:
+        yield f"retry: {settings.LIVE_RETRY_MS}\n\n"
+
+        last_seq = 0
+        if since:
+            try:
+                since_seq, issued_at = decode_cursor(since)
+            except ValueError:
+                since_seq, issued_at = None, 0
+            if since_seq is None or cursor_expired(issued_at):
+                yield format_event(RESYNC_EVENT)
+            else:
+                events, last_seq = await replay_changes(subscription, since_seq)
+                for event in events:
+                    yield format_event(event)
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=settings.LIVE_HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                # SSE注释行作为心跳，防止代理断开空闲连接
+                yield ': ping\n\n'
+                continue
+            # 补发期间广播器也会推送同一批变更，按序号去重
+            if event.get('seq') is not None:
+                if event['seq'] <= last_seq:
+                    continue
+                last_seq = event['seq']
+            yield format_event(event)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def live_changes(request):
+    """订阅条码汇总的实时变更
+
+    参数: 与列表接口相同的字段筛选条件；fields 输出字段；cursor 或请求头 Last-Event-ID 为断线前的位置
+    """
+    user = await run_sync(get_user)(request)
+    if not user.is_authenticated:
+        return JsonResponse({'detail': '身份认证信息未提供。'}, status=401)
+    try:
+        fields = parse_fields(request.GET.get('fields'))
+    except ValidationError as e:
+        return JsonResponse(e.detail, status=400)
+
+    filters = {name: request.GET[name] for name in LIVE_FILTER_FIELDS if request.GET.get(name, '') != ''}
+    since = request.headers.get('Last-Event-ID') or request.GET.get('cursor')
+    response = StreamingHttpResponse(
+        stream_events(Subscription(filters, fields), since),
+        content_type='text/event-stream; charset=utf-8',
+    )
+    response['Cache-Control'] = 'no-cache'
+    # 关闭反向代理缓冲，事件立即送达
+    response['X-Accel-Buffering'] = 'no'
+    return response
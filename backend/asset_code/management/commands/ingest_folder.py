@@ -0,0 +1,54 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from asset_code.ingest import ingest_directory
+from asset_code.models import IngestedFile
+from asset_code.sync import MISSING_KEEP, MISSING_POLICIES
+
+
+class Command(BaseCommand):
+    help = '扫描目录中的盘点工作簿，按台账只导入新文件或内容有变化的文件（每个文件为一个盘点批次），无需交互确认'
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', nargs='?', default=str(settings.INGEST_DIR), help='扫描的目录')
+        parser.add_argument('--missing', choices=MISSING_POLICIES, default=MISSING_KEEP,
+                            help='文件重新导入时，文件中已不存在的条码: keep 保留（默认）、delete 删除、archive 归档')
+        parser.add_argument('--retry-failed', action='store_true', help='重试上次导入失败且内容未变的文件')
+        parser.add_argument('--watch', action='store_true', help='持续运行，按间隔重复扫描目录')
+        parser.add_argument('--interval', type=float, default=settings.INGEST_POLL_INTERVAL,
+                            help='--watch 时的扫描间隔（秒）')
+
+    def handle(self, *args, **options):
+        directory = options['directory']
+        if directory == str(settings.INGEST_DIR):
+            # 默认收件目录首次使用时创建，指定的其他目录不存在时报错
+            os.makedirs(directory, exist_ok=True)
+        try:
+            self.scan(directory, options)
+            while options['watch']:
+                time.sleep(options['interval'])
+                self.scan(directory, options, quiet=True)
+        except FileNotFoundError as e:
+            raise CommandError(f'目录不存在: {e.filename}')
+
+    def scan(self, directory, options, quiet=False):
+        start = time.perf_counter()
+        result = ingest_directory(directory, missing=options['missing'], retry_failed=options['retry_failed'])
+        # 重复扫描时没有新文件就不输出
+        if quiet and not result['ingested'] and not result['duplicates']:
+            return
+        for record in result['duplicates']:
+            self.stdout.write(f'{record.file_name}: {record.error}，已跳过')
+        for record in result['ingested']:
+            if record.status == IngestedFile.STATUS_FAILED:
+                self.stderr.write(f'{record.file_name}: 导入失败 {record.error}')
+                continue
+            self.stdout.write(f'{record.file_name}（批次 {record.batch}）: 新增 {record.rows_inserted}，'
+                              f'更新 {record.rows_updated}，跳过 {record.rows_skipped}，错误 {record.rows_error}，'
+                              f'耗时 {record.duration:.1f}s')
+        self.stdout.write(f'扫描 {result["files"]} 个文件: 导入 {len(result["ingested"])}，'
+                          f'内容重复 {len(result["duplicates"])}，未变化 {result["unchanged"]}，'
+                          f'用时 {(time.perf_counter() - start) * 1000:.0f}ms')
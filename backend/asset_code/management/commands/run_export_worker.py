@@ -0,0 +1,49 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from asset_code.jobs import claim_next_job, run_export_job, run_import_job, cleanup_expired_jobs, reclaim_stale_jobs
+from asset_code.changefeed import prune_tombstones
+from asset_code.models import ImportJob
+
+
+class Command(BaseCommand):
+    help = '后台任务worker：循环领取并执行等待中的导入、导出任务，同时清理过期文件和增量同步墓碑'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='处理完当前所有等待中的任务后退出')
+        parser.add_argument('--interval', type=float, default=settings.EXPORT_WORKER_POLL_INTERVAL,
+                            help='无任务时的轮询间隔（秒）')
+
+    def handle(self, *args, **options):
+        self.stdout.write('导出worker已启动')
+        reclaimed = reclaim_stale_jobs()
+        if reclaimed:
+            self.stdout.write(f'已将 {reclaimed} 个中断的任务记为失败')
+        while True:
+            removed = cleanup_expired_jobs()
+            if removed:
+                self.stdout.write(f'已清理 {removed} 个过期导出任务')
+            pruned = prune_tombstones()
+            if pruned:
+                self.stdout.write(f'已清理 {pruned} 条过期删除墓碑')
+
+            job = claim_next_job(ImportJob)
+            if job is not None:
+                self.stdout.write(f'开始导入任务 {job.id}（{job.file_name}）')
+                job = run_import_job(job)
+                self.stdout.write(f'导入任务 {job.id} 结束: {job.status}，导入 {job.rows_inserted} 行，'
+                                  f'跳过 {job.rows_skipped} 行，错误 {job.rows_error} 行')
+                continue
+
+            job = claim_next_job()
+            if job is not None:
+                self.stdout.write(f'开始导出任务 {job.id}（{job.export_format}）')
+                job = run_export_job(job)
+                self.stdout.write(f'导出任务 {job.id} 结束: {job.status}，共 {job.rows_written} 行')
+                continue
+
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.8 on 2026-10-18 20:09
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset_code', '0004_remove_barcodesummary_actual_time_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', '等待中'), ('running', '导出中'), ('success', '已完成'), ('failed', '失败')], db_index=True, default='pending', max_length=20, verbose_name='状态')),
+                ('export_format', models.CharField(default='xlsx', max_length=20, verbose_name='导出格式')),
+                ('filters', models.JSONField(blank=True, default=dict, verbose_name='筛选条件')),
+                ('total_rows', models.IntegerField(default=0, verbose_name='总行数')),
+                ('rows_written', models.IntegerField(default=0, verbose_name='已写入行数')),
+                ('file_path', models.CharField(blank=True, default='', max_length=500, verbose_name='文件路径')),
+                ('file_name', models.CharField(blank=True, default='', max_length=200, verbose_name='文件名')),
+                ('error', models.TextField(blank=True, default='', verbose_name='错误信息')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='创建时间')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='开始时间')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='完成时间')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='创建人')),
+            ],
+            options={
+                'verbose_name': '导出任务',
+                'verbose_name_plural': '导出任务',
+                'db_table': 'asset_code_export_job',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.8 on 2026-10-18 20:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+# 条码汇总表的每次插入、更新、删除都会递增版本号（SQLite触发器，覆盖bulk_create/update等批量操作）
+BUMP_VERSION_SQL = (
+    "UPDATE asset_code_table_version "
+    "SET version = version + 1, updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now') "
+    "WHERE name = 'barcode_summary';"
+)
+
+CREATE_TRIGGERS_SQL = [
+    "INSERT INTO asset_code_table_version (name, version, updated_at) "
+    "VALUES ('barcode_summary', 0, strftime('%Y-%m-%d %H:%M:%f', 'now'));",
+] + [
+    f"CREATE TRIGGER barcode_summary_version_{event.lower()} "
+    f"AFTER {event} ON asset_code_barcode_summary "
+    f"BEGIN {BUMP_VERSION_SQL} END;"
+    for event in ('INSERT', 'UPDATE', 'DELETE')
+]
+
+DROP_TRIGGERS_SQL = [
+    f"DROP TRIGGER IF EXISTS barcode_summary_version_{event.lower()};"
+    for event in ('INSERT', 'UPDATE', 'DELETE')
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset_code', '0005_export_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TableVersion',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False, verbose_name='表名')),
+                ('version', models.BigIntegerField(default=0, verbose_name='版本号')),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='更新时间')),
+            ],
+            options={
+                'verbose_name': '数据表版本',
+                'verbose_name_plural': '数据表版本',
+                'db_table': 'asset_code_table_version',
+            },
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS_SQL, DROP_TRIGGERS_SQL),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-18 20:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset_code', '0006_table_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='barcodesummary',
+            index=models.Index(fields=['created_at', 'id'], name='barcode_created_id_idx'),
+        ),
+    ]
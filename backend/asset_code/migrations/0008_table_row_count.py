@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-18 20:14
+
+from django.db import migrations, models
+
+# SQLite重建表时会校验引用该表的触发器，先删除触发器，migrate 结束后由 post_migrate 重新安装；回退删除行数列前同样先删除
+DROP_TRIGGERS_SQL = [
+    f"DROP TRIGGER IF EXISTS barcode_summary_version_{event};"
+    for event in ('insert', 'update', 'delete')
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset_code', '0007_barcode_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunSQL(DROP_TRIGGERS_SQL, migrations.RunSQL.noop),
+        migrations.AddField(
+            model_name='tableversion',
+            name='row_count',
+            field=models.BigIntegerField(default=0, verbose_name='行数'),
+        ),
+        migrations.RunSQL(migrations.RunSQL.noop, DROP_TRIGGERS_SQL),
+    ]
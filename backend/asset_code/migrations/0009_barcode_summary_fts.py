@@ -0,0 +1,35 @@
+from django.db import migrations
+
+FTS_TABLE = 'asset_code_barcode_summary_fts'
+FTS_COLUMNS = 'barcode, model, location, scanner, scan_time, remarks, user, asset_type'
+
+
+def create_fts_table(apps, schema_editor):
+    """创建 FTS5 trigram 外部内容索引并导入现有数据，同步触发器由 post_migrate 安装"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"{FTS_COLUMNS}, content='asset_code_barcode_summary', content_rowid='id', "
+        f"tokenize='trigram case_sensitive 0')"
+    )
+    schema_editor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for event in ('insert', 'update', 'delete'):
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS barcode_summary_fts_{event}")
+    schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset_code', '0008_table_row_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
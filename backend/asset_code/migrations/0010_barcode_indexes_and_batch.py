@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-18 20:18
+
+from django.db import migrations, models
+
+# 新增批次字段会在SQLite上重建条码汇总表，表上的触发器随旧表删除，migrate 结束后由 post_migrate 重新安装
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset_code', '0009_barcode_summary_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='barcodesummary',
+            name='batch',
+            field=models.CharField(blank=True, default='', max_length=100, verbose_name='盘点批次'),
+        ),
+        migrations.AddIndex(
+            model_name='barcodesummary',
+            index=models.Index(fields=['barcode'], name='barcode_barcode_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='barcodesummary',
+            index=models.Index(fields=['user', 'created_at'], name='barcode_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='barcodesummary',
+            index=models.Index(fields=['result', 'created_at'], name='barcode_result_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='barcodesummary',
+            index=models.Index(fields=['asset_type', 'result'], name='barcode_type_result_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='barcodesummary',
+            constraint=models.UniqueConstraint(condition=models.Q(('batch', ''), _negated=True), fields=('batch', 'barcode'), name='barcode_batch_barcode_uniq'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.8 on 2026-10-18 20:24
+
+import django.utils.timezone
+from django.db import migrations, models
+
+# 已有数据以 id 作为变更序号登记到变更表，并把表版本号推进到不小于最大 id，保证之后的变更序号更大
+BACKFILL_SQL = [
+    "INSERT INTO asset_code_barcode_summary_change (record_id, change_seq, deleted, changed_at) "
+    "SELECT id, id, 0, updated_at FROM asset_code_barcode_summary;",
+    "UPDATE asset_code_table_version "
+    "SET version = (SELECT COALESCE(MAX(id), 0) FROM asset_code_barcode_summary) "
+    "WHERE name = 'barcode_summary' "
+    "AND version < (SELECT COALESCE(MAX(id), 0) FROM asset_code_barcode_summary);",
+]
+
+# 版本触发器由 post_migrate 改写为同时登记变更表；回退时须先删除，否则之后重建条码汇总表会因触发器引用不存在的变更表而失败
+DROP_TRIGGERS_SQL = [
+    f"DROP TRIGGER IF EXISTS barcode_summary_version_{event};"
+    for event in ('insert', 'update', 'delete')
+]
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset_code', '0010_barcode_indexes_and_batch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BarcodeSummaryChange',
+            fields=[
+                ('record_id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='记录ID')),
+                ('change_seq', models.BigIntegerField(unique=True, verbose_name='变更序号')),
+                ('deleted', models.BooleanField(default=False, verbose_name='已删除')),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='变更时间')),
+            ],
+            options={
+                'verbose_name': '条码汇总变更记录',
+                'verbose_name_plural': '条码汇总变更记录',
+                'db_table': 'asset_code_barcode_summary_change',
+                'indexes': [models.Index(fields=['deleted', 'changed_at'], name='barcode_change_deleted_idx')],
+            },
+        ),
+        migrations.RunSQL(BACKFILL_SQL, "DELETE FROM asset_code_barcode_summary_change;"),
+        migrations.RunSQL(migrations.RunSQL.noop, DROP_TRIGGERS_SQL),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-18 20:34
+
+from django.db import migrations, models
+
+# 分组计数触发器由 post_migrate 安装；回退时须先删除，否则之后重建条码汇总表会因触发器引用不存在的计数表而失败
+DROP_TRIGGERS_SQL = [
+    f"DROP TRIGGER IF EXISTS barcode_summary_rollup_{event};"
+    for event in ('insert', 'update', 'delete')
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset_code', '0011_barcode_change_feed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BarcodeSummaryRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(max_length=50, verbose_name='统计维度')),
+                ('value', models.CharField(max_length=500, verbose_name='取值')),
+                ('count', models.BigIntegerField(default=0, verbose_name='数量')),
+            ],
+            options={
+                'verbose_name': '条码汇总分组计数',
+                'verbose_name_plural': '条码汇总分组计数',
+                'db_table': 'asset_code_barcode_summary_rollup',
+                'indexes': [models.Index(fields=['dimension', '-count'], name='barcode_rollup_count_idx')],
+                'constraints': [models.UniqueConstraint(fields=('dimension', 'value'), name='barcode_rollup_uniq')],
+            },
+        ),
+        migrations.RunSQL(migrations.RunSQL.noop, DROP_TRIGGERS_SQL),
+    ]
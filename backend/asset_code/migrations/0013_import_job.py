@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-18 20:39
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset_code', '0012_barcode_rollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', '等待中'), ('running', '导入中'), ('success', '已完成'), ('failed', '失败')], db_index=True, default='pending', max_length=20, verbose_name='状态')),
+                ('file_name', models.CharField(max_length=200, verbose_name='上传文件名')),
+                ('file_path', models.CharField(blank=True, default='', max_length=500, verbose_name='文件路径')),
+                ('batch', models.CharField(blank=True, default='', max_length=100, verbose_name='盘点批次')),
+                ('total_rows', models.IntegerField(default=0, verbose_name='预计行数')),
+                ('rows_parsed', models.IntegerField(default=0, verbose_name='已解析行数')),
+                ('rows_inserted', models.IntegerField(default=0, verbose_name='已导入行数')),
+                ('rows_skipped', models.IntegerField(default=0, verbose_name='跳过行数')),
+                ('rows_error', models.IntegerField(default=0, verbose_name='错误行数')),
+                ('errors', models.JSONField(blank=True, default=list, verbose_name='错误信息')),
+                ('error', models.TextField(blank=True, default='', verbose_name='失败原因')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='创建时间')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='开始时间')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='完成时间')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='创建人')),
+            ],
+            options={
+                'verbose_name': '导入任务',
+                'verbose_name_plural': '导入任务',
+                'db_table': 'asset_code_import_job',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-18 20:46
+
+from django.db import migrations, models
+
+# 分组计数触发器引用归档时间列，回退删除该列前先删除触发器，migrate 结束后由 post_migrate 按当前结构重新安装
+DROP_TRIGGERS_SQL = [
+    f"DROP TRIGGER IF EXISTS barcode_summary_rollup_{event};"
+    for event in ('insert', 'update', 'delete')
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset_code', '0013_import_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='barcodesummary',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='归档时间'),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='rows_updated',
+            field=models.IntegerField(default=0, verbose_name='已更新行数'),
+        ),
+        migrations.RunSQL(migrations.RunSQL.noop, DROP_TRIGGERS_SQL),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-18 21:06
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset_code', '0014_barcode_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asset_code', models.CharField(max_length=100, unique=True, verbose_name='资产编号')),
+                ('user', models.CharField(blank=True, default='', max_length=100, verbose_name='当前使用人')),
+                ('model', models.CharField(blank=True, default='', max_length=200, verbose_name='设备型号')),
+                ('source', models.CharField(blank=True, default='', max_length=200, verbose_name='来源文件')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='创建时间')),
+                ('updated_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='更新时间')),
+            ],
+            options={
+                'verbose_name': '资产数据',
+                'verbose_name_plural': '资产数据',
+                'db_table': 'asset_code_asset_record',
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2026-10-18 21:14
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset_code', '0015_asset_record'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestedFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=500, unique=True, verbose_name='文件路径')),
+                ('file_name', models.CharField(max_length=200, verbose_name='文件名')),
+                ('batch', models.CharField(blank=True, default='', max_length=100, verbose_name='盘点批次')),
+                ('status', models.CharField(choices=[('running', '导入中'), ('success', '已完成'), ('failed', '失败'), ('duplicate', '内容重复')], default='running', max_length=20, verbose_name='状态')),
+                ('size', models.BigIntegerField(default=0, verbose_name='文件大小')),
+                ('mtime_ns', models.BigIntegerField(default=0, verbose_name='修改时间（纳秒）')),
+                ('sha256', models.CharField(db_index=True, max_length=64, verbose_name='内容哈希')),
+                ('total_rows', models.IntegerField(default=0, verbose_name='预计行数')),
+                ('rows_parsed', models.IntegerField(default=0, verbose_name='已解析行数')),
+                ('rows_inserted', models.IntegerField(default=0, verbose_name='已导入行数')),
+                ('rows_updated', models.IntegerField(default=0, verbose_name='已更新行数')),
+                ('rows_skipped', models.IntegerField(default=0, verbose_name='跳过行数')),
+                ('rows_error', models.IntegerField(default=0, verbose_name='错误行数')),
+                ('errors', models.JSONField(blank=True, default=list, verbose_name='错误信息')),
+                ('error', models.TextField(blank=True, default='', verbose_name='失败原因')),
+                ('duration', models.FloatField(default=0, verbose_name='耗时（秒）')),
+                ('ingested_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='导入时间')),
+            ],
+            options={
+                'verbose_name': '目录导入记录',
+                'verbose_name_plural': '目录导入记录',
+                'db_table': 'asset_code_ingested_file',
+                'ordering': ['-ingested_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-18 21:17
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset_code', '0016_ingested_file'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('script', models.CharField(max_length=100, verbose_name='导入脚本')),
+                ('file_name', models.CharField(max_length=200, verbose_name='文件名')),
+                ('file_hash', models.CharField(max_length=64, verbose_name='文件内容哈希')),
+                ('batch', models.CharField(blank=True, default='', max_length=100, verbose_name='盘点批次')),
+                ('options', models.JSONField(blank=True, default=dict, verbose_name='运行参数')),
+                ('status', models.CharField(choices=[('running', '导入中'), ('success', '已完成'), ('failed', '失败'), ('abandoned', '已放弃')], default='running', max_length=20, verbose_name='状态')),
+                ('rows_committed', models.BigIntegerField(default=0, verbose_name='已提交到的行位置')),
+                ('chunks_committed', models.IntegerField(default=0, verbose_name='已提交块数')),
+                ('stats', models.JSONField(blank=True, default=dict, verbose_name='累计统计')),
+                ('errors', models.JSONField(blank=True, default=list, verbose_name='错误信息')),
+                ('error', models.TextField(blank=True, default='', verbose_name='失败原因')),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='开始时间')),
+                ('checkpoint_at', models.DateTimeField(blank=True, null=True, verbose_name='最近提交时间')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='完成时间')),
+                ('resumed', models.IntegerField(default=0, verbose_name='续传次数')),
+            ],
+            options={
+                'verbose_name': '导入运行记录',
+                'verbose_name_plural': '导入运行记录',
+                'db_table': 'asset_code_import_run',
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['script', 'file_hash', 'batch'], name='import_run_file_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-18 21:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset_code', '0017_import_run'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='barcodesummary',
+            index=models.Index(fields=['batch', 'barcode'], name='barcode_batch_barcode_idx'),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
 
@@ -11,6 +12,8 @@ class BarcodeSummary(models.Model):
     scanner = models.CharField('扫描人员', max_length=100, blank=True, null=True)
     scan_time = models.CharField('时间', max_length=100, blank=True, null=True)  # 字符串类型，保持原格式
     remarks = models.TextField('备注', blank=True, null=True)
+    batch = models.CharField('盘点批次', max_length=100, blank=True, default='')  # 导入时记录来源批次，空字符串表示历史数据
+    archived_at = models.DateTimeField('归档时间', blank=True, null=True)  # 同步导入时来源数据中已不存在的行
     
     # 系统字段
     created_at = models.DateTimeField('创建时间', default=timezone.now)
@@ -30,6 +33,307 @@ class BarcodeSummary(models.Model):
         verbose_name = '条码汇总'
         verbose_name_plural = '条码汇总'
         db_table = 'asset_code_barcode_summary'
+        indexes = [
+            # 默认排序及游标分页使用
+            models.Index(fields=['created_at', 'id'], name='barcode_created_id_idx'),
+            # 按条码精确查询及导入时的 barcode__in 去重查询
+            models.Index(fields=['barcode'], name='barcode_barcode_idx'),
+            # 列表页默认按使用人筛选并按创建时间排序
+            models.Index(fields=['user', 'created_at'], name='barcode_user_created_idx'),
+            # 按处理状态筛选并排序、导出未处理数据
+            models.Index(fields=['result', 'created_at'], name='barcode_result_created_idx'),
+            # 按资产类型和处理状态组合筛选
+            models.Index(fields=['asset_type', 'result'], name='barcode_type_result_idx'),
+            # 按盘点批次筛选、统计及批次对比（按条码关联两批数据）；
+            # 下方批次条码唯一约束是部分索引，batch = ? 的查询无法使用
+            models.Index(fields=['batch', 'barcode'], name='barcode_batch_barcode_idx'),
+        ]
+        constraints = [
+            # 同一盘点批次内条码唯一，使 bulk_create(ignore_conflicts=True) 能真正去重；历史数据（空批次）不受约束
+            models.UniqueConstraint(
+                fields=['batch', 'barcode'],
+                condition=~models.Q(batch=''),
+                name='barcode_batch_barcode_uniq',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.barcode} - {self.model}"
+
+
+class ExportJob(models.Model):
+    """后台导出任务"""
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCESS = 'success'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, '等待中'),
+        (STATUS_RUNNING, '导出中'),
+        (STATUS_SUCCESS, '已完成'),
+        (STATUS_FAILED, '失败'),
+    ]
+
+    status = models.CharField('状态', max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    export_format = models.CharField('导出格式', max_length=20, default='xlsx')
+    filters = models.JSONField('筛选条件', default=dict, blank=True)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, verbose_name='创建人', on_delete=models.SET_NULL, null=True, blank=True)
+
+    # 进度
+    total_rows = models.IntegerField('总行数', default=0)
+    rows_written = models.IntegerField('已写入行数', default=0)
+
+    # 结果
+    file_path = models.CharField('文件路径', max_length=500, blank=True, default='')
+    file_name = models.CharField('文件名', max_length=200, blank=True, default='')
+    error = models.TextField('错误信息', blank=True, default='')
+
+    created_at = models.DateTimeField('创建时间', default=timezone.now)
+    started_at = models.DateTimeField('开始时间', blank=True, null=True)
+    finished_at = models.DateTimeField('完成时间', blank=True, null=True)
+
+    class Meta:
+        verbose_name = '导出任务'
+        verbose_name_plural = '导出任务'
+        db_table = 'asset_code_export_job'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.id} - {self.status}"
+
+
+class ImportJob(models.Model):
+    """上传Excel的后台导入任务"""
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCESS = 'success'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, '等待中'),
+        (STATUS_RUNNING, '导入中'),
+        (STATUS_SUCCESS, '已完成'),
+        (STATUS_FAILED, '失败'),
+    ]
+
+    status = models.CharField('状态', max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    file_name = models.CharField('上传文件名', max_length=200)
+    file_path = models.CharField('文件路径', max_length=500, blank=True, default='')
+    batch = models.CharField('盘点批次', max_length=100, blank=True, default='')
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, verbose_name='创建人', on_delete=models.SET_NULL, null=True, blank=True)
+
+    # 进度
+    total_rows = models.IntegerField('预计行数', default=0)
+    rows_parsed = models.IntegerField('已解析行数', default=0)
+    rows_inserted = models.IntegerField('已导入行数', default=0)
+    rows_updated = models.IntegerField('已更新行数', default=0)  # 批次内已存在且来源字段有变化
+    rows_skipped = models.IntegerField('跳过行数', default=0)  # 空条码、文件内重复条码或与数据库一致
+    rows_error = models.IntegerField('错误行数', default=0)
+
+    # 结果
+    errors = models.JSONField('错误信息', default=list, blank=True)  # 只保留前 IMPORT_JOB_MAX_ERRORS 条
+    error = models.TextField('失败原因', blank=True, default='')
+
+    created_at = models.DateTimeField('创建时间', default=timezone.now)
+    started_at = models.DateTimeField('开始时间', blank=True, null=True)
+    finished_at = models.DateTimeField('完成时间', blank=True, null=True)
+
+    class Meta:
+        verbose_name = '导入任务'
+        verbose_name_plural = '导入任务'
+        db_table = 'asset_code_import_job'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.id} - {self.status}"
+
+
+class TableVersion(models.Model):
+    """数据表版本号和行数，由数据库触发器在每次写入时维护，用于缓存失效判断和快速计数"""
+
+    name = models.CharField('表名', max_length=100, primary_key=True)
+    version = models.BigIntegerField('版本号', default=0)
+    row_count = models.BigIntegerField('行数', default=0)
+    updated_at = models.DateTimeField('更新时间', default=timezone.now)
+
+    class Meta:
+        verbose_name = '数据表版本'
+        verbose_name_plural = '数据表版本'
+        db_table = 'asset_code_table_version'
+
+    def __str__(self):
+        return f"{self.name} - {self.version}"
+
+
+class BarcodeSummaryChange(models.Model):
+    """条码汇总变更记录，每条数据一行，由触发器在插入、更新、删除时写入最新的变更序号
+
+    变更序号取自写入后的 TableVersion.version，单调递增；删除的数据保留 deleted=True 的记录作为墓碑。
+    """
+
+    record_id = models.BigIntegerField('记录ID', primary_key=True)
+    change_seq = models.BigIntegerField('变更序号', unique=True)
+    deleted = models.BooleanField('已删除', default=False)
+    changed_at = models.DateTimeField('变更时间', default=timezone.now)
+
+    class Meta:
+        verbose_name = '条码汇总变更记录'
+        verbose_name_plural = '条码汇总变更记录'
+        db_table = 'asset_code_barcode_summary_change'
+        indexes = [
+            # 清理过期墓碑
+            models.Index(fields=['deleted', 'changed_at'], name='barcode_change_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.record_id} - {self.change_seq}"
+
+
+class BarcodeSummaryRollup(models.Model):
+    """条码汇总分组计数，由触发器在插入、更新、删除时增量维护，供统计接口在无筛选条件时直接读取
+
+    dimension 为统计维度（资产类型、处理状态、位置、扫描人员、使用人、扫描日期），
+    value 为该维度的取值，空值与空字符串合并为空字符串。
+    """
+
+    dimension = models.CharField('统计维度', max_length=50)
+    value = models.CharField('取值', max_length=500)
+    count = models.BigIntegerField('数量', default=0)
+
+    class Meta:
+        verbose_name = '条码汇总分组计数'
+        verbose_name_plural = '条码汇总分组计数'
+        db_table = 'asset_code_barcode_summary_rollup'
+        constraints = [
+            # 触发器按 (dimension, value) 冲突时累加计数
+            models.UniqueConstraint(fields=['dimension', 'value'], name='barcode_rollup_uniq'),
+        ]
+        indexes = [
+            # 按维度取数量最多的若干取值
+            models.Index(fields=['dimension', '-count'], name='barcode_rollup_count_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.dimension} - {self.value} - {self.count}"
+
+
+class AssetRecord(models.Model):
+    """资产数据（资产编号 -> 当前使用人、设备型号），按资产数据Excel的快照增量更新
+
+    条码汇总按条码关联资产编号补充使用人、型号和资产类型：新增行写入时补充，已有行在资产数据变化后补充。
+    """
+
+    asset_code = models.CharField('资产编号', max_length=100, unique=True)
+    user = models.CharField('当前使用人', max_length=100, blank=True, default='')
+    model = models.CharField('设备型号', max_length=200, blank=True, default='')
+    source = models.CharField('来源文件', max_length=200, blank=True, default='')  # 最近一次修改该行的快照
+    created_at = models.DateTimeField('创建时间', default=timezone.now)
+    updated_at = models.DateTimeField('更新时间', default=timezone.now, db_index=True)  # 取值变化时更新
+
+    class Meta:
+        verbose_name = '资产数据'
+        verbose_name_plural = '资产数据'
+        db_table = 'asset_code_asset_record'
+
+    def __str__(self):
+        return f"{self.asset_code} - {self.user}"
+
+
+class IngestedFile(models.Model):
+    """目录导入台账：记录已导入的盘点文件指纹和每个文件的导入结果
+
+    ingest_folder 扫描目录时先比对文件大小和修改时间，一致的文件直接跳过；不一致时再比对内容哈希，
+    只有新文件或内容有变化的文件才会重新导入。
+    """
+
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCESS = 'success'
+    STATUS_FAILED = 'failed'
+    STATUS_DUPLICATE = 'duplicate'
+    STATUS_CHOICES = [
+        (STATUS_RUNNING, '导入中'),
+        (STATUS_SUCCESS, '已完成'),
+        (STATUS_FAILED, '失败'),
+        (STATUS_DUPLICATE, '内容重复'),  # 与已导入的其他文件内容相同，未导入
+    ]
+
+    path = models.CharField('文件路径', max_length=500, unique=True)
+    file_name = models.CharField('文件名', max_length=200)
+    batch = models.CharField('盘点批次', max_length=100, blank=True, default='')
+    status = models.CharField('状态', max_length=20, choices=STATUS_CHOICES, default=STATUS_RUNNING)
+
+    # 文件指纹
+    size = models.BigIntegerField('文件大小', default=0)
+    mtime_ns = models.BigIntegerField('修改时间（纳秒）', default=0)
+    sha256 = models.CharField('内容哈希', max_length=64, db_index=True)
+
+    # 导入统计（字段与导入任务相同）
+    total_rows = models.IntegerField('预计行数', default=0)
+    rows_parsed = models.IntegerField('已解析行数', default=0)
+    rows_inserted = models.IntegerField('已导入行数', default=0)
+    rows_updated = models.IntegerField('已更新行数', default=0)
+    rows_skipped = models.IntegerField('跳过行数', default=0)
+    rows_error = models.IntegerField('错误行数', default=0)
+    errors = models.JSONField('错误信息', default=list, blank=True)  # 只保留前 IMPORT_JOB_MAX_ERRORS 条
+    error = models.TextField('失败原因', blank=True, default='')
+    duration = models.FloatField('耗时（秒）', default=0)
+
+    ingested_at = models.DateTimeField('导入时间', default=timezone.now)
+
+    class Meta:
+        verbose_name = '目录导入记录'
+        verbose_name_plural = '目录导入记录'
+        db_table = 'asset_code_ingested_file'
+        ordering = ['-ingested_at']
+
+    def __str__(self):
+        return f"{self.file_name} - {self.status}"
+
+
+class ImportRun(models.Model):
+    """导入脚本的运行记录和断点
+
+    导入脚本按块提交，每提交一块在同一事务中记录已提交到的行位置和累计统计；
+    脚本中途退出后，用同一文件（按内容哈希）再次运行时从断点继续，不再重复写入已提交的块。
+    """
+
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCESS = 'success'
+    STATUS_FAILED = 'failed'
+    STATUS_ABANDONED = 'abandoned'
+    STATUS_CHOICES = [
+        (STATUS_RUNNING, '导入中'),  # 进程被强制结束时保持该状态，下次运行时续传
+        (STATUS_SUCCESS, '已完成'),
+        (STATUS_FAILED, '失败'),
+        (STATUS_ABANDONED, '已放弃'),  # 指定 --restart 重新导入时，原未完成的记录不再续传
+    ]
+
+    script = models.CharField('导入脚本', max_length=100)
+    file_name = models.CharField('文件名', max_length=200)
+    file_hash = models.CharField('文件内容哈希', max_length=64)
+    batch = models.CharField('盘点批次', max_length=100, blank=True, default='')
+    options = models.JSONField('运行参数', default=dict, blank=True)  # 续传时沿用，保证分块与首次运行一致
+    status = models.CharField('状态', max_length=20, choices=STATUS_CHOICES, default=STATUS_RUNNING)
+
+    # 断点
+    rows_committed = models.BigIntegerField('已提交到的行位置', default=0)
+    chunks_committed = models.IntegerField('已提交块数', default=0)
+    stats = models.JSONField('累计统计', default=dict, blank=True)
+    errors = models.JSONField('错误信息', default=list, blank=True)  # 只保留前 IMPORT_JOB_MAX_ERRORS 条
+    error = models.TextField('失败原因', blank=True, default='')
+
+    started_at = models.DateTimeField('开始时间', default=timezone.now)
+    checkpoint_at = models.DateTimeField('最近提交时间', blank=True, null=True)
+    finished_at = models.DateTimeField('完成时间', blank=True, null=True)
+    resumed = models.IntegerField('续传次数', default=0)
+
+    class Meta:
+        verbose_name = '导入运行记录'
+        verbose_name_plural = '导入运行记录'
+        db_table = 'asset_code_import_run'
+        ordering = ['-started_at']
+        indexes = [models.Index(fields=['script', 'file_hash', 'batch'], name='import_run_file_idx')]
+
+    def __str__(self):
+        return f"{self.script} - {self.file_name} - {self.status}"
@@ -0,0 +1,269 @@
+"""
+条码汇总列表分页
+- CachedCountPagination：页码分页，总数按筛选条件和表版本缓存，可选 ?count=estimate 抽样估算
+- KeysetPagination：通过 ?pagination=cursor 启用，按 (排序字段, id) 定位，不执行 COUNT(*) 也不使用 OFFSET，
+  每页耗时与页码深度无关；next / previous 游标对数据插入保持稳定
+"""
+
+import json
+import base64
+import hashlib
+from datetime import datetime
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db.models import F, Q, Min, Max
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+from .filters import get_filter_params
+from .rollups import get_active_row_count
+from .versioning import get_table_version, get_row_count
+
+
+class KnownCountPaginator(DjangoPaginator):
+    """总数由分页类预先计算后传入，不再执行 COUNT(*)"""
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._known_count = count
+
+    @cached_property
+    def count(self):
+        return self._known_count
+
+
+class CachedCountPagination(PageNumberPagination):
+    """总数带缓存的页码分页
+
+    - 无筛选条件（默认只含未归档的行）时直接读取触发器维护的未归档行数
+    - 有筛选条件时按 (规范化筛选参数, 表版本) 缓存 COUNT(*) 结果，表有写入后自动失效
+    - ?count=estimate 且数据量较大时，按 id 区间抽样估算总数，响应中 approximate 为 true
+    """
+
+    count_query_param = 'count'
+
+    def get_filter_params(self, request, view):
+        return get_filter_params(request.query_params, getattr(view, 'filterset_class', None))
+
+    def get_cache_key(self, queryset, params, estimate):
+        version, _ = get_table_version()
+        payload = json.dumps({
+            'model': queryset.model._meta.label,
+            'params': params,
+            'version': version,
+            'estimate': estimate,
+        }, sort_keys=True, ensure_ascii=False)
+        return 'list_count:' + hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def estimate_count(self, queryset, total_rows):
+        """在均匀分布的若干 id 区间内抽样，按命中比例估算总数；样本为空时返回None"""
+        model = queryset.model
+        bounds = model.objects.aggregate(low=Min('id'), high=Max('id'))
+        if bounds['low'] is None:
+            return 0
+        windows = settings.COUNT_SAMPLE_WINDOWS
+        window_size = settings.COUNT_SAMPLE_WINDOW_SIZE
+        step = max((bounds['high'] - bounds['low'] + 1) // windows, window_size)
+
+        sample = Q()
+        for start in range(bounds['low'], bounds['high'] + 1, step):
+            sample |= Q(id__gte=start, id__lt=start + window_size)
+        sampled = model.objects.filter(sample).count()
+        if not sampled:
+            return None
+        matched = queryset.filter(sample).count()
+        return round(matched / sampled * total_rows)
+
+    def get_count(self, queryset, request, view):
+        """返回 (总数, 是否为估算值)"""
+        params = self.get_filter_params(request, view)
+        if not params:
+            row_count = get_active_row_count()
+            if row_count is not None:
+                return row_count, False
+
+        estimate = request.query_params.get(self.count_query_param) == 'estimate'
+        key = self.get_cache_key(queryset, params, estimate)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = None
+        if estimate:
+            total_rows = get_row_count() or 0
+            if total_rows >= settings.COUNT_ESTIMATE_MIN_ROWS:
+                approximate_count = self.estimate_count(queryset, total_rows)
+                if approximate_count is not None:
+                    result = (approximate_count, True)
+        if result is None:
+            result = (queryset.count(), False)
+
+        cache.set(key, result, settings.COUNT_CACHE_TIMEOUT)
+        return result
+
+    def paginate_queryset(self, queryset, request, view=None):
+        count, self.approximate = self.get_count(queryset, request, view)
+        self.django_paginator_class = partial(KnownCountPaginator, count=count)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.page.paginator.count,
+            'approximate': self.approximate,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['approximate'] = {'type': 'boolean'}
+        return response_schema
+
+
+class KeysetPagination(BasePagination):
+    """基于 (排序字段, id) 的游标分页"""
+
+    cursor_query_param = 'cursor'
+    ordering_query_param = 'ordering'
+    invalid_cursor_message = '无效的分页游标'
+
+    def __init__(self):
+        self.page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE', 20)
+
+    def get_ordering(self, request, view):
+        """取 ordering 参数中的第一个合法字段，默认使用视图的默认排序"""
+        allowed = set(getattr(view, 'ordering_fields', []))
+        for term in request.query_params.get(self.ordering_query_param, '').split(','):
+            term = term.strip()
+            if term and term.lstrip('-') in allowed:
+                return term
+        return view.ordering[0]
+
+    def encode_cursor(self, values, reverse):
+        payload = json.dumps({'v': values, 'r': int(reverse)}, default=str)
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            value, pk = payload['v']
+            return value, int(pk), bool(payload['r'])
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _order_terms(self, descending):
+        field = F(self.field)
+        if self.nullable:
+            # 显式指定NULL位置，保证与游标比较条件一致：升序NULL在前，降序NULL在后
+            field = field.desc(nulls_last=True) if descending else field.asc(nulls_first=True)
+        else:
+            field = field.desc() if descending else field.asc()
+        return [field, F('id').desc() if descending else F('id').asc()]
+
+    def _after(self, value, pk, descending):
+        """位于 (value, pk) 之后的行（按给定方向）"""
+        id_after = Q(id__lt=pk) if descending else Q(id__gt=pk)
+        if value is None:
+            condition = Q(**{f'{self.field}__isnull': True}) & id_after
+            if not descending:
+                condition |= Q(**{f'{self.field}__isnull': False})
+            return condition
+        beyond = f'{self.field}__lt' if descending else f'{self.field}__gt'
+        within = f'{self.field}__lte' if descending else f'{self.field}__gte'
+        # 先用可走索引的范围条件限定起点，避免 OR 条件导致逐行过滤
+        condition = Q(**{within: value}) & (Q(**{beyond: value}) | (Q(**{self.field: value}) & id_after))
+        if descending and self.nullable:
+            condition |= Q(**{f'{self.field}__isnull': True})
+        return condition
+
+    def _parse_value(self, value):
+        if value is not None and self.model_field.get_internal_type() == 'DateTimeField':
+            parsed = parse_datetime(value)
+            if parsed is None:
+                raise NotFound(self.invalid_cursor_message)
+            return parsed
+        return value
+
+    def _position(self, row):
+        # 列表可能以 .values() 字典形式分页
+        if isinstance(row, dict):
+            value, pk = row[self.field], row['id']
+        else:
+            value, pk = getattr(row, self.field), row.pk
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        return [value, pk]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        ordering = self.get_ordering(request, view)
+        self.field = ordering.lstrip('-')
+        self.model_field = queryset.model._meta.get_field(self.field)
+        self.nullable = self.model_field.null
+        descending = ordering.startswith('-')
+
+        cursor = self.decode_cursor(request)
+        reverse = cursor[2] if cursor else False
+        # 向前翻页时反向查询，取到结果后再翻转回正常顺序
+        scan_descending = descending != reverse
+
+        queryset = queryset.order_by(*self._order_terms(scan_descending))
+        if cursor:
+            value, pk, _ = cursor
+            queryset = queryset.filter(self._after(self._parse_value(value), pk, scan_descending))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.has_next = has_more if not reverse else cursor is not None
+        self.has_previous = has_more if reverse else cursor is not None
+        self.rows = rows
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next or not self.rows:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param,
+                                   self.encode_cursor(self._position(self.rows[-1]), reverse=False))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        url = self.request.build_absolute_uri()
+        if not self.rows:
+            return remove_query_param(url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param,
+                                   self.encode_cursor(self._position(self.rows[0]), reverse=True))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
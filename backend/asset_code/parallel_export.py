@@ -0,0 +1,117 @@
+"""
+超大结果集的拆分导出
+- xlsx 结果不超过 EXPORT_ZIP_THRESHOLD_ROWS 行时，生成单个工作簿，超出单表行数上限的部分自动拆分到多个工作表
+- 超过阈值时不在Web请求中生成：导出接口改为创建后台导出任务，由 run_export_worker 按 id 区间拆成多个工作簿，
+  用进程池并行生成，再按顺序打包成一个 zip。Web服务是多线程进程，在其中 fork 子进程不安全，且单个请求会占满所有CPU
+"""
+
+import os
+import shutil
+import zipfile
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.db.models import F, Window
+from django.db.models.functions import Mod, RowNumber
+
+from .models import BarcodeSummary
+from .filters import filter_barcode_summaries
+from .exporters import iter_export_rows, iter_xlsx, StreamBuffer
+
+# 拷贝分片文件到zip时每次读取的字节数
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def needs_split(export_format, total_rows):
+    """结果是否需要拆分为多个工作簿打包为zip（只能由后台导出任务生成）"""
+    return export_format == 'xlsx' and total_rows > settings.EXPORT_ZIP_THRESHOLD_ROWS
+
+
+def split_id_ranges(queryset, rows_per_part):
+    """按 id 顺序把查询集切分为若干 [起始id, 结束id) 区间，每段最多 rows_per_part 行
+
+    用 ROW_NUMBER() 窗口函数一次扫描取出每段的起始 id，不按段执行 OFFSET 查询（总耗时随分段数平方增长）。
+    """
+    boundaries = list(
+        queryset.order_by()
+        .annotate(position=Window(RowNumber(), order_by=F('id').asc()))
+        .annotate(slot=Mod(F('position') - 1, rows_per_part))
+        .filter(slot=0)
+        .order_by('id')
+        .values_list('id', flat=True)
+    )
+    return [
+        (start, boundaries[index + 1] if index + 1 < len(boundaries) else None)
+        for index, start in enumerate(boundaries)
+    ]
+
+
+def _init_part_worker():
+    """子进程初始化：spawn/forkserver 启动方式下需要重新加载Django"""
+    if not apps.ready:
+        django.setup()
+
+
+def write_xlsx_part(params, id_from, id_to, path):
+    """在子进程中把一个 id 区间导出为独立的工作簿文件，返回 (写入路径, 行数)"""
+    queryset = filter_barcode_summaries(BarcodeSummary.objects.all(), params).filter(id__gte=id_from)
+    if id_to is not None:
+        queryset = queryset.filter(id__lt=id_to)
+    rows = 0
+
+    def counted(values):
+        nonlocal rows
+        for row in values:
+            rows += 1
+            yield row
+
+    try:
+        with open(path, 'wb') as f:
+            for chunk in iter_xlsx(counted(iter_export_rows(queryset.order_by('id')))):
+                f.write(chunk)
+    finally:
+        connections.close_all()
+    return path, rows
+
+
+def iter_parallel_xlsx_zip(params, id_ranges, on_part=None):
+    """并行生成各分片工作簿，并按顺序写入一个流式zip；每个分片写入zip后以该分片行数调用 on_part"""
+    temp_dir = tempfile.mkdtemp(prefix='asset_export_')
+    buffer = StreamBuffer()
+
+    # SQLite连接不能跨进程复用，创建子进程前先关闭当前连接
+    connections.close_all()
+    executor = ProcessPoolExecutor(
+        max_workers=min(settings.EXPORT_PARALLEL_WORKERS, len(id_ranges)),
+        initializer=_init_part_worker,
+    )
+    try:
+        futures = [
+            executor.submit(write_xlsx_part, params, id_from, id_to,
+                            os.path.join(temp_dir, f'part{index:03d}.xlsx'))
+            for index, (id_from, id_to) in enumerate(id_ranges, start=1)
+        ]
+
+        # xlsx本身已压缩，zip中直接存储
+        with zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+            for index, future in enumerate(futures, start=1):
+                path, rows = future.result()
+                with open(path, 'rb') as part, \
+                        archive.open(f'条码汇总导出_part{index:03d}.xlsx', mode='w', force_zip64=True) as entry:
+                    while True:
+                        data = part.read(COPY_CHUNK_SIZE)
+                        if not data:
+                            break
+                        entry.write(data)
+                        yield buffer.pop()
+                os.remove(path)
+                if on_part is not None:
+                    on_part(rows)
+        yield buffer.pop()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        shutil.rmtree(temp_dir, ignore_errors=True)
@@ -0,0 +1,110 @@
+"""
+条码汇总统计（分组计数）
+- 触发器在每次插入、更新、删除时增量维护 BarcodeSummaryRollup，无筛选条件的统计只读取该表，耗时与数据量无关
+- 分组计数只统计未归档的行，与列表接口的默认结果一致；另以 total 维度记录未归档的总行数
+- 带筛选或搜索条件时对筛选结果分组统计，筛选字段上的索引可以缩小扫描范围
+- 空值与空字符串合并统计；扫描日期取扫描时间的前10个字符（YYYY-MM-DD）
+"""
+
+from django.db.models import CharField, Count, F, Value
+from django.db.models.functions import Coalesce, Substr
+
+from .models import BarcodeSummaryRollup
+from .versioning import get_row_count
+
+ROLLUP_TABLE = 'asset_code_barcode_summary_rollup'
+
+# 支持分组计数的字段
+FACET_FIELDS = ['asset_type', 'result', 'location', 'scanner', 'user']
+
+DAY_DIMENSION = 'scan_day'
+
+TOTAL_DIMENSION = 'total'
+
+# 各统计维度取值的SQL表达式，{row} 为触发器中的 new/old 或重建时的表名
+ROLLUP_DIMENSIONS = {
+    **{field: f"COALESCE({{row}}.{field}, '')" for field in FACET_FIELDS},
+    DAY_DIMENSION: "substr(COALESCE({row}.scan_time, ''), 1, 10)",
+    TOTAL_DIMENSION: "''",
+}
+
+
+def get_active_row_count():
+    """读取触发器维护的未归档行数，分组计数未由触发器维护时返回None"""
+    total = (BarcodeSummaryRollup.objects
+             .filter(dimension=TOTAL_DIMENSION)
+             .values_list('count', flat=True)
+             .first())
+    if total is not None:
+        return total
+    # 没有任何未归档的行时计数表中不存在该维度
+    return None if get_row_count() is None else 0
+
+
+def _facet_value(field, value):
+    # 分组计数表中的处理状态以 '0'/'1' 保存
+    if field == 'result':
+        return value in (True, 1, '1')
+    return value
+
+
+def _rollup_aggregates(facets, limit, days):
+    result = {}
+    for field in facets:
+        rows = (BarcodeSummaryRollup.objects
+                .filter(dimension=field, count__gt=0)
+                .order_by('-count', 'value')
+                .values_list('value', 'count')[:limit])
+        result[field] = [{'value': _facet_value(field, value), 'count': count} for value, count in rows]
+    daily = (BarcodeSummaryRollup.objects
+             .filter(dimension=DAY_DIMENSION, count__gt=0)
+             .exclude(value='')
+             .order_by('-value')
+             .values_list('value', 'count')[:days])
+    return result, list(daily)
+
+
+def _query_aggregates(queryset, facets, limit, days):
+    queryset = queryset.order_by()
+    result = {}
+    for field in facets:
+        if field == 'result':
+            value = F('result')
+        else:
+            value = Coalesce(field, Value(''), output_field=CharField())
+        rows = (queryset
+                .annotate(facet_value=value)
+                .values('facet_value')
+                .annotate(count=Count('id'))
+                .order_by('-count', 'facet_value')
+                .values_list('facet_value', 'count')[:limit])
+        result[field] = [{'value': _facet_value(field, value), 'count': count} for value, count in rows]
+    daily = (queryset
+             .annotate(day=Substr(Coalesce('scan_time', Value(''), output_field=CharField()), 1, 10))
+             .exclude(day='')
+             .values('day')
+             .annotate(count=Count('id'))
+             .order_by('-day')
+             .values_list('day', 'count')[:days])
+    return result, list(daily)
+
+
+def get_aggregates(queryset, facets, limit, days, filtered=True):
+    """统计总数、各字段取值数量最多的 limit 个取值，以及最近 days 个扫描日期的数量
+
+    filtered 为 False 表示 queryset 是默认结果集（全部未归档的行），此时若分组计数表由触发器维护则直接读取该表。
+    """
+    row_count = None if filtered else get_active_row_count()
+    if row_count is not None:
+        total, source = row_count, 'rollup'
+        facet_counts, daily = _rollup_aggregates(facets, limit, days)
+    else:
+        total, source = queryset.count(), 'query'
+        facet_counts, daily = _query_aggregates(queryset, facets, limit, days)
+    return {
+        'total': total,
+        'facets': facet_counts,
+        # 按日期升序，便于前端直接绘制趋势
+        'daily': [{'date': day, 'count': count} for day, count in reversed(daily)],
+        'source': source,
+    }
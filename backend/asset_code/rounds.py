@@ -0,0 +1,123 @@
+"""
+盘点批次（每一轮盘点）列表与批次对比
+- 导入时记录盘点批次：上传导入、目录导入和导入脚本默认以文件名为批次；空批次为未分批的历史数据，不参与对比
+- 批次对比以 (batch, barcode) 索引按条码关联两批数据，新出现、消失、位置变化、扫描人员变化各为一条集合查询，
+  不把任一批次载入内存；明细按条码键集分页，每页只沿索引读取到凑满一页为止
+- 已归档的行（同步导入时来源文件中已不存在）不计入批次
+"""
+
+from django.db import connection
+from django.db.models import Count, Max, Min
+
+from .models import BarcodeSummary
+
+DIFF_APPEARED = 'appeared'  # 对比批次中新出现的条码
+DIFF_DISAPPEARED = 'disappeared'  # 基准批次中有、对比批次中没有的条码
+DIFF_MOVED = 'moved'  # 两批都有但位置不同
+DIFF_SCANNER = 'scanner_changed'  # 两批都有但扫描人员不同
+DIFF_CHANGES = [DIFF_APPEARED, DIFF_DISAPPEARED, DIFF_MOVED, DIFF_SCANNER]
+
+# 对比明细中每批返回的字段
+SIDE_FIELDS = ['id', 'location', 'scanner', 'scan_time']
+
+
+def list_rounds():
+    """盘点批次列表：条码数和导入时间范围，按最近导入在前"""
+    rows = (BarcodeSummary.objects
+            .exclude(batch='')
+            .filter(archived_at__isnull=True)
+            .values('batch')
+            .annotate(count=Count('id'), first_created=Min('created_at'), last_created=Max('created_at'))
+            .order_by('-last_created', 'batch'))
+    return list(rows)
+
+
+def _table():
+    return connection.ops.quote_name(BarcodeSummary._meta.db_table)
+
+
+def _in_round(alias):
+    # barcode > '' 同时排除空值和空字符串，并可沿 (batch, barcode) 索引按条码顺序读取
+    return f"{alias}.batch = %s AND {alias}.archived_at IS NULL AND {alias}.barcode > %s"
+
+
+def _join_base(table):
+    # +b.barcode 阻止SQLite把 b.barcode > ? 传递为 a.barcode > ?：否则基准批次按条码范围扫描而不是按条码等值查找，
+    # 对比耗时随批次行数平方增长
+    return f"JOIN {table} AS a ON a.batch = %s AND a.barcode = +b.barcode AND a.archived_at IS NULL"
+
+
+def diff_counts(base, target):
+    """两批对比的数量：{'base', 'target', 'matched', 'appeared', 'disappeared', 'moved', 'scanner_changed'}"""
+    table = _table()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT COUNT(*), "
+            f"COALESCE(SUM(COALESCE(a.location, '') != COALESCE(b.location, '')), 0), "
+            f"COALESCE(SUM(COALESCE(a.scanner, '') != COALESCE(b.scanner, '')), 0) "
+            f"FROM {table} AS b {_join_base(table)} "
+            f"WHERE {_in_round('b')}",
+            [base, target, ''],
+        )
+        matched, moved, scanner_changed = cursor.fetchone()
+        totals = {}
+        for name, batch in (('base', base), ('target', target)):
+            cursor.execute(f"SELECT COUNT(*) FROM {table} AS b WHERE {_in_round('b')}", [batch, ''])
+            totals[name] = cursor.fetchone()[0]
+    return {
+        **totals,
+        'matched': matched,
+        DIFF_APPEARED: totals['target'] - matched,
+        DIFF_DISAPPEARED: totals['base'] - matched,
+        DIFF_MOVED: moved,
+        DIFF_SCANNER: scanner_changed,
+    }
+
+
+def diff_rows(base, target, change, after='', limit=500):
+    """某一类变化的明细，按条码排序，返回条码大于 after 的前 limit 行
+
+    每行为 {'barcode', 'model', 'base': {...} 或 None, 'target': {...} 或 None}，两批各含 SIDE_FIELDS。
+    """
+    if change not in DIFF_CHANGES:
+        raise ValueError(f'不支持的对比类型: {change}')
+    table = _table()
+    columns = ', '.join(f'{{side}}.{field}' for field in SIDE_FIELDS)
+
+    if change in (DIFF_APPEARED, DIFF_DISAPPEARED):
+        # 在一批中沿索引按条码顺序读取，另一批中按 (batch, barcode) 查找不到的行
+        present, absent = (target, base) if change == DIFF_APPEARED else (base, target)
+        sql = (
+            f"SELECT b.barcode, b.model, {columns.format(side='b')} FROM {table} AS b "
+            f"WHERE {_in_round('b')} AND NOT EXISTS ("
+            f"SELECT 1 FROM {table} AS a WHERE a.batch = %s AND a.barcode = b.barcode AND a.archived_at IS NULL) "
+            f"ORDER BY b.barcode LIMIT %s"
+        )
+        params = [present, after, absent, limit]
+    else:
+        field = 'location' if change == DIFF_MOVED else 'scanner'
+        sql = (
+            f"SELECT b.barcode, b.model, {columns.format(side='a')}, {columns.format(side='b')} "
+            f"FROM {table} AS b {_join_base(table)} "
+            f"WHERE {_in_round('b')} AND COALESCE(a.{field}, '') != COALESCE(b.{field}, '') "
+            f"ORDER BY b.barcode LIMIT %s"
+        )
+        params = [base, target, after, limit]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    size = len(SIDE_FIELDS)
+    results = []
+    for row in rows:
+        barcode, model, *values = row
+        sides = [dict(zip(SIDE_FIELDS, values[i:i + size])) for i in range(0, len(values), size)]
+        if change == DIFF_APPEARED:
+            base_side, target_side = None, sides[0]
+        elif change == DIFF_DISAPPEARED:
+            base_side, target_side = sides[0], None
+        else:
+            base_side, target_side = sides
+        results.append({'barcode': barcode, 'model': model, 'base': base_side, 'target': target_side})
+    return results
@@ -0,0 +1,50 @@
+"""
+条码汇总全文检索
+- 使用 SQLite FTS5 trigram 分词建立外部内容索引，MATCH 短语即子串匹配，与 icontains 语义一致
+- 索引由 triggers.py 中的触发器与主表保持同步
+- 少于3个字符的关键字无法使用 trigram 索引，以及非 SQLite 数据库时回退为 icontains
+"""
+
+from django.db import connection, models
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+# 关键字搜索覆盖的字段
+SEARCH_FIELDS = ['barcode', 'model', 'location', 'scanner', 'scan_time', 'remarks', 'user', 'asset_type']
+
+FTS_TABLE = 'asset_code_barcode_summary_fts'
+
+# trigram 分词的最小可检索长度
+FTS_MIN_LENGTH = 3
+
+
+def fts_available():
+    return connection.vendor == 'sqlite'
+
+
+def _fts_phrase(term):
+    """将关键字转为 FTS5 短语，双引号需要转义"""
+    return '"' + term.replace('"', '""') + '"'
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """列表接口的搜索过滤器：保持 SearchFilter 的分词语义（多个关键字同时匹配），每个关键字走全文索引"""
+
+    def filter_queryset(self, request, queryset, view):
+        for term in self.get_search_terms(request):
+            queryset = search_barcode_summaries(queryset, term)
+        return queryset
+
+
+def search_barcode_summaries(queryset, term):
+    """按关键字在全部检索字段中做子串匹配"""
+    if not term:
+        return queryset
+    if fts_available() and len(term) >= FTS_MIN_LENGTH:
+        matched_ids = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [_fts_phrase(term)])
+        return queryset.filter(id__in=matched_ids)
+
+    condition = models.Q()
+    for field in SEARCH_FIELDS:
+        condition |= models.Q(**{f'{field}__icontains': term})
+    return queryset.filter(condition)
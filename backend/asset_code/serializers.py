@@ -1,10 +1,162 @@
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
-from .models import BarcodeSummary
+from .models import BarcodeSummary, ExportJob, ImportJob
+from .filters import EXPORT_FILTER_PARAMS
+from .exporters import EXPORT_FORMATS
+
+# 列表可返回的字段，顺序与 fields = '__all__' 一致
+READ_FIELDS = [field.name for field in BarcodeSummary._meta.concrete_fields]
+
+# 需要按DRF规则格式化的日期时间字段
+DATETIME_FIELDS = {
+    field.name for field in BarcodeSummary._meta.concrete_fields
+    if field.get_internal_type() == 'DateTimeField'
+}
+
+
+def parse_fields(value):
+    """解析 fields=barcode,model；未指定时返回None表示全部字段，id 总是返回"""
+    names = [name.strip() for name in (value or '').split(',') if name.strip()]
+    if not names:
+        return None
+    unknown = set(names) - set(READ_FIELDS)
+    if unknown:
+        raise serializers.ValidationError({'fields': f'不支持的字段: {", ".join(sorted(unknown))}'})
+    return list(dict.fromkeys(['id', *names]))
+
 
 class BarcodeSummarySerializer(serializers.ModelSerializer):
-    """条码汇总数据序列化器"""
+    """条码汇总数据序列化器，可通过 fields 参数只输出部分字段"""
     
     class Meta:
         model = BarcodeSummary
         fields = '__all__'
-        read_only_fields = ['barcode', 'model', 'location', 'scanner', 'scan_time', 'created_at', 'updated_at']
\ No newline at end of file
+        read_only_fields = ['barcode', 'model', 'location', 'scanner', 'scan_time', 'batch', 'archived_at',
+                            'created_at', 'updated_at']
+    
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class BarcodeSummaryReadSerializer(serializers.BaseSerializer):
+    """列表只读序列化器
+    
+    直接读取 .values() 返回的字典，只对日期时间字段做格式转换，输出与 BarcodeSummarySerializer 一致，
+    省去构造模型实例和逐字段调用DRF字段对象的开销。
+    """
+    
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.field_names = list(fields) if fields else READ_FIELDS
+        # 时区只解析一次；DRF默认对每个值调用 get_current_timezone()，是列表序列化的主要开销
+        datetime_field = serializers.DateTimeField(
+            default_timezone=timezone.get_current_timezone() if settings.USE_TZ else None
+        )
+        self.datetime_names = [name for name in self.field_names if name in DATETIME_FIELDS]
+        self.to_datetime = datetime_field.to_representation
+    
+    def to_representation(self, row):
+        data = {name: row[name] for name in self.field_names}
+        for name in self.datetime_names:
+            if data[name] is not None:
+                data[name] = self.to_datetime(data[name])
+        return data
+
+
+# 批量处理允许修改的字段
+BULK_UPDATE_FIELDS = ['result', 'expected_time', 'result_remarks']
+
+
+class BarcodeSummaryBulkValuesSerializer(serializers.ModelSerializer):
+    """批量处理的修改内容，字段校验规则与单条编辑一致，至少修改一个字段"""
+    
+    class Meta:
+        model = BarcodeSummary
+        fields = BULK_UPDATE_FIELDS
+        extra_kwargs = {name: {'required': False} for name in BULK_UPDATE_FIELDS}
+    
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError(f'至少需要修改一个字段: {", ".join(BULK_UPDATE_FIELDS)}')
+        return attrs
+
+
+class BarcodeSummaryBulkItemSerializer(BarcodeSummaryBulkValuesSerializer):
+    """按行指定修改内容时的一行"""
+    
+    id = serializers.IntegerField()
+    
+    class Meta(BarcodeSummaryBulkValuesSerializer.Meta):
+        fields = ['id', *BULK_UPDATE_FIELDS]
+    
+    def validate(self, attrs):
+        if len(attrs) == 1:
+            raise serializers.ValidationError(f'至少需要修改一个字段: {", ".join(BULK_UPDATE_FIELDS)}')
+        return attrs
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    """导出任务序列化器"""
+    
+    percent = serializers.SerializerMethodField()
+    eta_seconds = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ExportJob
+        fields = ['id', 'status', 'export_format', 'filters', 'total_rows', 'rows_written',
+                  'percent', 'eta_seconds', 'file_name', 'error', 'created_at', 'started_at', 'finished_at']
+        read_only_fields = ['status', 'total_rows', 'rows_written', 'file_name', 'error',
+                            'created_at', 'started_at', 'finished_at']
+    
+    def validate_export_format(self, value):
+        if value not in EXPORT_FORMATS:
+            raise serializers.ValidationError(f'不支持的导出格式: {value}')
+        return value
+    
+    def validate_filters(self, value):
+        if not isinstance(value, dict):
+            raise serializers.ValidationError('筛选条件必须是对象')
+        unknown = set(value) - set(EXPORT_FILTER_PARAMS)
+        if unknown:
+            raise serializers.ValidationError(f'不支持的筛选条件: {", ".join(sorted(unknown))}')
+        # 统一转为字符串，与查询参数的语义保持一致
+        return {key: str(val) for key, val in value.items() if val is not None and val != ''}
+    
+    def get_percent(self, obj):
+        if obj.status == ExportJob.STATUS_SUCCESS:
+            return 100.0
+        if not obj.total_rows:
+            return 0.0
+        return round(min(obj.rows_written / obj.total_rows, 1) * 100, 1)
+    
+    def get_eta_seconds(self, obj):
+        """按当前写入速度估算剩余秒数"""
+        if obj.status != ExportJob.STATUS_RUNNING or not obj.started_at or not obj.rows_written:
+            return None
+        elapsed = (timezone.now() - obj.started_at).total_seconds()
+        remaining = max(obj.total_rows - obj.rows_written, 0)
+        return round(elapsed / obj.rows_written * remaining, 1)
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    """导入任务序列化器（只读，任务由上传接口创建）"""
+    
+    percent = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ImportJob
+        fields = ['id', 'status', 'file_name', 'batch', 'total_rows', 'rows_parsed', 'rows_inserted',
+                  'rows_updated', 'rows_skipped', 'rows_error', 'percent', 'errors', 'error', 'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
+    
+    def get_percent(self, obj):
+        if obj.status == ImportJob.STATUS_SUCCESS:
+            return 100.0
+        if not obj.total_rows:
+            return 0.0
+        # 预计行数来自工作表记录的数据范围，可能偏小
+        return round(min(obj.rows_parsed / obj.total_rows, 0.99) * 100, 1)
@@ -1,3 +1,1362 @@
-from django.test import TestCase
+import io
+import sys
+import os
+import csv
+import json
+import codecs
+import re
+import time
+import zipfile
+import tempfile
+import importlib
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock, skipUnless
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from django.conf import settings
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import F, Q
+from asgiref.sync import async_to_sync
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from openpyxl import Workbook, load_workbook
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from .changefeed import decode_cursor, encode_cursor
+from .enrichment import ENRICH_ASSET_TYPE, enrich_barcode_summaries, load_asset_records, lookup_asset
+from .export_cache import evict_cache
+from .exporters import (CSV_CONTENT_TYPE, EXPORT_HEADERS, NDJSON_CONTENT_TYPE, XLSX_CONTENT_TYPE, iter_ndjson,
+                        iter_xlsx)
+from .filters import BarcodeSummaryFilter, filter_barcode_summaries
+from .import_runs import finish_run, save_checkpoint, start_run
+from .importers import find_header, iter_row_range, normalize_row, open_workbook
+from .ingest import ingest_directory
+from .jobs import (claim_next_job, cleanup_expired_jobs, get_export_dir, reclaim_stale_jobs, run_export_job,
+                   run_import_job)
+from .live import ChangeBroker, Subscription
+from .models import AssetRecord, BarcodeSummary, ExportJob, ImportJob, ImportRun, IngestedFile
+from .pagination import KeysetPagination
+from .parallel_export import split_id_ranges
+from .rollups import FACET_FIELDS, get_aggregates
+from .rounds import DIFF_MOVED, diff_counts, diff_rows
+from .search import FTS_TABLE, SEARCH_FIELDS, search_barcode_summaries
+from .serializers import BarcodeSummarySerializer
+from .sync import MISSING_ARCHIVE, MISSING_DELETE, MISSING_KEEP, BarcodeSummarySync
+from .versioning import get_table_version
+from .views import BarcodeSummaryImportView, BarcodeSummaryViewSet, ExportJobViewSet, ImportJobViewSet
+
+
+@skipUnless(connection.vendor == 'sqlite', '查询计划断言基于SQLite的EXPLAIN QUERY PLAN输出')
+class BarcodeSummaryQueryPlanTests(TestCase):
+    """列表、筛选和导出的主要查询必须走索引，不能全表扫描"""
+
+    TABLE = 'asset_code_barcode_summary'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='tester')
+        BarcodeSummary.objects.bulk_create([
+            BarcodeSummary(
+                barcode=f'BC{index:06d}',
+                model=f'型号{index % 7}',
+                location=f'位置{index % 11}',
+                scanner='扫描员',
+                scan_time='2025-11-11',
+                user=f'用户{index % 5}',
+                asset_type=f'类型{index % 3}',
+                result=index % 2 == 0,
+            )
+            for index in range(200)
+        ])
+
+    def list_queryset(self, params):
+        """按列表接口的过滤、搜索、排序逻辑构造查询集"""
+        request = APIRequestFactory().get('/api/asset-code/barcode-summaries/', params)
+        force_authenticate(request, user=self.user)
+        view = BarcodeSummaryViewSet(action_map={'get': 'list'}, format_kwarg=None, args=(), kwargs={})
+        view.request = view.initialize_request(request)
+        return view.filter_queryset(view.get_queryset())
+
+    def assertUsesIndex(self, queryset, index=None):
+        plan = queryset.explain()
+        for line in plan.splitlines():
+            # 对主表的 SCAN 必须带 USING INDEX，否则是全表扫描
+            if re.search(rf'SCAN {self.TABLE}\b', line):
+                self.assertIn('USING', line, plan)
+        self.assertRegex(plan, r'USING (COVERING )?INDEX|USING INTEGER PRIMARY KEY|VIRTUAL TABLE INDEX', plan)
+        if index:
+            self.assertIn(index, plan)
+
+    def test_default_list_uses_created_index(self):
+        self.assertUsesIndex(self.list_queryset({})[:20], 'barcode_created_id_idx')
+
+    def test_filter_by_user_uses_user_created_index(self):
+        self.assertUsesIndex(self.list_queryset({'user': '用户1'})[:20], 'barcode_user_created_idx')
+
+    def test_filter_by_result_uses_result_created_index(self):
+        self.assertUsesIndex(self.list_queryset({'result': 'false'})[:20], 'barcode_result_created_idx')
+
+    def test_count_by_asset_type_and_result_uses_composite_index(self):
+        # 分页总数查询不排序，按资产类型+处理状态组合筛选时走覆盖索引
+        queryset = self.list_queryset({'asset_type': '类型1', 'result': 'true'})
+        self.assertUsesIndex(queryset.order_by().values('id'), 'barcode_type_result_idx')
+        self.assertEqual(queryset.count(), BarcodeSummary.objects.filter(asset_type='类型1', result=True).count())
+
+    def test_filter_by_barcode_uses_barcode_index(self):
+        self.assertUsesIndex(self.list_queryset({'barcode': 'BC000042'}), 'barcode_barcode_idx')
+        self.assertUsesIndex(BarcodeSummary.objects.filter(barcode__in=['BC000001', 'BC000002']),
+                             'barcode_barcode_idx')
+
+    def test_search_uses_full_text_index(self):
+        self.assertUsesIndex(self.list_queryset({'search': '000042'})[:20])
+
+    def test_cursor_page_uses_created_index(self):
+        paginator = KeysetPagination()
+        last = BarcodeSummary.objects.order_by('-created_at', '-id')[19]
+        cursor = paginator.encode_cursor([last.created_at.isoformat(), last.id], reverse=False)
+        request = APIRequestFactory().get('/api/asset-code/barcode-summaries/',
+                                          {'pagination': 'cursor', 'cursor': cursor})
+        force_authenticate(request, user=self.user)
+        view = BarcodeSummaryViewSet.as_view({'get': 'list'})
+        # 版本号（ETag）+ 当前页，不执行 COUNT(*)
+        with self.assertNumQueries(2):
+            response = view(request)
+        self.assertEqual(response.status_code, 200)
+
+        paginator.field, paginator.nullable = 'created_at', False
+        queryset = BarcodeSummary.objects.order_by(*paginator._order_terms(True)).filter(
+            paginator._after(last.created_at, last.id, True))
+        self.assertUsesIndex(queryset[:21], 'barcode_created_id_idx')
+
+    def test_export_queries_use_index(self):
+        # 无筛选的全量导出按主键顺序读取，不需要额外排序
+        plan = filter_barcode_summaries(BarcodeSummary.objects.all(), {}).order_by('id').explain()
+        self.assertNotIn('TEMP B-TREE', plan)
+        queryset = filter_barcode_summaries(BarcodeSummary.objects.all(), {'result': 'false'})
+        self.assertUsesIndex(queryset.order_by('id'), 'barcode_result_created_idx')
+
+
+class BarcodeSummaryBatchConstraintTests(TestCase):
+    """同一盘点批次内条码唯一，批量导入时重复条码被忽略"""
+
+    def test_ignore_conflicts_deduplicates_within_batch(self):
+        BarcodeSummary.objects.bulk_create([
+            BarcodeSummary(barcode='BC1', batch='2025盘点', model='首次'),
+            BarcodeSummary(barcode='BC1', batch='2025盘点', model='重复'),
+            BarcodeSummary(barcode='BC1', batch='2026盘点', model='下一批次'),
+        ], ignore_conflicts=True)
+        self.assertEqual(BarcodeSummary.objects.filter(barcode='BC1').count(), 2)
+        self.assertEqual(BarcodeSummary.objects.get(barcode='BC1', batch='2025盘点').model, '首次')
+
+    def test_rows_without_batch_are_not_constrained(self):
+        BarcodeSummary.objects.bulk_create([
+            BarcodeSummary(barcode='BC1'),
+            BarcodeSummary(barcode='BC1'),
+        ], ignore_conflicts=True)
+        self.assertEqual(BarcodeSummary.objects.filter(barcode='BC1').count(), 2)
+
+
+class BarcodeSummaryListSerializationTests(TestCase):
+    """列表只读序列化的输出与 ModelSerializer 一致，并支持 ?fields= 稀疏字段"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='tester')
+        BarcodeSummary.objects.create(barcode='BC1', model='型号', result=True)
+        BarcodeSummary.objects.create(barcode='BC2', location='位置', expected_time='2025-11-11T08:00:00Z')
+
+    def get(self, action, params=None, **kwargs):
+        request = APIRequestFactory().get('/api/asset-code/barcode-summaries/', params or {})
+        force_authenticate(request, user=self.user)
+        return BarcodeSummaryViewSet.as_view({'get': action})(request, **kwargs)
+
+    def test_list_matches_model_serializer(self):
+        results = self.get('list').data['results']
+        expected = BarcodeSummarySerializer(BarcodeSummary.objects.order_by('-created_at'), many=True).data
+        self.assertEqual([dict(row) for row in results], [dict(row) for row in expected])
+
+    def test_sparse_fields(self):
+        for response in (self.get('list', {'fields': 'barcode,result'}),
+                         self.get('list', {'fields': 'barcode,result', 'pagination': 'cursor'})):
+            self.assertEqual(set(response.data['results'][0]), {'id', 'barcode', 'result'})
+        pk = BarcodeSummary.objects.get(barcode='BC2').pk
+        response = self.get('retrieve', {'fields': 'expected_time'}, pk=pk)
+        self.assertEqual(response.data, {'id': pk, 'expected_time': '2025-11-11T08:00:00Z'})
+
+    def test_unknown_field_rejected(self):
+        self.assertEqual(self.get('list', {'fields': 'barcode,password'}).status_code, 400)
+
+
+@skipUnless(connection.vendor == 'sqlite', '全文索引为SQLite FTS5')
+class FullTextSearchTests(TestCase):
+    """全文索引的匹配结果与逐字段 icontains 完全一致"""
+
+    TERMS = [
+        'BC000', '型号A', 'room', 'ROOM', 'RoOm', '机房3', '李四', '2025-11', 'x"y', '"', 'a OR b', 'NEAR',
+        'a*', '^ab', 'x AND', '100%', 'a_b', 'BC', '房', 'A',
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        values = [
+            {'barcode': 'BC000123', 'model': '型号A-200', 'location': 'Server Room 3', 'scanner': '张三'},
+            {'barcode': 'bc000456', 'model': 'a OR b', 'location': '机房3楼', 'remarks': '含 "引号" 的x"y备注'},
+            {'barcode': 'MP0001', 'user': '李四', 'scan_time': '2025-11-11 10:00:00', 'remarks': 'NEAR(ab) a* ^abc'},
+            {'barcode': 'MP0002', 'asset_type': '研发样机', 'remarks': '完成100% a_b x AND y'},
+            {'barcode': None, 'model': None, 'location': 'ROOMS'},
+        ]
+        cls.rows = [BarcodeSummary.objects.create(**row) for row in values]
+
+    def icontains_ids(self, term):
+        condition = Q()
+        for field in SEARCH_FIELDS:
+            condition |= Q(**{f'{field}__icontains': term})
+        return sorted(BarcodeSummary.objects.filter(condition).values_list('id', flat=True))
+
+    def search_ids(self, term):
+        return sorted(search_barcode_summaries(BarcodeSummary.objects.all(), term).values_list('id', flat=True))
+
+    def assertSameAsIcontains(self):
+        for term in self.TERMS:
+            self.assertEqual(self.search_ids(term), self.icontains_ids(term), term)
+
+    def test_matches_icontains(self):
+        # 3个字符以上走全文索引，更短的关键字回退为 icontains
+        with CaptureQueriesContext(connection) as queries:
+            self.search_ids('BC000')
+            self.search_ids('BC')
+        self.assertIn(FTS_TABLE, queries.captured_queries[0]['sql'])
+        self.assertNotIn(FTS_TABLE, queries.captured_queries[1]['sql'])
+        self.assertEqual(len(self.search_ids('BC000')), 2)
+        self.assertEqual(len(self.search_ids('room')), 2)
+        self.assertSameAsIcontains()
+
+    def test_index_follows_updates_and_deletes(self):
+        BarcodeSummary.objects.filter(pk=self.rows[0].pk).update(location='仓库', model='型号B')
+        self.rows[2].user = '王五'
+        self.rows[2].save()
+        self.rows[1].delete()
+        BarcodeSummary.objects.create(barcode='NEW01', location='Server ROOM 9')
+        self.assertEqual(self.search_ids('李四'), [])
+        self.assertEqual(len(self.search_ids('room')), 2)
+        self.assertSameAsIcontains()
+
+    def test_list_search_terms(self):
+        user = User.objects.create(username='tester')
+        request = APIRequestFactory().get('/api/asset-code/barcode-summaries/', {'search': 'room 3'})
+        force_authenticate(request, user=user)
+        results = BarcodeSummaryViewSet.as_view({'get': 'list'})(request).data['results']
+        # 多个关键字需同时匹配
+        self.assertEqual([row['id'] for row in results], [self.rows[0].id])
+
+
+@skipUnless(connection.vendor == 'sqlite', '表行数和版本号由SQLite触发器维护')
+class CachedCountPaginationTests(TestCase):
+    """列表总数按筛选条件和表版本缓存，表有写入后重新计数；?count=estimate 时抽样估算"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='tester')
+        BarcodeSummary.objects.bulk_create([
+            BarcodeSummary(barcode=f'BC{index}', user=f'用户{index % 2}', result=index % 3 == 0) for index in range(60)
+        ])
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, params=None):
+        request = APIRequestFactory().get('/api/asset-code/barcode-summaries/', params or {})
+        force_authenticate(request, user=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            data = BarcodeSummaryViewSet.as_view({'get': 'list'})(request).data
+        counted = any('COUNT(' in query['sql'] for query in queries.captured_queries)
+        return data['count'], data['approximate'], counted
+
+    def test_filtered_count_is_cached_until_write(self):
+        self.assertEqual(self.get({'user': '用户1'}), (30, False, True))
+        self.assertEqual(self.get({'user': '用户1'}), (30, False, False))
+        # 条件不同不共用缓存
+        self.assertEqual(self.get({'user': '用户1', 'result': 'true'}), (10, False, True))
+
+        BarcodeSummary.objects.create(barcode='BC60', user='用户1')
+        self.assertEqual(self.get({'user': '用户1'}), (31, False, True))
+
+    def test_unfiltered_count_reads_row_count(self):
+        self.assertEqual(self.get(), (60, False, False))
+        BarcodeSummary.objects.filter(user='用户0').delete()
+        self.assertEqual(self.get(), (30, False, False))
+
+    def test_every_filterset_filter_is_part_of_the_key(self):
+        BarcodeSummary.objects.bulk_create([
+            BarcodeSummary(barcode=f'BC{index}', batch='2025盘点', archived_at=timezone.now()) for index in range(2)
+        ])
+        for name in BarcodeSummaryFilter.base_filters:
+            value = {'result': 'true', 'archived': 'false', 'batch': '2025盘点'}.get(name, 'BC1')
+            self.assertEqual(self.get({name: value})[0], self.list_count({name: value}), name)
+
+    def list_count(self, params):
+        request = APIRequestFactory().get('/api/asset-code/barcode-summaries/', params)
+        force_authenticate(request, user=self.user)
+        view = BarcodeSummaryViewSet(action_map={'get': 'list'}, format_kwarg=None, args=(), kwargs={})
+        view.request = view.initialize_request(request)
+        return view.filter_queryset(view.get_queryset()).count()
+
+    def list_all(self, params):
+        """逐页读取列表，返回 (总数, 全部结果)"""
+        results, page = [], 1
+        while True:
+            request = APIRequestFactory().get('/api/asset-code/barcode-summaries/', {**params, 'page': page})
+            force_authenticate(request, user=self.user)
+            data = BarcodeSummaryViewSet.as_view({'get': 'list'})(request).data
+            results += data['results']
+            if data['next'] is None:
+                return data['count'], results
+            page += 1
+
+    def test_archived_rows_hidden_by_default(self):
+        BarcodeSummary.objects.filter(barcode__in=['BC0', 'BC1', 'BC2']).update(archived_at=timezone.now())
+        archived = {'BC0', 'BC1', 'BC2'}
+        for params, expected in [({}, 57), ({'archived': 'false'}, 57), ({'archived': 'true'}, 3),
+                                 ({'archived': 'true', 'user': '用户1'}, 1)]:
+            count, results = self.list_all(params)
+            self.assertEqual((count, len(results)), (expected, expected), params)
+            barcodes = {row['barcode'] for row in results}
+            if params.get('archived') == 'true':
+                self.assertLessEqual(barcodes, archived)
+            else:
+                self.assertFalse(barcodes & archived)
+        # 默认结果集的总数仍直接读取触发器维护的计数，不执行 COUNT(*)
+        self.assertEqual(self.get(), (57, False, False))
+
+    @override_settings(COUNT_ESTIMATE_MIN_ROWS=50, COUNT_SAMPLE_WINDOWS=3, COUNT_SAMPLE_WINDOW_SIZE=10)
+    def test_estimate(self):
+        count, approximate, _ = self.get({'user': '用户1', 'count': 'estimate'})
+        self.assertTrue(approximate)
+        self.assertAlmostEqual(count, 30, delta=6)
+        # 精确计数与估算分别缓存
+        self.assertEqual(self.get({'user': '用户1'})[:2], (30, False))
+        with self.settings(COUNT_ESTIMATE_MIN_ROWS=1000):
+            cache.clear()
+            self.assertEqual(self.get({'user': '用户1', 'count': 'estimate'})[:2], (30, False))
+
+
+class KeysetPaginationTests(TestCase):
+    """游标分页向后、向前翻页都不重复、不遗漏，排序字段取值相同或为空时按 id 区分"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='tester')
+        created_at = [timezone.now() - timedelta(days=day) for day in range(3)]
+        BarcodeSummary.objects.bulk_create([
+            BarcodeSummary(barcode=f'BC{index}', created_at=created_at[index % 3],
+                           user=None if index % 4 == 0 else f'用户{index % 2}')
+            for index in range(47)
+        ])
+
+    def get(self, params):
+        request = APIRequestFactory().get('/api/asset-code/barcode-summaries/', {**params, 'pagination': 'cursor'})
+        force_authenticate(request, user=self.user)
+        data = BarcodeSummaryViewSet.as_view({'get': 'list'})(request).data
+        return [row['id'] for row in data['results']], data['next'], data['previous']
+
+    def follow(self, link):
+        return {key: values[0] for key, values in parse_qs(urlparse(link).query).items()}
+
+    def test_pages_round_trip(self):
+        for ordering in ('-created_at', 'created_at', 'user', '-user'):
+            field = ordering.lstrip('-')
+            nulls = {'nulls_last': True} if ordering.startswith('-') else {'nulls_first': True}
+            term = F(field).desc(**nulls) if ordering.startswith('-') else F(field).asc(**nulls)
+            expected = list(BarcodeSummary.objects.order_by(term, '-id' if ordering.startswith('-') else 'id')
+                            .values_list('id', flat=True))
+
+            pages = []
+            ids, next_link, previous_link = self.get({'ordering': ordering})
+            self.assertIsNone(previous_link)
+            pages.append(ids)
+            while next_link:
+                ids, next_link, previous_link = self.get(self.follow(next_link))
+                pages.append(ids)
+            self.assertEqual([len(page) for page in pages], [20, 20, 7], ordering)
+            self.assertEqual(sum(pages, []), expected, ordering)
+
+            # 从最后一页向前翻回第一页
+            back = [pages[-1]]
+            while previous_link:
+                ids, _, previous_link = self.get(self.follow(previous_link))
+                back.insert(0, ids)
+            self.assertEqual(back, pages, ordering)
+
+
+@override_settings(EXPORT_CACHE_DIR=tempfile.mkdtemp(prefix='asset_export_cache_test_'))
+class BarcodeSummaryExportTests(TestCase):
+    """流式导出的文件能被openpyxl正常打开，表头、数据行和时间格式正确"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='tester')
+        cls.row = BarcodeSummary.objects.create(
+            barcode='BC1', model='型号A', location='机房\x01', scanner='张三', result=True,
+            expected_time=datetime(2025, 11, 11, 8, 30, tzinfo=dt_timezone.utc),
+            created_at=datetime(2025, 11, 10, 9, 0, 5, tzinfo=dt_timezone.utc),
+        )
+        BarcodeSummary.objects.create(barcode='BC2', remarks='含<特殊>&字符')
+
+    def export(self, params):
+        request = APIRequestFactory().get('/api/asset-code/barcode-summaries/export/', params)
+        force_authenticate(request, user=self.user)
+        response = BarcodeSummaryViewSet.as_view({'get': 'export'})(request)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content)
+
+    def test_xlsx_opens_with_openpyxl(self):
+        response, content = self.export({'format': 'xlsx'})
+        self.assertEqual(response['Content-Type'], XLSX_CONTENT_TYPE)
+        rows = list(load_workbook(io.BytesIO(content), read_only=True).active.iter_rows(values_only=True))
+        self.assertEqual(list(rows[0]), EXPORT_HEADERS)
+        data = {row[0]: row for row in rows[1:]}
+        self.assertEqual(set(data), {'BC1', 'BC2'})
+        # 非法控制字符被去掉，时间按 DATETIME_FORMAT 输出为文本，空值为空单元格
+        self.assertEqual(data['BC1'][:4], ('BC1', '型号A', '机房', '张三'))
+        self.assertEqual(data['BC1'][8:10], ('已完成', '2025-11-11 08:30:00'))
+        self.assertEqual(data['BC1'][11], '2025-11-10 09:00:05')
+        self.assertEqual((data['BC2'][5], data['BC2'][8], data['BC2'][9]), ('含<特殊>&字符', '处理中', None))
+
+    def test_xlsx_empty_result_keeps_header(self):
+        _, content = self.export({'format': 'xlsx', 'barcode': '不存在'})
+        workbook = load_workbook(io.BytesIO(content), read_only=True)
+        self.assertEqual(workbook.sheetnames, ['Sheet1'])
+        self.assertEqual([list(row) for row in workbook.active.iter_rows(values_only=True)], [EXPORT_HEADERS])
+
+    def test_xlsx_splits_sheets(self):
+        rows = [[str(index)] for index in range(5)]
+        content = b''.join(iter_xlsx(rows, headers=['序号'], sheet_rows=2, flush_rows=1))
+        workbook = load_workbook(io.BytesIO(content), read_only=True)
+        self.assertEqual(workbook.sheetnames, ['Sheet1', 'Sheet2', 'Sheet3'])
+        self.assertEqual([[row[0] for row in workbook[name].iter_rows(values_only=True)] for name in workbook.sheetnames],
+                         [['序号', '0', '1'], ['序号', '2', '3'], ['序号', '4']])
+
+    def test_archived_rows_follow_list_default(self):
+        BarcodeSummary.objects.create(barcode='BC3', archived_at=timezone.now())
+        for params, expected in [({}, ['BC1', 'BC2']), ({'archived': 'true'}, ['BC3'])]:
+            _, content = self.export({'format': 'ndjson', **params})
+            self.assertEqual([json.loads(line)['条码'] for line in content.decode('utf-8').splitlines()], expected)
+
+    def test_csv_has_bom_and_header(self):
+        response, content = self.export({'format': 'csv', 'barcode': 'BC1'})
+        self.assertEqual(response['Content-Type'], CSV_CONTENT_TYPE)
+        self.assertTrue(content.startswith(codecs.BOM_UTF8))
+        rows = list(csv.reader(io.StringIO(content[len(codecs.BOM_UTF8):].decode('utf-8'))))
+        self.assertEqual(rows[0], EXPORT_HEADERS)
+        self.assertEqual(rows[1][:4] + rows[1][8:10], ['BC1', '型号A', '机房\x01', '张三', '已完成', '2025-11-11 08:30:00'])
+        self.assertEqual(len(rows), 2)
+
+    def test_ndjson_lines_parse(self):
+        response, content = self.export({'format': 'ndjson'})
+        self.assertEqual(response['Content-Type'], NDJSON_CONTENT_TYPE)
+        lines = content.decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 2)
+        records = {record['条码']: record for record in map(json.loads, lines)}
+        self.assertEqual(set(records), {'BC1', 'BC2'})
+        for record in records.values():
+            self.assertEqual(list(record), EXPORT_HEADERS)
+        self.assertEqual((records['BC1']['预计处理时间'], records['BC2']['备注']), ('2025-11-11 08:30:00', '含<特殊>&字符'))
+        self.assertEqual(b''.join(iter_ndjson([])), b'')
+
+
+@skipUnless(connection.vendor == 'sqlite', '缓存键中的表版本号由SQLite触发器维护')
+class ExportCacheTests(TestCase):
+    """相同筛选条件且数据未变化时直接返回缓存文件，表有写入后重新生成，缓存目录按LRU淘汰"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='tester')
+        cls.row = BarcodeSummary.objects.create(barcode='BC1')
+
+    def setUp(self):
+        override = self.settings(EXPORT_CACHE_DIR=tempfile.mkdtemp(prefix='asset_export_cache_test_'))
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def export(self, params):
+        request = APIRequestFactory().get('/api/asset-code/barcode-summaries/export/', params)
+        force_authenticate(request, user=self.user)
+        response = BarcodeSummaryViewSet.as_view({'get': 'export'})(request)
+        content = b''.join(response.streaming_content)
+        response.close()
+        return response['X-Export-Cache'], content
+
+    def test_hit_after_miss_and_miss_after_write(self):
+        status, content = self.export({'format': 'csv', 'barcode': 'BC'})
+        self.assertEqual(status, 'MISS')
+        self.assertEqual(self.export({'format': 'csv', 'barcode': ' BC '}), ('HIT', content))
+        # 格式不同不共用缓存
+        self.assertEqual(self.export({'format': 'ndjson', 'barcode': 'BC'})[0], 'MISS')
+
+        BarcodeSummary.objects.filter(pk=self.row.pk).update(result=True)
+        status, changed = self.export({'format': 'csv', 'barcode': 'BC'})
+        self.assertEqual(status, 'MISS')
+        self.assertIn('已完成'.encode('utf-8'), changed)
+
+    def test_evicts_least_recently_used(self):
+        for barcode in ('B', 'C', '1'):
+            self.export({'format': 'csv', 'barcode': barcode})
+        paths = sorted((entry.path for entry in os.scandir(settings.EXPORT_CACHE_DIR)), key=os.path.getmtime)
+        self.assertEqual(len(paths), 3)
+        # 最早生成的文件被命中后成为最近使用，淘汰时保留
+        old = time.time() - 100
+        for offset, path in enumerate(paths):
+            os.utime(path, (old + offset, old + offset))
+        self.assertEqual(self.export({'format': 'csv', 'barcode': 'B'})[0], 'HIT')
+
+        evict_cache(max_bytes=os.path.getsize(paths[0]))
+        self.assertEqual([os.path.exists(path) for path in paths], [True, False, False])
+
+
+@override_settings(EXPORT_JOB_DIR=tempfile.mkdtemp(prefix='asset_export_job_test_'))
+class ExportJobTests(TestCase):
+    """后台导出任务：创建、查询进度、下载，过期后清理；执行失败或worker中断时任务不会一直停在执行中"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='tester')
+        BarcodeSummary.objects.create(barcode='BC1', result=True)
+        BarcodeSummary.objects.create(barcode='BC2')
+
+    def request(self, method, action, data=None, **kwargs):
+        request = getattr(APIRequestFactory(), method)('/api/asset-code/export-jobs/', data, format='json')
+        force_authenticate(request, user=self.user)
+        return ExportJobViewSet.as_view({method: action})(request, **kwargs)
+
+    def test_create_poll_download_cleanup(self):
+        response = self.request('post', 'create', {'export_format': 'csv', 'filters': {'result': 'false'}})
+        self.assertEqual(response.status_code, 201)
+        job_id = response.data['id']
+        data = self.request('get', 'retrieve', pk=job_id).data
+        self.assertEqual((data['status'], data['percent']), (ExportJob.STATUS_PENDING, 0.0))
+        self.assertEqual(self.request('get', 'download', pk=job_id).status_code, 409)
+
+        job = run_export_job(claim_next_job())
+        data = self.request('get', 'retrieve', pk=job_id).data
+        self.assertEqual((data['status'], data['total_rows'], data['rows_written'], data['percent']),
+                         (ExportJob.STATUS_SUCCESS, 1, 1, 100.0))
+        response = self.request('get', 'download', pk=job_id)
+        self.assertEqual(response.status_code, 200)
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode('utf-8-sig'))))
+        self.assertEqual([row[0] for row in rows], ['条码', 'BC2'])
+
+        # 未过期时不清理
+        self.assertEqual(cleanup_expired_jobs(), 0)
+        ExportJob.objects.filter(id=job_id).update(finished_at=timezone.now() - timedelta(days=2))
+        self.assertEqual(cleanup_expired_jobs(), 1)
+        self.assertFalse(os.path.exists(job.file_path))
+        self.assertFalse(ExportJob.objects.filter(id=job_id).exists())
+
+    def test_failure_before_writing_marks_job_failed(self):
+        job = ExportJob.objects.create(export_format='csv', created_by=self.user)
+        with mock.patch('asset_code.jobs.filter_barcode_summaries', side_effect=RuntimeError('数据库不可用')), \
+                self.assertLogs('asset_code.jobs', 'ERROR'):
+            job = run_export_job(claim_next_job())
+        self.assertEqual((job.status, job.error), (ExportJob.STATUS_FAILED, '数据库不可用'))
+        self.assertIsNotNone(ExportJob.objects.get(id=job.id).finished_at)
+
+    def test_reclaim_stale_running_jobs(self):
+        stale = ExportJob.objects.create(export_format='csv', status=ExportJob.STATUS_RUNNING,
+                                         started_at=timezone.now() - timedelta(days=1))
+        running = ExportJob.objects.create(export_format='csv', status=ExportJob.STATUS_RUNNING,
+                                           started_at=timezone.now())
+        partial = os.path.join(get_export_dir(), f'export_job_{stale.id}.csv')
+        with open(partial, 'wb') as f:
+            f.write(b'partial')
+
+        self.assertEqual(reclaim_stale_jobs(), 1)
+        self.assertFalse(os.path.exists(partial))
+        self.assertEqual(ExportJob.objects.get(id=stale.id).status, ExportJob.STATUS_FAILED)
+        self.assertEqual(ExportJob.objects.get(id=running.id).status, ExportJob.STATUS_RUNNING)
+
+
+@override_settings(EXPORT_JOB_DIR=tempfile.mkdtemp(prefix='asset_export_job_test_'),
+                   EXPORT_CACHE_DIR=tempfile.mkdtemp(prefix='asset_export_cache_test_'),
+                   EXPORT_ZIP_THRESHOLD_ROWS=4, EXPORT_ROWS_PER_FILE=2)
+class SplitExportTests(TransactionTestCase):
+    """超过阈值的xlsx导出转为后台任务，按 id 区间拆成多个工作簿打包为zip
+
+    分片由子进程读取数据库，测试中改用线程池，并使用 TransactionTestCase 使写入的数据对其他连接可见。
+    """
+
+    def setUp(self):
+        self.user = User.objects.create(username='tester')
+        BarcodeSummary.objects.bulk_create([BarcodeSummary(barcode=f'BC{index}', result=index == 3)
+                                            for index in range(7)])
+
+    def test_split_id_ranges(self):
+        ids = list(BarcodeSummary.objects.order_by('id').values_list('id', flat=True))
+        self.assertEqual(split_id_ranges(BarcodeSummary.objects.all(), 3), [(ids[0], ids[3]), (ids[3], ids[6]),
+                                                                            (ids[6], None)])
+        self.assertEqual(split_id_ranges(BarcodeSummary.objects.filter(result=True), 3), [(ids[3], None)])
+        self.assertEqual(split_id_ranges(BarcodeSummary.objects.none(), 3), [])
+
+    def test_large_xlsx_export_runs_as_job(self):
+        request = APIRequestFactory().get('/api/asset-code/barcode-summaries/export/', {'format': 'xlsx'})
+        force_authenticate(request, user=self.user)
+        response = BarcodeSummaryViewSet.as_view({'get': 'export'})(request)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], ExportJob.STATUS_PENDING)
+
+        with mock.patch('asset_code.parallel_export.ProcessPoolExecutor', ThreadPoolExecutor):
+            job = run_export_job(claim_next_job())
+        self.assertEqual((job.status, job.rows_written), (ExportJob.STATUS_SUCCESS, 7), job.error)
+        self.assertTrue(job.file_name.endswith('.zip'))
+
+        with zipfile.ZipFile(job.file_path) as archive:
+            names = archive.namelist()
+            workbooks = [load_workbook(io.BytesIO(archive.read(name)), read_only=True) for name in names]
+        self.assertEqual(names, [f'条码汇总导出_part{index:03d}.xlsx' for index in (1, 2, 3, 4)])
+        self.assertEqual([len(workbook.sheetnames) for workbook in workbooks], [1, 1, 1, 1])
+        barcodes = [row[0] for workbook in workbooks for row in workbook.active.iter_rows(min_row=2, values_only=True)]
+        self.assertEqual(barcodes, [f'BC{index}' for index in range(7)])
+
+        # 未超过阈值时仍在请求中流式生成
+        request = APIRequestFactory().get('/api/asset-code/barcode-summaries/export/', {'result': 'true'})
+        force_authenticate(request, user=self.user)
+        response = BarcodeSummaryViewSet.as_view({'get': 'export'})(request)
+        self.assertEqual((response.status_code, response['Content-Type']), (200, XLSX_CONTENT_TYPE))
+        b''.join(response.streaming_content)
+
+
+@skipUnless(connection.vendor == 'sqlite', '表版本号由SQLite触发器维护')
+class BarcodeSummaryConditionalGetTests(TestCase):
+    """列表、详情、导出返回 ETag / Last-Modified，数据未变化时返回304且只查询版本表"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='tester')
+        cls.row = BarcodeSummary.objects.create(barcode='BC1')
+
+    def get(self, action, params=None, headers=None, **kwargs):
+        request = APIRequestFactory().get('/api/asset-code/barcode-summaries/', params or {}, headers=headers)
+        force_authenticate(request, user=self.user)
+        return BarcodeSummaryViewSet.as_view({'get': action})(request, **kwargs)
+
+    def test_not_modified_skips_query(self):
+        for action, kwargs in (('list', {}), ('retrieve', {'pk': self.row.pk}), ('export', {})):
+            response = self.get(action, {'format': 'csv'} if action == 'export' else None, **kwargs)
+            self.assertEqual(response.status_code, 200)
+            etag = response['ETag']
+            self.assertTrue(etag.startswith('W/'))
+            self.assertIn('Last-Modified', response)
+
+            with self.assertNumQueries(1):
+                response = self.get(action, {'format': 'csv'} if action == 'export' else None,
+                                    headers={'If-None-Match': etag}, **kwargs)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response['ETag'], etag)
+
+    def test_write_changes_etag(self):
+        etag = self.get('list')['ETag']
+        BarcodeSummary.objects.filter(pk=self.row.pk).update(result=True)
+        response = self.get('list', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_depends_on_query(self):
+        self.assertNotEqual(self.get('list')['ETag'], self.get('list', {'barcode': 'BC1'})['ETag'])
+
+
+@skipUnless(connection.vendor == 'sqlite', '变更记录由SQLite触发器维护')
+class BarcodeSummaryChangeFeedTests(TestCase):
+    """增量同步只返回游标之后的新增、修改和删除"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='tester')
+        cls.rows = [BarcodeSummary.objects.create(barcode=f'BC{index}') for index in range(3)]
+
+    def get(self, params=None):
+        request = APIRequestFactory().get('/api/asset-code/barcode-summaries/changes/', params or {})
+        force_authenticate(request, user=self.user)
+        return BarcodeSummaryViewSet.as_view({'get': 'changes'})(request)
+
+    def sync(self, cursor=None, **params):
+        """连续读取直到没有更多变更，返回 (全部变更, 最新游标)"""
+        results = []
+        while True:
+            data = self.get({**params, **({'cursor': cursor} if cursor else {})}).data
+            results += data['results']
+            cursor = data['cursor']
+            if not data['has_more']:
+                return results, cursor
+
+    def test_initial_sync_then_deltas(self):
+        results, cursor = self.sync(limit=2)
+        self.assertEqual([item['id'] for item in results], [row.id for row in self.rows])
+        self.assertEqual(results[0]['data']['barcode'], 'BC0')
+
+        # 没有变化时不返回任何数据
+        results, cursor = self.sync(cursor)
+        self.assertEqual(results, [])
+
+        self.rows[1].result_remarks = '已处理'
+        self.rows[1].save()
+        created = BarcodeSummary.objects.create(barcode='BC3')
+        deleted_id = self.rows[0].id
+        self.rows[0].delete()
+
+        results, cursor = self.sync(cursor, fields='result_remarks')
+        self.assertEqual([(item['op'], item['id']) for item in results],
+                         [('upsert', self.rows[1].id), ('upsert', created.id), ('delete', deleted_id)])
+        self.assertEqual(results[0]['data'], {'id': self.rows[1].id, 'result_remarks': '已处理'})
+        self.assertNotIn('data', results[2])
+
+    def test_invalid_and_expired_cursor(self):
+        self.assertEqual(self.get({'cursor': 'invalid'}).status_code, 400)
+        seq, issued_at = decode_cursor(self.get().data['cursor'])
+        with mock.patch('asset_code.changefeed.time.time', return_value=issued_at + 365 * 24 * 60 * 60):
+            self.assertEqual(self.get({'cursor': encode_cursor(seq, issued_at)}).status_code, 410)
+
+
+@skipUnless(connection.vendor == 'sqlite', '触发器只在SQLite上安装')
+class ChangeFeedMigrationTests(TransactionTestCase):
+    """回退到变更表之前的迁移后，触发器不再引用已删除的表，之后仍可正常写入并重新迁移"""
+
+    def tearDown(self):
+        call_command('migrate', 'asset_code', verbosity=0)
+
+    def test_migrate_back_before_change_feed(self):
+        call_command('migrate', 'asset_code', '0004', verbosity=0)
+        call_command('migrate', 'asset_code', '0010', verbosity=0)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO asset_code_barcode_summary (barcode, model, location, scanner, scan_time, remarks, "
+                "user, asset_type, result, batch, created_at, updated_at) "
+                "VALUES ('BC1', '', '', '', '', '', '', '', '', '', '2026-01-01', '2026-01-01')"
+            )
+            cursor.execute("UPDATE asset_code_barcode_summary SET location = '新位置'")
+            cursor.execute("SELECT version, row_count FROM asset_code_table_version WHERE name = 'barcode_summary'")
+            self.assertEqual(cursor.fetchone(), (2, 1))
+
+        call_command('migrate', 'asset_code', verbosity=0)
+        BarcodeSummary.objects.create(barcode='BC2')
+        self.assertEqual(BarcodeSummary.objects.count(), 2)
+
+
+@skipUnless(connection.vendor == 'sqlite', '分组计数由SQLite触发器维护')
+class BarcodeSummaryAggregateTests(TestCase):
+    """无筛选条件的统计读取触发器维护的分组计数，结果与直接分组统计一致"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='tester')
+        cls.rows = [
+            BarcodeSummary.objects.create(
+                barcode=f'BC{index}', location=f'位置{index % 3}', scanner='扫描员',
+                scan_time=f'2025-11-{index % 4 + 1:02d} 10:00:00', user=None if index % 5 == 0 else f'用户{index % 2}',
+                asset_type='' if index % 3 else '研发样机', result=index % 2 == 0,
+            )
+            for index in range(20)
+        ]
+
+    def get(self, params=None):
+        request = APIRequestFactory().get('/api/asset-code/barcode-summaries/aggregates/', params or {})
+        force_authenticate(request, user=self.user)
+        return BarcodeSummaryViewSet.as_view({'get': 'aggregates'})(request)
+
+    def assertRollupsConsistent(self):
+        # 分组计数只统计未归档的行，对应默认结果集
+        active = BarcodeSummary.objects.filter(archived_at__isnull=True)
+        rollup = get_aggregates(active, FACET_FIELDS, 100, 100, filtered=False)
+        query = get_aggregates(active, FACET_FIELDS, 100, 100)
+        self.assertEqual((rollup['source'], query['source']), ('rollup', 'query'))
+        for key in ('total', 'facets', 'daily'):
+            self.assertEqual(rollup[key], query[key])
+
+    def test_rollups_follow_writes(self):
+        self.assertRollupsConsistent()
+
+        self.rows[0].user = '用户9'
+        self.rows[0].result = True
+        self.rows[0].save()
+        self.rows[1].save()  # 未修改统计字段
+        BarcodeSummary.objects.filter(pk=self.rows[2].pk).update(scan_time='', user='')
+        BarcodeSummary.objects.filter(location='位置1').delete()
+        BarcodeSummary.objects.create(barcode='BC99', location='位置9')
+        self.assertRollupsConsistent()
+
+        # 归档、取消归档以及归档行上的修改
+        BarcodeSummary.objects.filter(pk__in=[self.rows[3].pk, self.rows[5].pk]).update(archived_at=timezone.now())
+        BarcodeSummary.objects.filter(pk=self.rows[3].pk).update(user='用户8')
+        BarcodeSummary.objects.filter(pk=self.rows[5].pk).update(archived_at=None, location='位置7')
+        BarcodeSummary.objects.create(barcode='BC98', archived_at=timezone.now())
+        self.assertRollupsConsistent()
+        self.assertEqual(self.get().data['total'], BarcodeSummary.objects.filter(archived_at__isnull=True).count())
+
+    def test_unfiltered_reads_rollup(self):
+        with self.assertNumQueries(8):  # 版本号、总数、5个字段、每日数量
+            data = self.get({'facet_limit': 2}).data
+        self.assertEqual(data['source'], 'rollup')
+        self.assertEqual(data['total'], 20)
+        self.assertEqual(data['facets']['result'], [{'value': False, 'count': 10}, {'value': True, 'count': 10}])
+        self.assertEqual(len(data['facets']['location']), 2)
+        self.assertEqual([day['date'] for day in data['daily']], ['2025-11-01', '2025-11-02', '2025-11-03', '2025-11-04'])
+
+    def test_filtered_counts(self):
+        data = self.get({'result': 'true', 'facets': 'user,result', 'days': 1}).data
+        self.assertEqual(data['source'], 'query')
+        self.assertEqual(data['total'], 10)
+        self.assertEqual(set(data['facets']), {'user', 'result'})
+        self.assertEqual(data['facets']['result'], [{'value': True, 'count': 10}])
+        self.assertEqual(data['daily'], [{'date': '2025-11-03', 'count': 5}])
+        self.assertEqual(self.get({'facets': 'remarks'}).status_code, 400)
+
+
+class BarcodeSummaryBulkUpdateTests(TestCase):
+    """批量处理按相同修改内容合并为少量 UPDATE，任一行出错时不做任何修改"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='tester')
+        BarcodeSummary.objects.bulk_create([
+            BarcodeSummary(barcode=f'BC{index}', user=f'用户{index % 2}') for index in range(1000)
+        ])
+        cls.ids = list(BarcodeSummary.objects.order_by('id').values_list('id', flat=True))
+
+    def post(self, data):
+        request = APIRequestFactory().post('/api/asset-code/barcode-summaries/bulk-update/', data, format='json')
+        force_authenticate(request, user=self.user)
+        return BarcodeSummaryViewSet.as_view({'post': 'bulk_update'})(request)
+
+    def test_update_by_ids(self):
+        # 事务保存点2条；存在性检查和更新各按500个id分段
+        with self.assertNumQueries(6):
+            response = self.post({'ids': self.ids, 'values': {'result': True, 'result_remarks': '已盘点'}})
+        self.assertEqual(response.data, {'updated': 1000})
+        self.assertEqual(BarcodeSummary.objects.filter(result=True, result_remarks='已盘点').count(), 1000)
+
+    def test_update_by_filters(self):
+        response = self.post({'filters': {'user': '用户1'}, 'values': {'expected_time': '2025-12-01T10:00:00'}})
+        self.assertEqual(response.data, {'updated': 500})
+        self.assertEqual(BarcodeSummary.objects.filter(expected_time__isnull=False).count(), 500)
+        self.assertEqual(self.post({'filters': {}, 'values': {'result': True}}).status_code, 400)
+
+    def test_items_grouped_by_values(self):
+        items = [{'id': row_id, 'result': True, 'result_remarks': '已归还' if index % 2 else '已报废'}
+                 for index, row_id in enumerate(self.ids[:10])]
+        with self.assertNumQueries(5):  # 事务保存点2条、存在性检查、两组修改内容各一条 UPDATE
+            response = self.post({'items': items})
+        self.assertEqual(response.data, {'updated': 10})
+        self.assertEqual(BarcodeSummary.objects.filter(result_remarks='已归还').count(), 5)
+
+    def test_row_errors_roll_back(self):
+        items = [
+            {'id': self.ids[0], 'result': True},
+            {'id': self.ids[1], 'result_remarks': 'x' * 101},
+            {'id': self.ids[2]},
+        ]
+        response = self.post({'items': items})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2])
+
+        response = self.post({'ids': [self.ids[0], 0], 'values': {'result': True}})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'][0]['id'], 0)
+        self.assertFalse(BarcodeSummary.objects.filter(result=True).exists())
+
+
+@override_settings(IMPORT_JOB_DIR=tempfile.mkdtemp(prefix='asset_import_test_'))
+class BarcodeSummaryImportTests(TestCase):
+    """上传接口只保存文件并创建任务，worker逐行解析所有工作表后按批写入"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='tester')
+
+    def workbook_file(self):
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.title = '一楼'
+        sheet.append(['条码', '型号', '位置', '扫描人员', '时间', '备注'])
+        sheet.append(['BC1', '型号A', '机房', '张三', None, None])
+        sheet.append([None, '型号B', '机房', '张三', None, None])  # 空条码
+        sheet.append(['BC1', '型号A', '机房', '张三', None, '重复扫描'])  # 批次内重复
+        sheet.append([12345.0, 'M' * 300, '机房', '张三', None, None])  # 型号过长
+        sheet = workbook.create_sheet('二楼')
+        sheet.append([])
+        sheet.append(['条码', '型号', '扫描时间'])
+        sheet.append([67890.0, '型号C', datetime(2025, 11, 11, 10, 30)])
+        workbook.create_sheet('说明').append(['本文件为盘点结果'])
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        return SimpleUploadedFile('2025盘点.xlsx', buffer.getvalue())
+
+    def upload(self, upload):
+        request = APIRequestFactory().post('/api/asset-code/import-barcode-summary/', {'file': upload},
+                                           format='multipart')
+        force_authenticate(request, user=self.user)
+        return BarcodeSummaryImportView.as_view()(request)
+
+    def test_upload_then_worker_imports(self):
+        response = self.upload(self.workbook_file())
+        self.assertEqual(response.status_code, 202)
+        job = ImportJob.objects.get(id=response.data['id'])
+        self.assertEqual((job.status, job.batch), (ImportJob.STATUS_PENDING, '2025盘点'))
+        self.assertTrue(os.path.exists(job.file_path))
+
+        job = run_import_job(claim_next_job(ImportJob))
+        self.assertEqual(job.status, ImportJob.STATUS_SUCCESS, job.error)
+        self.assertFalse(os.path.exists(job.file_path))
+        self.assertEqual((job.rows_parsed, job.rows_inserted, job.rows_skipped, job.rows_error), (5, 2, 2, 2))
+        self.assertIn('工作表「说明」缺少条码列，已跳过', job.errors)
+        self.assertIn('工作表「一楼」第 5 行: 型号超过200个字符', job.errors)
+        self.assertEqual(
+            list(BarcodeSummary.objects.order_by('id').values_list('barcode', 'scan_time', 'batch')),
+            [('BC1', '', '2025盘点'), ('67890', '2025-11-11 10:30:00', '2025盘点')],
+        )
+
+        request = APIRequestFactory().get(f'/api/asset-code/import-jobs/{job.id}/')
+        force_authenticate(request, user=self.user)
+        data = ImportJobViewSet.as_view({'get': 'retrieve'})(request, pk=job.id).data
+        self.assertEqual((data['rows_inserted'], data['percent']), (2, 100.0))
+
+    def test_row_ranges_match_full_read(self):
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(['条码', '扫描时间'])
+        for index in range(2, 30):
+            if index % 7:  # 留出缺失的行
+                sheet.cell(row=index, column=1, value=f'BC{index}')
+                sheet.cell(row=index, column=2, value=datetime(2025, 11, 11, 10, index))
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        buffer.seek(0)
+
+        sheet = open_workbook(buffer).active
+        self.assertEqual(find_header(sheet), (1, [(0, 'barcode'), (1, 'scan_time')]))
+        expected = [(number, tuple(row)) for number, row in enumerate(sheet.iter_rows(min_row=2, values_only=True), 2)]
+        ranges = [(2, 10), (11, 20), (21, None)]
+        rows = [row for min_row, max_row in ranges for row in iter_row_range(sheet, min_row, max_row)]
+        self.assertEqual([(number, normalize_row(row, [(0, 'barcode'), (1, 'scan_time')])) for number, row in rows],
+                         [(number, normalize_row(row, [(0, 'barcode'), (1, 'scan_time')])) for number, row in expected])
+        self.assertEqual([number for number, _ in rows], list(range(2, 30)))
+
+    def test_rejects_other_formats(self):
+        self.assertEqual(self.upload(SimpleUploadedFile('data.xls', b'old')).status_code, 400)
+        self.assertFalse(ImportJob.objects.exists())
+
+    def test_reupload_syncs_without_rewriting(self):
+        run_import_job(ImportJob.objects.get(id=self.upload(self.workbook_file()).data['id']))
+        BarcodeSummary.objects.filter(barcode='BC1').update(result=True, result_remarks='已处理')
+
+        job = run_import_job(ImportJob.objects.get(id=self.upload(self.workbook_file()).data['id']))
+        self.assertEqual((job.rows_inserted, job.rows_updated, job.rows_skipped), (0, 0, 4))
+        self.assertEqual(BarcodeSummary.objects.count(), 2)
+        self.assertTrue(BarcodeSummary.objects.get(barcode='BC1').result)
+
+
+class BarcodeSummarySyncTests(TestCase):
+    """按条码比对：只写入新增和变化的行，缺失的行按策略保留、删除或归档"""
+
+    def sync(self, rows, missing=MISSING_KEEP):
+        sync = BarcodeSummarySync('2025盘点', missing=missing, chunk_size=2)
+        for barcode, location in rows:
+            sync.add({'barcode': barcode, 'model': '型号A', 'location': location, 'scanner': '张三',
+                      'scan_time': '', 'remarks': ''})
+        return sync.finish()
+
+    def setUp(self):
+        self.sync([('BC1', '机房'), ('BC2', '机房'), ('BC3', '机房')])
+        BarcodeSummary.objects.create(barcode='BC1', location='其他批次', batch='')
+        BarcodeSummary.objects.filter(barcode='BC2').update(result=True, result_remarks='已处理')
+
+    def test_updates_only_changed_rows(self):
+        before = dict(BarcodeSummary.objects.values_list('barcode', 'updated_at').filter(batch='2025盘点'))
+        stats = self.sync([('BC1', '机房'), ('BC2', '仓库'), ('BC3', '机房'), ('BC2', '重复'), ('BC4', '仓库')])
+        self.assertEqual({k: stats[k] for k in ('inserted', 'updated', 'unchanged', 'duplicates')},
+                         {'inserted': 1, 'updated': 1, 'unchanged': 2, 'duplicates': 1})
+
+        rows = {row.barcode: row for row in BarcodeSummary.objects.filter(batch='2025盘点')}
+        self.assertEqual((rows['BC2'].location, rows['BC2'].result, rows['BC2'].result_remarks), ('仓库', True, '已处理'))
+        self.assertEqual(rows['BC1'].updated_at, before['BC1'])
+        self.assertNotEqual(rows['BC2'].updated_at, before['BC2'])
+        self.assertEqual(BarcodeSummary.objects.get(batch='').location, '其他批次')
+
+    def test_missing_rows_archive_then_restore(self):
+        stats = self.sync([('BC1', '机房')], missing=MISSING_ARCHIVE)
+        self.assertEqual(stats['archived'], 2)
+        self.assertEqual(BarcodeSummary.objects.filter(archived_at__isnull=False).count(), 2)
+        self.assertEqual(self.sync([('BC1', '机房')], missing=MISSING_ARCHIVE)['archived'], 0)
+
+        stats = self.sync([('BC1', '机房'), ('BC2', '机房')], missing=MISSING_ARCHIVE)
+        self.assertEqual((stats['updated'], stats['archived']), (1, 0))
+        self.assertIsNone(BarcodeSummary.objects.get(barcode='BC2', batch='2025盘点').archived_at)
+        self.assertIsNotNone(BarcodeSummary.objects.get(barcode='BC3').archived_at)
+
+    def test_missing_rows_delete(self):
+        stats = self.sync([('BC1', '机房')], missing=MISSING_DELETE)
+        self.assertEqual(stats['deleted'], 2)
+        self.assertEqual(sorted(BarcodeSummary.objects.values_list('barcode', 'batch')),
+                         [('BC1', ''), ('BC1', '2025盘点')])
+
+
+class AssetEnrichmentTests(TestCase):
+    """资产数据按资产编号增量写入；条码汇总写入时补充，资产数据变化后只补充关联的已有行"""
+
+    def test_load_snapshots_incrementally(self):
+        stats = load_asset_records([('BC1', '旧使用人', 'M0'), ('BC1', '张三', 'M1'), ('BC2', '李四', 'M2')])
+        self.assertEqual({k: stats[k] for k in ('assets', 'inserted', 'updated', 'unchanged')},
+                         {'assets': 2, 'inserted': 2, 'updated': 0, 'unchanged': 0})
+
+        stats = load_asset_records([('BC1', '张三', 'M1'), ('BC2', '王五', 'M2'), ('BC3', '赵六', 'M3')], source='新快照.xlsx')
+        self.assertEqual({k: stats[k] for k in ('assets', 'inserted', 'updated', 'unchanged')},
+                         {'assets': 3, 'inserted': 1, 'updated': 1, 'unchanged': 1})
+        changed = AssetRecord.objects.filter(updated_at__gte=stats['loaded_at'])
+        self.assertEqual(sorted(changed.values_list('asset_code', 'source')), [('BC2', '新快照.xlsx'), ('BC3', '新快照.xlsx')])
+
+        with self.assertNumQueries(1):
+            self.assertEqual(lookup_asset('BC2'), ('王五', 'M2'))
+        self.assertIsNone(lookup_asset('BC9'))
+
+    def test_enrich_existing_rows_changed_assets_only(self):
+        load_asset_records([('BC1', '张三', 'M1'), ('BC2', '李四', 'M2')])
+        BarcodeSummary.objects.create(barcode='BC1', model='旧型号')
+        BarcodeSummary.objects.create(barcode='BC2', model='旧型号')
+        BarcodeSummary.objects.create(barcode='BC3', user='王五')
+
+        stats = load_asset_records([('BC1', '张三', 'M1'), ('BC2', '李四', 'M2'), ('BC3', '赵六', 'M3')])
+        self.assertEqual(enrich_barcode_summaries(since=stats['loaded_at']), {'matched': 1, 'updated': 1})
+        self.assertEqual(
+            list(BarcodeSummary.objects.order_by('id').values_list('user', 'model', 'asset_type')),
+            [(None, '旧型号', ''), (None, '旧型号', ''), ('赵六', 'M3', ENRICH_ASSET_TYPE)],
+        )
+        self.assertEqual(enrich_barcode_summaries(), {'matched': 3, 'updated': 2})
+        self.assertEqual(enrich_barcode_summaries(), {'matched': 3, 'updated': 0})
+
+    def test_sync_enriches_new_rows(self):
+        load_asset_records([('BC1', '张三', 'M1')])
+
+        def sync():
+            sync = BarcodeSummarySync('2025盘点')
+            for barcode in ('BC1', 'BC2'):
+                sync.add({'barcode': barcode, 'model': '扫描型号', 'location': '机房'})
+            return sync.finish()
+
+        self.assertEqual(sync()['inserted'], 2)
+        self.assertEqual(
+            list(BarcodeSummary.objects.order_by('barcode').values_list('user', 'model', 'asset_type')),
+            [('张三', 'M1', ENRICH_ASSET_TYPE), (None, '扫描型号', '')],
+        )
+        self.assertEqual(sync()['unchanged'], 2)
+
+
+class IngestDirectoryTests(TestCase):
+    """目录导入按台账只导入新文件或内容有变化的文件，未变化的文件不读取内容"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='asset_ingest_test_')
+
+    def write(self, name, rows):
+        workbook = Workbook()
+        workbook.active.append(['条码', '型号', '位置'])
+        for row in rows:
+            workbook.active.append(row)
+        path = os.path.join(self.directory, name)
+        workbook.save(path)
+        return path
+
+    def ingest(self, **kwargs):
+        return ingest_directory(self.directory, settle_seconds=0, **kwargs)
+
+    def test_ingests_new_and_changed_files_only(self):
+        first = self.write('2025_11131433.xlsx', [['BC1', '型号A', '机房'], ['BC2', '型号A', '机房']])
+        self.write('2025_1114_jiangwenxin.xlsx', [['BC3', '型号B', '仓库']])
+        with open(os.path.join(self.directory, '~$2025_11131433.xlsx'), 'wb') as f:
+            f.write(b'lock')
+
+        result = self.ingest()
+        self.assertEqual([(r.batch, r.status, r.rows_inserted) for r in result['ingested']],
+                         [('2025_11131433', IngestedFile.STATUS_SUCCESS, 2),
+                          ('2025_1114_jiangwenxin', IngestedFile.STATUS_SUCCESS, 1)])
+        self.assertEqual(BarcodeSummary.objects.filter(batch='2025_11131433').count(), 2)
+
+        # 未变化的目录只查询一次台账
+        with self.assertNumQueries(1), mock.patch('asset_code.ingest.file_hash') as file_hash:
+            result = self.ingest()
+        file_hash.assert_not_called()
+        self.assertEqual((result['files'], result['unchanged'], result['ingested']), (2, 2, []))
+
+        # 内容不变只更新指纹
+        stat = os.stat(first)
+        os.utime(first, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10 ** 9))
+        result = self.ingest()
+        self.assertEqual((result['unchanged'], result['ingested']), (2, []))
+        self.assertEqual(IngestedFile.objects.get(path=first).mtime_ns, stat.st_mtime_ns - 10 ** 9)
+
+        self.write('2025_11131433.xlsx', [['BC1', '型号A', '机房'], ['BC2', '型号A', '仓库'], ['BC4', '型号C', '机房']])
+        record, = self.ingest()['ingested']
+        self.assertEqual((record.rows_inserted, record.rows_updated, record.rows_skipped), (1, 1, 1))
+        self.assertEqual(BarcodeSummary.objects.get(barcode='BC2').location, '仓库')
+
+    def test_duplicate_and_failed_files(self):
+        self.write('2025_1113.xlsx', [['BC1', '型号A', '机房']])
+        self.ingest()
+        self.write('2025_1113副本.xlsx', [['BC1', '型号A', '机房']])
+        with open(os.path.join(self.directory, '损坏.xlsx'), 'wb') as f:
+            f.write(b'not a workbook')
+
+        with self.assertLogs('asset_code.ingest', 'ERROR'):
+            result = self.ingest()
+        self.assertEqual([r.file_name for r in result['duplicates']], ['2025_1113副本.xlsx'])
+        failed, = result['ingested']
+        self.assertEqual(failed.status, IngestedFile.STATUS_FAILED)
+        self.assertEqual(BarcodeSummary.objects.count(), 1)
+
+        # 失败的文件内容不变时不再重试，除非指定 retry_failed
+        self.assertEqual(self.ingest()['ingested'], [])
+        with self.assertLogs('asset_code.ingest', 'ERROR'):
+            self.assertEqual(len(self.ingest(retry_failed=True)['ingested']), 1)
+
+    def test_excluded_and_barcodeless_files(self):
+        self.write('条码汇总.xlsx', [['BC1', '型号A', '机房']])
+        workbook = Workbook()
+        workbook.active.append(['资产名称', '领用人'])
+        workbook.active.append(['样机', '张三'])
+        workbook.save(os.path.join(self.directory, '研发样机领用表.xlsx'))
+
+        with self.assertLogs('asset_code.ingest', 'ERROR'):
+            result = self.ingest()
+        self.assertEqual(result['files'], 1)
+        record, = result['ingested']
+        self.assertEqual((record.file_name, record.status), ('研发样机领用表.xlsx', IngestedFile.STATUS_FAILED))
+        self.assertIn('工作表「Sheet」缺少条码列，已跳过', record.errors)
+        self.assertFalse(BarcodeSummary.objects.exists())
+
+        # 补上条码列后重试即可导入
+        self.write('研发样机领用表.xlsx', [['BC2', '型号B', '仓库']])
+        record, = self.ingest(retry_failed=True)['ingested']
+        self.assertEqual((record.status, record.rows_inserted), (IngestedFile.STATUS_SUCCESS, 1))
+
+
+class ImportRunCheckpointTests(TestCase):
+    """导入脚本按块提交并记录断点，同一文件再次运行时从断点继续"""
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(prefix='asset_run_test_'), '2025盘点.xlsx')
+        with open(self.path, 'wb') as f:
+            f.write(b'workbook')
+
+    def run_sync(self, run, barcodes, commit_rows=2):
+        """模拟导入脚本的写入端：断点之前的行只登记条码，其余按块提交并记录断点"""
+        sync = BarcodeSummarySync('2025盘点', missing=MISSING_DELETE, autoflush=False)
+        sync.stats.update({key: value for key, value in run.stats.items() if key in sync.stats})
+        for position, barcode in enumerate(barcodes, 1):
+            if position <= run.rows_committed:
+                sync.mark_seen([barcode])
+                continue
+            sync.add({'barcode': barcode, 'model': '型号A'})
+            if len(sync.pending) >= commit_rows:
+                with transaction.atomic():
+                    sync.flush()
+                    save_checkpoint(run, position, sync.stats)
+        return sync.finish()
+
+    def test_resume_from_checkpoint(self):
+        BarcodeSummary.objects.create(barcode='OLD', batch='2025盘点')
+        barcodes = ['BC1', 'BC2', 'BC3', 'BC1', 'BC4']
+
+        run, resumed = start_run('test', self.path, '2025盘点')
+        self.assertFalse(resumed)
+
+        # 第一块提交后，在第二块记录断点时退出：第二块与断点一起回滚
+        original = save_checkpoint
+
+        def fail_second(*args):
+            if run.chunks_committed:
+                raise RuntimeError('中途退出')
+            original(*args)
+
+        with mock.patch('asset_code.tests.save_checkpoint', side_effect=fail_second), self.assertRaises(RuntimeError):
+            self.run_sync(run, barcodes)
+        finish_run(run, error='中途退出')
+        self.assertEqual(sorted(BarcodeSummary.objects.values_list('barcode', flat=True)), ['BC1', 'BC2', 'OLD'])
+
+        run, resumed = start_run('test', self.path, '2025盘点')
+        self.assertTrue(resumed)
+        self.assertEqual((run.rows_committed, run.resumed), (2, 1))
+        stats = self.run_sync(run, barcodes)
+        self.assertEqual({k: stats[k] for k in ('inserted', 'duplicates', 'deleted')},
+                         {'inserted': 4, 'duplicates': 1, 'deleted': 1})
+        self.assertEqual(sorted(BarcodeSummary.objects.values_list('barcode', flat=True)), ['BC1', 'BC2', 'BC3', 'BC4'])
+        self.assertEqual(ImportRun.objects.get(id=run.id).rows_committed, 5)
+
+        finish_run(run, stats)
+        self.assertFalse(start_run('test', self.path, '2025盘点')[1])
+
+    def test_restart_abandons_unfinished_run(self):
+        run, _ = start_run('test', self.path)
+        new_run, resumed = start_run('test', self.path, restart=True)
+        self.assertFalse(resumed)
+        self.assertEqual(ImportRun.objects.get(id=run.id).status, ImportRun.STATUS_ABANDONED)
+        self.assertEqual(new_run.rows_committed, 0)
+
+
+class InventoryRoundDiffTests(TestCase):
+    """两个盘点批次按条码对比：新出现、消失、位置变化、扫描人员变化"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='tester')
+        rows = [
+            ('11月', 'BC1', '机房', '张三'), ('11月', 'BC2', '机房', '张三'), ('11月', 'BC3', '机房', '张三'),
+            ('11月', 'BC4', '仓库', '张三'),
+            ('12月', 'BC1', '机房', '张三'), ('12月', 'BC2', '仓库', '张三'), ('12月', 'BC3', '机房', '李四'),
+            ('12月', 'BC5', '机房', '李四'), ('12月', 'BC6', None, '李四'),
+            ('', 'BC4', '机房', '张三'),  # 历史数据不属于任何批次
+        ]
+        BarcodeSummary.objects.bulk_create([
+            BarcodeSummary(batch=batch, barcode=barcode, location=location, scanner=scanner)
+            for batch, barcode, location, scanner in rows
+        ])
+        # 已归档的行不计入批次
+        BarcodeSummary.objects.create(batch='12月', barcode='BC4', location='仓库', archived_at=timezone.now())
+
+    def get(self, action, params):
+        request = APIRequestFactory().get(f'/api/asset-code/barcode-summaries/{action}/', params)
+        force_authenticate(request, user=self.user)
+        name = action.replace('-', '_')
+        return BarcodeSummaryViewSet.as_view({'get': name})(request)
+
+    def test_counts_and_rows(self):
+        self.assertEqual(diff_counts('11月', '12月'), {
+            'base': 4, 'target': 5, 'matched': 3,
+            'appeared': 2, 'disappeared': 1, 'moved': 1, 'scanner_changed': 1,
+        })
+        rows = diff_rows('11月', '12月', DIFF_MOVED)
+        self.assertEqual([(r['barcode'], r['base']['location'], r['target']['location']) for r in rows],
+                         [('BC2', '机房', '仓库')])
+
+        response = self.get('round-diff', {'base': '11月', 'target': '12月', 'change': 'appeared', 'limit': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(r['barcode'], r['base']) for r in response.data['results']], [('BC5', None)])
+        response = self.get('round-diff', {'base': '11月', 'target': '12月', 'change': 'appeared',
+                                           'after': response.data['next']})
+        self.assertEqual(([r['barcode'] for r in response.data['results']], response.data['next']), (['BC6'], None))
+
+        response = self.get('round-diff', {'base': '11月', 'target': '12月', 'change': 'disappeared'})
+        self.assertEqual([(r['barcode'], r['target']) for r in response.data['results']], [('BC4', None)])
+        self.assertEqual(self.get('round-diff', {'base': '11月', 'target': '13月'}).status_code, 400)
+
+        self.assertEqual([(r['batch'], r['count']) for r in self.get('rounds', {}).data],
+                         [('12月', 5), ('11月', 4)])
+
+    @skipUnless(connection.vendor == 'sqlite', '查询计划断言基于SQLite的EXPLAIN QUERY PLAN输出')
+    def test_diff_queries_use_batch_index(self):
+        with CaptureQueriesContext(connection) as queries:
+            diff_counts('11月', '12月')
+            for change in ('appeared', 'disappeared', 'moved', 'scanner_changed'):
+                diff_rows('11月', '12月', change)
+        with connection.cursor() as cursor:
+            for query in queries.captured_queries:
+                cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+                plan = '\n'.join(row[-1] for row in cursor.fetchall())
+                self.assertNotRegex(plan, r'SCAN \w+$|SCAN \w+\n', plan)
+                self.assertIn('barcode_batch_barcode_idx', plan)
+                # 另一批必须按条码等值查找，按条码范围扫描时耗时随行数平方增长
+                for line in plan.splitlines():
+                    if line.startswith('SEARCH a '):
+                        self.assertIn('barcode=?', line, plan)
+
+
+@override_settings(WORKBOOK_CACHE_DIR=tempfile.mkdtemp(prefix='asset_workbook_cache_test_'))
+class AddNewDataScriptTests(TestCase):
+    """add_new_data.py 以文件名为批次，其他批次中的条码照常导入，两批可以对比"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        scripts_dir = os.path.join(settings.BASE_DIR, 'scripts')
+        with mock.patch('sys.path', [scripts_dir, *sys.path]):
+            cls.script = importlib.import_module('add_new_data')
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='asset_add_new_data_test_')
+
+    def run_script(self, name, rows):
+        workbook = Workbook()
+        workbook.active.append(['条码', '型号', '位置'])
+        for row in rows:
+            workbook.active.append(row)
+        path = os.path.join(self.directory, name)
+        workbook.save(path)
+        # --yes 时不询问确认
+        with mock.patch('sys.argv', ['add_new_data.py', path, '--yes']), \
+                mock.patch('builtins.input', side_effect=AssertionError('不应询问确认')), \
+                contextlib.redirect_stdout(io.StringIO()):
+            self.script.main()
+
+    def test_same_barcodes_in_two_rounds_are_matched(self):
+        self.run_script('11月.xlsx', [['BC1', '型号A', '机房'], ['BC2', '型号A', '机房']])
+        self.run_script('12月.xlsx', [['BC1', '型号A', '机房'], ['BC2', '型号A', '仓库'], ['BC3', '型号B', '机房']])
+        self.assertEqual(diff_counts('11月', '12月'), {
+            'base': 2, 'target': 3, 'matched': 2,
+            'appeared': 1, 'disappeared': 0, 'moved': 1, 'scanner_changed': 0,
+        })
+
+        # 同一批次再次导入时，本批次已有的条码仍然跳过
+        self.run_script('12月.xlsx', [['BC1', '型号A', '机房'], ['BC4', '型号B', '机房']])
+        self.assertEqual(sorted(BarcodeSummary.objects.filter(batch='12月').values_list('barcode', flat=True)),
+                         ['BC1', 'BC2', 'BC3', 'BC4'])
+
+
+@skipUnless(connection.vendor == 'sqlite', '变更记录由SQLite触发器维护')
+class BarcodeSummaryLivePushTests(TransactionTestCase):
+    """广播器读取一次变更后按订阅条件分发（广播器在线程池中查询，需要真实提交的数据）"""
+
+    def test_broker_dispatches_by_filter(self):
+        row = BarcodeSummary.objects.create(barcode='BC1', user='张三')
+        other = BarcodeSummary.objects.create(barcode='BC2', user='李四')
+        broker = ChangeBroker()
+        broker.last_seq, _ = get_table_version()
+        everyone = Subscription({}, ['id', 'barcode'])
+        mine = Subscription({'user': '张三', 'result': 'false'}, None)
+        broker.subscribers = {everyone, mine}
+
+        BarcodeSummary.objects.filter(pk=row.pk).update(result=True)
+        deleted_id = other.pk
+        other.delete()
+        async_to_sync(broker.poll)(get_table_version()[0])
+
+        self.assertEqual([(event['op'], event['id'], event.get('data')) for event in self.drain(everyone)],
+                         [('upsert', row.pk, {'id': row.pk, 'barcode': 'BC1'}), ('delete', deleted_id, None)])
+        # 处理完成后不再符合筛选条件，对该订阅者是 remove
+        self.assertEqual([(event['op'], event['id']) for event in self.drain(mine)],
+                         [('remove', row.pk), ('delete', deleted_id)])
+
+    def test_archived_rows_follow_list_default(self):
+        row = BarcodeSummary.objects.create(barcode='BC1', user='张三')
+        broker = ChangeBroker()
+        broker.last_seq, _ = get_table_version()
+        default = Subscription({'user': '张三'}, ['id'])
+        archived = Subscription({'archived': 'true'}, ['id'])
+        broker.subscribers = {default, archived}
+
+        # 变更流每行只保留最新状态，每次写入后分别读取
+        for archived_at in (timezone.now(), None):
+            BarcodeSummary.objects.filter(pk=row.pk).update(archived_at=archived_at)
+            async_to_sync(broker.poll)(get_table_version()[0])
+
+        # 默认订阅与列表一致：归档时移除，恢复后重新出现；archived=true 的订阅相反
+        self.assertEqual([event['op'] for event in self.drain(default)], ['remove', 'upsert'])
+        self.assertEqual([event['op'] for event in self.drain(archived)], ['upsert', 'remove'])
+
+    @staticmethod
+    def drain(subscription):
+        events = []
+        while not subscription.queue.empty():
+            events.append(subscription.queue.get_nowait())
+        return events
@@ -0,0 +1,174 @@
+"""
+条码汇总表的数据库触发器
+- 每次插入、更新、删除递增 TableVersion.version，插入/删除同步维护 row_count
+- 每次写入把该行的最新变更序号（即递增后的版本号）登记到变更表，删除时标记为墓碑，供增量同步使用
+- 同步维护全文检索索引（FTS5 外部内容表）
+- 同步维护分组计数表（只统计未归档的行），更新时只调整取值或归档状态发生变化的统计维度
+- SQLite 在迁移中重建表时会丢弃表上的触发器，因此在每次 migrate 后重新安装
+"""
+
+from django.db import connections
+
+from .versioning import BARCODE_SUMMARY_TABLE
+from .search import FTS_TABLE, SEARCH_FIELDS
+from .rollups import ROLLUP_TABLE, ROLLUP_DIMENSIONS, FACET_FIELDS
+
+VERSION_SET = "version = version + 1, updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+BARCODE_SUMMARY_TRIGGERS = {
+    'INSERT': f"{VERSION_SET}, row_count = row_count + 1",
+    'UPDATE': VERSION_SET,
+    'DELETE': f"{VERSION_SET}, row_count = row_count - 1",
+}
+
+# 变更表每条数据只保留一行，记录最近一次变更；版本表未登记时不记录
+_RECORD_CHANGE = (
+    "INSERT OR REPLACE INTO asset_code_barcode_summary_change (record_id, change_seq, deleted, changed_at) "
+    "SELECT {row}.id, version, {deleted}, strftime('%Y-%m-%d %H:%M:%f', 'now') "
+    f"FROM asset_code_table_version WHERE name = '{BARCODE_SUMMARY_TABLE}';"
+)
+CHANGE_STATEMENTS = {
+    'INSERT': _RECORD_CHANGE.format(row='new', deleted=0),
+    'UPDATE': _RECORD_CHANGE.format(row='new', deleted=0),
+    'DELETE': _RECORD_CHANGE.format(row='old', deleted=1),
+}
+
+_FTS_COLUMNS = ', '.join(SEARCH_FIELDS)
+_FTS_INSERT = (
+    f"INSERT INTO {FTS_TABLE} (rowid, {_FTS_COLUMNS}) "
+    f"VALUES (new.id, {', '.join(f'new.{field}' for field in SEARCH_FIELDS)});"
+)
+_FTS_DELETE = (
+    f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, {_FTS_COLUMNS}) "
+    f"VALUES ('delete', old.id, {', '.join(f'old.{field}' for field in SEARCH_FIELDS)});"
+)
+
+FTS_TRIGGERS = {
+    'barcode_summary_fts_insert': f"AFTER INSERT ON asset_code_barcode_summary BEGIN {_FTS_INSERT} END",
+    'barcode_summary_fts_delete': f"AFTER DELETE ON asset_code_barcode_summary BEGIN {_FTS_DELETE} END",
+    # 只有检索字段变化时才需要重建该行索引
+    'barcode_summary_fts_update': (
+        f"AFTER UPDATE OF {_FTS_COLUMNS} ON asset_code_barcode_summary "
+        f"BEGIN {_FTS_DELETE} {_FTS_INSERT} END"
+    ),
+}
+
+# 按 (维度, 取值) 累加计数；INSERT ... SELECT 后接 ON CONFLICT 时 SQLite 要求 SELECT 带 WHERE 子句
+_ROLLUP_ADD = (
+    f"INSERT INTO {ROLLUP_TABLE} (dimension, value, count) "
+    "SELECT '{dimension}', {value}, {delta} WHERE {condition} "
+    "ON CONFLICT (dimension, value) DO UPDATE SET count = count + excluded.count;"
+)
+
+
+def _rollup_statements(row, delta, changed_only=False):
+    other = 'old' if row == 'new' else 'new'
+    statements = []
+    for dimension, expression in ROLLUP_DIMENSIONS.items():
+        condition = f"{row}.archived_at IS NULL"
+        if changed_only:
+            condition += (f" AND ({other}.archived_at IS NOT NULL "
+                          f"OR {expression.format(row='old')} IS NOT {expression.format(row='new')})")
+        statements.append(_ROLLUP_ADD.format(
+            dimension=dimension, value=expression.format(row=row), delta=delta, condition=condition,
+        ))
+    return ' '.join(statements)
+
+
+_ROLLUP_COLUMNS = ', '.join([*FACET_FIELDS, 'scan_time', 'archived_at'])
+
+ROLLUP_TRIGGERS = {
+    'barcode_summary_rollup_insert': (
+        f"AFTER INSERT ON asset_code_barcode_summary BEGIN {_rollup_statements('new', 1)} END"
+    ),
+    'barcode_summary_rollup_delete': (
+        f"AFTER DELETE ON asset_code_barcode_summary BEGIN {_rollup_statements('old', -1)} END"
+    ),
+    # 只有统计字段或归档状态变化时才调整计数，未变化的维度由条件跳过
+    'barcode_summary_rollup_update': (
+        f"AFTER UPDATE OF {_ROLLUP_COLUMNS} ON asset_code_barcode_summary BEGIN "
+        f"{_rollup_statements('old', -1, changed_only=True)} "
+        f"{_rollup_statements('new', 1, changed_only=True)} END"
+    ),
+}
+
+
+def rebuild_rollups(cursor):
+    """按当前未归档的数据重新计算分组计数表"""
+    cursor.execute(f"DELETE FROM {ROLLUP_TABLE}")
+    for dimension, expression in ROLLUP_DIMENSIONS.items():
+        cursor.execute(
+            f"INSERT INTO {ROLLUP_TABLE} (dimension, value, count) "
+            f"SELECT %s, {expression.format(row='asset_code_barcode_summary')}, COUNT(*) "
+            f"FROM asset_code_barcode_summary WHERE archived_at IS NULL GROUP BY 2",
+            [dimension],
+        )
+
+
+def install_triggers(using='default'):
+    """重新创建触发器并校准行数和分组计数
+
+    迁移回退到更早版本时部分表尚不存在，只安装所依赖的表已存在的触发器，并删除其余触发器，
+    避免触发器引用已删除的表导致写入或重建条码汇总表失败。
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        tables = set(connection.introspection.table_names(cursor))
+        if 'asset_code_barcode_summary' not in tables:
+            return
+        if 'asset_code_table_version' in tables:
+            _install_version_triggers(connection, cursor, 'asset_code_barcode_summary_change' in tables)
+        _replace_triggers(cursor, FTS_TRIGGERS, FTS_TABLE in tables)
+        # 分组计数只统计未归档的行，依赖归档时间列
+        columns = {column.name for column in connection.introspection.get_table_description(
+            cursor, 'asset_code_barcode_summary')}
+        with_rollups = ROLLUP_TABLE in tables and 'archived_at' in columns
+        _replace_triggers(cursor, ROLLUP_TRIGGERS, with_rollups)
+        if with_rollups:
+            rebuild_rollups(cursor)
+
+
+def _replace_triggers(cursor, triggers, enabled):
+    for name, body in triggers.items():
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        if enabled:
+            cursor.execute(f"CREATE TRIGGER {name} {body}")
+
+
+def _install_version_triggers(connection, cursor, with_changes):
+    """版本触发器：有行数列时同步维护行数，有变更表时同步登记变更"""
+    columns = {column.name for column in connection.introspection.get_table_description(
+        cursor, 'asset_code_table_version')}
+    with_row_count = 'row_count' in columns
+    if with_row_count:
+        cursor.execute(
+            "INSERT OR IGNORE INTO asset_code_table_version (name, version, row_count, updated_at) "
+            "VALUES (%s, 0, 0, strftime('%%Y-%%m-%%d %%H:%%M:%%f', 'now'))",
+            [BARCODE_SUMMARY_TABLE],
+        )
+    else:
+        cursor.execute(
+            "INSERT OR IGNORE INTO asset_code_table_version (name, version, updated_at) "
+            "VALUES (%s, 0, strftime('%%Y-%%m-%%d %%H:%%M:%%f', 'now'))",
+            [BARCODE_SUMMARY_TABLE],
+        )
+    for event, sets in BARCODE_SUMMARY_TRIGGERS.items():
+        name = f'barcode_summary_version_{event.lower()}'
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(
+            f"CREATE TRIGGER {name} AFTER {event} ON asset_code_barcode_summary "
+            f"BEGIN UPDATE asset_code_table_version SET {sets if with_row_count else VERSION_SET} "
+            f"WHERE name = '{BARCODE_SUMMARY_TABLE}'; {CHANGE_STATEMENTS[event] if with_changes else ''} END"
+        )
+    if with_row_count:
+        cursor.execute(
+            "UPDATE asset_code_table_version "
+            "SET row_count = (SELECT COUNT(*) FROM asset_code_barcode_summary) WHERE name = %s",
+            [BARCODE_SUMMARY_TABLE],
+        )
+
+
+def install_triggers_after_migrate(sender, using='default', **kwargs):
+    install_triggers(using)
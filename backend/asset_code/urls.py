@@ -1,10 +1,15 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import BarcodeSummaryViewSet
+from .views import BarcodeSummaryViewSet, ExportJobViewSet, ImportJobViewSet, BarcodeSummaryImportView
+from .live import live_changes
 
 router = DefaultRouter()
 router.register(r'barcode-summaries', BarcodeSummaryViewSet, basename='barcode-summary')
+router.register(r'export-jobs', ExportJobViewSet, basename='export-job')
+router.register(r'import-jobs', ImportJobViewSet, basename='import-job')
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('import-barcode-summary/', BarcodeSummaryImportView.as_view(), name='import-barcode-summary'),
+    path('live/', live_changes, name='barcode-summary-live'),
 ]
\ No newline at end of file
@@ -0,0 +1,14 @@
+from .models import TableVersion
+
+BARCODE_SUMMARY_TABLE = 'barcode_summary'
+
+
+def get_table_version(name=BARCODE_SUMMARY_TABLE):
+    """读取数据表当前版本号和最后修改时间，表尚未登记时返回 (0, None)"""
+    row = TableVersion.objects.filter(name=name).values_list('version', 'updated_at').first()
+    return row if row is not None else (0, None)
+
+
+def get_row_count(name=BARCODE_SUMMARY_TABLE):
+    """读取触发器维护的数据表总行数，表尚未登记时返回None"""
+    return TableVersion.objects.filter(name=name).values_list('row_count', flat=True).first()
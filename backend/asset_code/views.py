@@ -1,25 +1,44 @@
-from rest_framework import viewsets, filters, status
+import os
+import shutil
+from pathlib import Path
+from rest_framework import viewsets, mixins, filters, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db import models
-from .models import BarcodeSummary
-from .serializers import BarcodeSummarySerializer
-import pandas as pd
-from django.http import HttpResponse
+from .models import BarcodeSummary, ExportJob, ImportJob
+from .serializers import (BarcodeSummarySerializer, BarcodeSummaryReadSerializer, ExportJobSerializer,
+                          ImportJobSerializer, READ_FIELDS, parse_fields)
+from .exporters import EXPORT_FORMATS, CONTENT_TYPES, iter_export_rows
+from .parallel_export import needs_split
+from .pagination import CachedCountPagination, KeysetPagination
+from .search import FullTextSearchFilter, SEARCH_FIELDS
+from .filters import BarcodeSummaryFilter, filter_barcode_summaries, get_filter_params
+from .conditional import conditional_get
+from .changefeed import decode_cursor, cursor_expired, get_changes
+from .rollups import FACET_FIELDS, get_aggregates
+from .rounds import DIFF_CHANGES, diff_counts, diff_rows, list_rounds
+from .bulk_update import RowErrors, apply_bulk_update
+from .export_cache import get_cache_key, get_cached_file, normalize_export_filters, tee_to_cache
+from .jobs import get_import_dir
+from django.conf import settings
+from django.http import StreamingHttpResponse, FileResponse
 from datetime import datetime
 
 class BarcodeSummaryViewSet(viewsets.ModelViewSet):
     """条码汇总数据视图集"""
     queryset = BarcodeSummary.objects.all()
     serializer_class = BarcodeSummarySerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = CachedCountPagination
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
     
-    # 支持所有字段的搜索（新增user、asset_type、result字段）
-    search_fields = ['barcode', 'model', 'location', 'scanner', 'scan_time', 'remarks', 'user', 'asset_type']
+    # 支持所有字段的搜索（新增user、asset_type、result字段），通过全文索引匹配
+    search_fields = SEARCH_FIELDS
     
-    # 支持所有字段的过滤（新增user、asset_type、result字段）
-    filterset_fields = ['barcode', 'model', 'location', 'scanner', 'scan_time', 'remarks', 'user', 'asset_type', 'result']
+    # 支持所有字段的精确过滤（含user、asset_type、result、batch、archived），处理状态改写为可走索引的条件
+    filterset_class = BarcodeSummaryFilter
     
     # 支持所有字段的排序（新增user、asset_type、result字段）
     ordering_fields = ['barcode', 'model', 'location', 'scanner', 'scan_time', 'user', 'asset_type', 'result', 'created_at', 'updated_at']
@@ -27,99 +46,259 @@ class BarcodeSummaryViewSet(viewsets.ModelViewSet):
     # 默认排序
     ordering = ['-created_at']
     
+    @property
+    def paginator(self):
+        # ?pagination=cursor 时使用键集分页，避免深分页的 COUNT(*) 和 OFFSET 开销
+        if not hasattr(self, '_paginator'):
+            if self.request is not None and self.request.query_params.get('pagination') == 'cursor':
+                self._paginator = KeysetPagination()
+            else:
+                self._paginator = self.pagination_class() if self.pagination_class else None
+        return self._paginator
+    
+    def get_requested_fields(self):
+        """解析 ?fields=barcode,model；未指定时返回None表示全部字段"""
+        return parse_fields(self.request.query_params.get('fields'))
+    
+    def get_int_param(self, name, default, maximum):
+        """读取正整数参数并限制在 1 ~ maximum 之间"""
+        try:
+            value = int(self.request.query_params.get(name) or default)
+        except ValueError:
+            raise ValidationError({name: '必须是整数'})
+        return max(1, min(value, maximum))
+    
+    @conditional_get
+    def list(self, request, *args, **kwargs):
+        """列表按 .values() 取数并用只读序列化器输出，不构造模型实例"""
+        fields = self.get_requested_fields() or READ_FIELDS
+        queryset = self.filter_queryset(self.get_queryset())
+        # 排序字段一并取出，游标分页据此生成游标
+        ordering = [term.lstrip('-') for term in queryset.query.order_by if isinstance(term, str)]
+        queryset = queryset.values(*dict.fromkeys([*fields, *ordering]))
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = BarcodeSummaryReadSerializer(page, many=True, fields=fields)
+            return self.get_paginated_response(serializer.data)
+        serializer = BarcodeSummaryReadSerializer(queryset, many=True, fields=fields)
+        return Response(serializer.data)
+    
+    @conditional_get
+    def retrieve(self, request, *args, **kwargs):
+        serializer = self.get_serializer(self.get_object(), fields=self.get_requested_fields())
+        return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'])
+    @conditional_get
+    def changes(self, request):
+        """增量同步：返回游标之后新增、修改、删除的数据，不带游标时从头开始（不含已删除数据）
+        
+        参数: cursor 上次返回的游标；limit 每次条数；fields 同列表接口
+        """
+        since_seq = None
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            try:
+                since_seq, issued_at = decode_cursor(cursor)
+            except ValueError as e:
+                raise ValidationError({'cursor': str(e)})
+            if cursor_expired(issued_at):
+                return Response({'error': '同步游标已过期，请重新全量同步'}, status=status.HTTP_410_GONE)
+        
+        limit = self.get_int_param('limit', settings.CHANGE_FEED_PAGE_SIZE, settings.CHANGE_FEED_MAX_PAGE_SIZE)
+        
+        results, next_cursor, has_more = get_changes(since_seq, limit, self.get_requested_fields() or READ_FIELDS)
+        return Response({'results': results, 'cursor': next_cursor, 'has_more': has_more})
+    
+    @action(detail=False, methods=['get'])
+    @conditional_get
+    def aggregates(self, request):
+        """按列表接口的筛选和搜索条件统计总数、各字段取值分布及每日扫描数量
+        
+        参数: facets 统计字段（逗号分隔，默认全部）；facet_limit 每个字段返回的取值个数；days 最近的扫描日期个数
+        """
+        facets = FACET_FIELDS
+        value = request.query_params.get('facets')
+        if value:
+            facets = [name.strip() for name in value.split(',') if name.strip()]
+            unknown = [name for name in facets if name not in FACET_FIELDS]
+            if unknown:
+                raise ValidationError({'facets': f'不支持的统计字段: {", ".join(unknown)}'})
+        
+        limit = self.get_int_param('facet_limit', settings.AGGREGATE_FACET_LIMIT, settings.AGGREGATE_MAX_FACET_LIMIT)
+        days = self.get_int_param('days', settings.AGGREGATE_DAYS, settings.AGGREGATE_MAX_DAYS)
+        queryset = self.filter_queryset(self.get_queryset())
+        filtered = bool(get_filter_params(request.query_params, self.filterset_class))
+        return Response(get_aggregates(queryset, facets, limit, days, filtered=filtered))
+    
     @action(detail=False, methods=['get'])
+    @conditional_get
+    def rounds(self, request):
+        """盘点批次列表：每个批次的条码数和导入时间范围（不含历史数据和已归档的行）"""
+        return Response(list_rounds())
+    
+    @action(detail=False, methods=['get'], url_path='round-diff')
+    @conditional_get
+    def round_diff(self, request):
+        """两个盘点批次对比：新出现、消失、位置变化、扫描人员变化
+        
+        参数: base 基准批次；target 对比批次；不带 change 时返回各类变化的数量；
+        change 为 appeared / disappeared / moved / scanner_changed 时按条码顺序返回明细，
+        after 为上一页返回的 next，limit 每页条数
+        """
+        rounds = {}
+        for name in ('base', 'target'):
+            value = request.query_params.get(name, '').strip()
+            if not value:
+                raise ValidationError({name: '请指定盘点批次'})
+            if not BarcodeSummary.objects.filter(batch=value).exists():
+                raise ValidationError({name: f'盘点批次不存在: {value}'})
+            rounds[name] = value
+        
+        change = request.query_params.get('change')
+        if not change:
+            return Response({**rounds, 'counts': diff_counts(rounds['base'], rounds['target'])})
+        if change not in DIFF_CHANGES:
+            raise ValidationError({'change': f'不支持的对比类型: {change}'})
+        
+        limit = self.get_int_param('limit', settings.ROUND_DIFF_PAGE_SIZE, settings.ROUND_DIFF_MAX_PAGE_SIZE)
+        results = diff_rows(rounds['base'], rounds['target'], change, request.query_params.get('after', ''), limit)
+        next_after = results[-1]['barcode'] if len(results) == limit else None
+        return Response({**rounds, 'change': change, 'results': results, 'next': next_after})
+    
+    @action(detail=False, methods=['post'], url_path='bulk-update')
+    def bulk_update(self, request):
+        """批量修改处理状态、预计处理时间、处理结果备注，一个事务内完成
+        
+        请求体: {"ids": [...], "values": {...}} / {"filters": {...}, "values": {...}} / {"items": [{"id": ..., ...}]}
+        任一行校验失败时不做任何修改，返回 {"errors": [{"index", "id", "errors"}]}
+        """
+        if not isinstance(request.data, dict):
+            raise ValidationError({'detail': '请求体必须是对象'})
+        try:
+            updated = apply_bulk_update(request.data)
+        except RowErrors as e:
+            return Response({'errors': e.errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'updated': updated})
+    
+    def perform_content_negotiation(self, request, force=False):
+        # 导出接口的format参数用于选择文件格式，不参与DRF渲染器协商
+        if self.action == 'export':
+            force = True
+        return super().perform_content_negotiation(request, force)
+    
+    @action(detail=False, methods=['get'])
+    @conditional_get
     def export(self, request):
-        """按当前搜索条件导出Excel"""
+        """按当前搜索条件流式导出，支持 format=xlsx（默认）/csv/ndjson
+        
+        xlsx 结果超过 EXPORT_ZIP_THRESHOLD_ROWS 行时不在请求中生成，创建后台导出任务并返回202和任务信息，
+        由客户端轮询 export-jobs 接口后下载（拆分为多个工作簿的zip）。
+        """
         try:
-            # 获取查询参数（包含新增字段）
-            search = request.query_params.get('search', '')
-            barcode = request.query_params.get('barcode', '')
-            model = request.query_params.get('model', '')
-            location = request.query_params.get('location', '')
-            scanner = request.query_params.get('scanner', '')
-            scan_time = request.query_params.get('scan_time', '')
-            remarks = request.query_params.get('remarks', '')
-            user = request.query_params.get('user', '')
-            asset_type = request.query_params.get('asset_type', '')
-            result = request.query_params.get('result', '')
-            
-            # 构建查询集
-            queryset = BarcodeSummary.objects.all()
-            
-            # 应用搜索条件（包含新增字段）
-            if search:
-                queryset = queryset.filter(
-                    models.Q(barcode__icontains=search) |
-                    models.Q(model__icontains=search) |
-                    models.Q(location__icontains=search) |
-                    models.Q(scanner__icontains=search) |
-                    models.Q(scan_time__icontains=search) |
-                    models.Q(remarks__icontains=search) |
-                    models.Q(user__icontains=search) |
-                    models.Q(asset_type__icontains=search)
-                )
+            export_format = request.query_params.get('format', 'xlsx') or 'xlsx'
+            if export_format not in EXPORT_FORMATS:
+                return Response({'error': f'不支持的导出格式: {export_format}'}, status=status.HTTP_400_BAD_REQUEST)
+            file_stem = f'条码汇总导出_{datetime.now().strftime("%Y%m%d_%H%M%S")}'
             
-            # 应用筛选条件（包含新增字段）
-            if barcode:
-                queryset = queryset.filter(barcode__icontains=barcode)
-            if model:
-                queryset = queryset.filter(model__icontains=model)
-            if location:
-                queryset = queryset.filter(location__icontains=location)
-            if scanner:
-                queryset = queryset.filter(scanner__icontains=scanner)
-            if scan_time:
-                queryset = queryset.filter(scan_time__icontains=scan_time)
-            if remarks:
-                queryset = queryset.filter(remarks__icontains=remarks)
-            if user:
-                queryset = queryset.filter(user__icontains=user)
-            if asset_type:
-                queryset = queryset.filter(asset_type__icontains=asset_type)
-            if result is not None and result != '':
-                # 将字符串转换为布尔值
-                if result.lower() in ('true', '1', 'yes', '是'):
-                    result_bool = True
-                elif result.lower() in ('false', '0', 'no', '否'):
-                    result_bool = False
-                else:
-                    result_bool = bool(result)
-                queryset = queryset.filter(result=result_bool)
+            # 相同筛选条件且数据未变更时直接返回缓存文件
+            cache_key = get_cache_key(request.query_params, export_format)
+            cached_path = get_cached_file(cache_key, export_format)
+            if cached_path:
+                response = FileResponse(open(cached_path, 'rb'), content_type=CONTENT_TYPES[export_format])
+                response['Content-Disposition'] = f'attachment; filename="{file_stem}.{export_format}"'
+                response['X-Export-Cache'] = 'HIT'
+                return response
             
-            # 获取所有数据（不分页）
-            data = list(queryset.values(
-                'barcode', 'model', 'location', 'scanner', 
-                'scan_time', 'remarks', 'user', 'asset_type', 
-                'result', 'expected_time', 'result_remarks', 
-                'created_at', 'updated_at'
-            ))
+            queryset = filter_barcode_summaries(BarcodeSummary.objects.all(), request.query_params)
+            if export_format == 'xlsx' and needs_split(export_format, queryset.count()):
+                job = ExportJob.objects.create(export_format=export_format,
+                                               filters=normalize_export_filters(request.query_params),
+                                               created_by=request.user)
+                return Response(ExportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
             
-            # 创建DataFrame
-            df = pd.DataFrame(data)
-            
-            # 重命名列
-            df.columns = ['条码', '型号', '位置', '扫描人员', '时间', '备注', 
-                         '使用人', '资产类型', '处理状态', '预计处理时间', 
-                         '处理结果备注', '创建时间', '更新时间']
-            
-            # 处理布尔值
-            df['处理状态'] = df['处理状态'].map({True: '已完成', False: '处理中', None: '未处理'})
-            
-            # 处理空值
-            df = df.fillna('')
-            
-            # 处理时间格式
-            for col in ['预计处理时间', '创建时间', '更新时间']:
-                df[col] = pd.to_datetime(df[col]).dt.strftime('%Y-%m-%d %H:%M:%S')
-            
-            # 创建响应
-            response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-            response['Content-Disposition'] = f'attachment; filename="条码汇总导出_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx"'
-            
-            # 写入Excel文件
-            df.to_excel(response, index=False)
+            # 分块读取数据库并边生成边发送，内存占用与导出行数无关；生成完成后写入缓存
+            render, content_type = EXPORT_FORMATS[export_format]
+            response = StreamingHttpResponse(
+                tee_to_cache(render(iter_export_rows(queryset.order_by('id'))), cache_key, export_format),
+                content_type=content_type
+            )
+            response['Content-Disposition'] = f'attachment; filename="{file_stem}.{export_format}"'
+            response['X-Export-Cache'] = 'MISS'
             
             return response
             
         except Exception as e:
             return Response({'error': f'导出失败: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class ExportJobViewSet(mixins.CreateModelMixin,
+                       mixins.ListModelMixin,
+                       mixins.RetrieveModelMixin,
+                       viewsets.GenericViewSet):
+    """后台导出任务视图集：创建任务、查询进度、下载结果"""
+    serializer_class = ExportJobSerializer
+    
+    def get_queryset(self):
+        # 用户只能查看自己创建的任务
+        return ExportJob.objects.filter(created_by=self.request.user)
+    
+    def perform_create(self, serializer):
+        serializer.save(created_by=self.request.user)
+    
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """下载已完成的导出文件"""
+        job = self.get_object()
+        if job.status != ExportJob.STATUS_SUCCESS:
+            return Response({'error': '导出任务尚未完成'}, status=status.HTTP_409_CONFLICT)
+        if not job.file_path or not os.path.exists(job.file_path):
+            return Response({'error': '导出文件已过期或不存在'}, status=status.HTTP_410_GONE)
+        
+        # 超大xlsx导出的结果为zip
+        extension = os.path.splitext(job.file_path)[1].lstrip('.')
+        return FileResponse(open(job.file_path, 'rb'), as_attachment=True,
+                            filename=job.file_name, content_type=CONTENT_TYPES[extension])
+
+
+class BarcodeSummaryImportView(APIView):
+    """上传Excel导入条码汇总：上传文件直接写入磁盘，解析和写库由后台worker执行，返回导入任务"""
+    parser_classes = [MultiPartParser]
+    
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': '请选择要上传的文件'}, status=status.HTTP_400_BAD_REQUEST)
+        if not upload.name.lower().endswith('.xlsx'):
+            return Response({'error': '只支持xlsx格式的文件'}, status=status.HTTP_400_BAD_REQUEST)
+        if upload.size > settings.IMPORT_MAX_UPLOAD_SIZE:
+            return Response({'error': f'文件超过 {settings.IMPORT_MAX_UPLOAD_SIZE // 1024 // 1024}MB'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        
+        # 以文件名作为盘点批次，与导入脚本一致；同一批次内重复的条码会被跳过
+        file_name = Path(upload.name).name
+        job = ImportJob.objects.create(file_name=file_name, batch=Path(file_name).stem[:100], created_by=request.user)
+        file_path = os.path.join(get_import_dir(), f'import_job_{job.id}.xlsx')
+        # 超过 FILE_UPLOAD_MAX_MEMORY_SIZE 的上传已由Django按块写入临时文件，直接移动，不读入内存
+        if hasattr(upload, 'temporary_file_path'):
+            shutil.move(upload.temporary_file_path(), file_path)
+        else:
+            with open(file_path, 'wb') as f:
+                for chunk in upload.chunks():
+                    f.write(chunk)
+        upload.close()
+        job.file_path = file_path
+        job.save(update_fields=['file_path'])
+        return Response(ImportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class ImportJobViewSet(mixins.ListModelMixin,
+                       mixins.RetrieveModelMixin,
+                       viewsets.GenericViewSet):
+    """导入任务视图集：查询导入进度和结果"""
+    serializer_class = ImportJobSerializer
+    
+    def get_queryset(self):
+        # 用户只能查看自己创建的任务
+        return ImportJob.objects.filter(created_by=self.request.user)
@@ -2,16 +2,19 @@
 # -*- coding: utf-8 -*-
 """
 新增数据导入脚本
-用于将新增.xlsx文件中的数据导入到BarcodeSummary表中，不会覆盖现有数据
-使用方法: python add_new_data.py [excel文件路径]
+用于将新增.xlsx文件中的数据导入到BarcodeSummary表中，不会覆盖现有数据；以文件名作为盘点批次，
+只跳过本批次中已存在的条码，其他批次（盘点轮次）中出现过的条码照常导入，供盘点批次对比
+按块提交，每块提交时记录断点（ImportRun）；中途退出后再次导入同一文件时从断点继续，已提交的行不再处理
+使用方法: python add_new_data.py [excel文件路径] [--restart] [--yes]
 如果不指定文件路径，则使用默认文件
 """
 
 import os
 import sys
+import argparse
 import django
+import numpy as np
 from datetime import datetime
-import pandas as pd
 from pathlib import Path
 from django.db import transaction
 
@@ -22,11 +25,22 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'asset.settings')
 django.setup()
 
 from asset_code.models import BarcodeSummary
+from asset_code.importers import IMPORT_FIELDS
+from asset_code.enrichment import enrich_rows
+from asset_code.import_runs import start_run, save_checkpoint, finish_run
+from normalize_common import normalize_columns, normalize_frame, drop_empty_barcodes, split_too_long, to_records
+from workbook_cache import read_excel
+
+# 运行记录中的脚本名
+SCRIPT_NAME = 'add_new_data'
+
+# 每次提交的行数
+COMMIT_ROWS = 2000
 
 def read_excel_file(file_path):
     """读取Excel文件"""
     try:
-        df = pd.read_excel(file_path)
+        df = read_excel(file_path)
         print(f"成功读取Excel文件，共 {len(df)} 行数据")
         print(f"列名: {list(df.columns)}")
         return df
@@ -35,49 +49,8 @@ def read_excel_file(file_path):
         return None
 
 def normalize_column_names(df):
-    """标准化列名"""
-    # 移除列名中的空格和特殊字符
-    df.columns = df.columns.str.strip()
-    
-    # 定义列名映射关系
-    column_mapping = {
-        '条码': 'barcode',
-        '条形码': 'barcode',
-        'barcode': 'barcode',
-        'BARCODE': 'barcode',
-        
-        '型号': 'model',
-        'model': 'model',
-        'MODEL': 'model',
-        '产品型号': 'model',
-        
-        '位置': 'location',
-        'location': 'location',
-        'LOCATION': 'location',
-        '存放位置': 'location',
-        
-        '扫描人员': 'scanner',
-        'scanner': 'scanner',
-        'SCANNER': 'scanner',
-        '扫描人': 'scanner',
-        '操作员': 'scanner',
-        
-        '时间': 'scan_time',
-        '扫描时间': 'scan_time',
-        'scan_time': 'scan_time',
-        'SCAN_TIME': 'scan_time',
-        '时间戳': 'scan_time',
-        
-        '备注': 'remarks',
-        'remarks': 'remarks',
-        'REMARKS': 'remarks',
-        '说明': 'remarks',
-        '注释': 'remarks'
-    }
-    
-    # 重命名列
-    df.rename(columns=column_mapping, inplace=True)
-    return df
+    """标准化列名：去除首尾空白，按别名映射到模型字段"""
+    return normalize_columns(df)
 
 def validate_required_fields(df):
     """验证必需字段"""
@@ -99,11 +72,11 @@ def validate_required_fields(df):
     
     return True
 
-def check_existing_barcodes(df):
-    """检查已存在的条码"""
+def check_existing_barcodes(df, batch=''):
+    """检查本批次中已存在的条码"""
     barcodes = df['barcode'].dropna().astype(str).tolist()
     existing_barcodes = set(
-        BarcodeSummary.objects.filter(barcode__in=barcodes)
+        BarcodeSummary.objects.filter(batch=batch, barcode__in=barcodes)
         .values_list('barcode', flat=True)
     )
     
@@ -115,64 +88,77 @@ def check_existing_barcodes(df):
     return df, existing_barcodes
 
 def clean_data(df):
-    """清理数据"""
-    # 移除空行
-    df = df.dropna(subset=['barcode'])
-    
-    # 清理字符串字段
-    string_fields = ['barcode', 'model', 'location', 'scanner', 'scan_time', 'remarks']
-    for field in string_fields:
-        if field in df.columns:
-            df[field] = df[field].astype(str).str.strip()
-            # 将空字符串替换为None
-            df[field] = df[field].replace('', None)
-    
+    """清理数据：字符串去除首尾空白，空值转为None，移除条码为空的行"""
+    df = normalize_frame(df, [field for field in IMPORT_FIELDS if field in df.columns])
+    df, _ = drop_empty_barcodes(df)
     return df
 
-def import_data(df):
-    """导入数据到数据库"""
-    success_count = 0
-    error_count = 0
-    errors = []
-    
-    # 获取可选字段
-    available_fields = set(df.columns) & set([
-        'barcode', 'model', 'location', 'scanner', 
-        'scan_time', 'remarks', 'user', 'asset_type'
-    ])
-    
-    with transaction.atomic():
-        for index, row in df.iterrows():
-            try:
-                # 准备数据
-                data = {}
-                for field in available_fields:
-                    if pd.notna(row[field]):
-                        data[field] = str(row[field]).strip()
-                
-                # 创建记录
-                BarcodeSummary.objects.create(**data)
-                success_count += 1
-                
-                if success_count % 100 == 0:
-                    print(f"已导入 {success_count} 条记录...")
-                    
-            except Exception as e:
-                error_count += 1
-                error_msg = f"第 {index + 2} 行导入失败: {str(e)}"
-                errors.append(error_msg)
-                print(error_msg)
-    
-    return success_count, error_count, errors
+def drop_duplicate_barcodes(df):
+    """文件内重复的条码只保留第一行，返回 (DataFrame, 去掉的行数)"""
+    duplicated = df['barcode'].duplicated()
+    return df[~duplicated], int(duplicated.sum())
+
+def count_before(index, offset):
+    """有序行位置中小于 offset 的个数"""
+    return int(np.searchsorted(index, offset))
+
+def import_data(df, run, skipped_index, batch=''):
+    """按块导入数据库，每块与断点在同一事务中提交
+
+    行位置为清理后保留的 read_excel 行索引；skipped_index 为已存在而跳过的行位置，断点统计中只计入断点之前的部分。
+    """
+    # 字段长度超限的行整列校验后跳过
+    valid, errors = split_too_long(df)
+    error_index = np.sort(df.index.difference(valid.index).to_numpy())
+    skipped_index = np.sort(np.asarray(skipped_index))
+    for error_msg in errors:
+        print(f"{error_msg}，导入失败")
+
+    # 续传时统计从断点累计
+    base = {key: run.stats.get(key, 0) for key in ('inserted', 'errors', 'existing')}
+    success_count = base['inserted']
+
+    # 条码有资产数据时补充使用人、型号和资产类型；空值不传入，使用模型默认值
+    records = to_records(valid)
+    positions = valid.index
+    for start in range(0, len(records), COMMIT_ROWS):
+        chunk = records[start:start + COMMIT_ROWS]
+        enrich_rows(chunk)
+        objects = [
+            BarcodeSummary(batch=batch, **{field: value for field, value in record.items() if value is not None})
+            for record in chunk
+        ]
+        offset = int(positions[start + len(chunk) - 1]) + 1
+        with transaction.atomic():
+            BarcodeSummary.objects.bulk_create(objects, batch_size=1000)
+            success_count += len(objects)
+            save_checkpoint(run, offset, {
+                'inserted': success_count,
+                'errors': base['errors'] + count_before(error_index, offset),
+                'existing': base['existing'] + count_before(skipped_index, offset),
+            })
+
+    stats = {
+        'inserted': success_count,
+        'errors': base['errors'] + len(error_index),
+        'existing': base['existing'] + len(skipped_index),
+    }
+    return stats, errors
 
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description='导入新增数据')
+    parser.add_argument('excel_file', nargs='?', help='Excel文件路径（默认为 data/2025_11131433.xlsx）')
+    parser.add_argument('--restart', action='store_true', help='忽略未完成导入的断点，从头导入')
+    parser.add_argument('--yes', '-y', action='store_true', help='不询问确认直接导入（用于定时任务等非交互运行）')
+    args = parser.parse_args()
+
     print("=== 新增数据导入脚本 ===")
     print(f"开始时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
     # 获取命令行参数中的文件路径
-    if len(sys.argv) > 1:
-        excel_file = sys.argv[1]
+    if args.excel_file:
+        excel_file = args.excel_file
         # 如果是相对路径，转换为绝对路径
         if not os.path.isabs(excel_file):
             excel_file = os.path.abspath(excel_file)
@@ -204,30 +190,50 @@ def main():
     # 清理数据
     df = clean_data(df)
     print("数据清理完成")
+    df, duplicate_count = drop_duplicate_barcodes(df)
+    if duplicate_count:
+        print(f"发现 {duplicate_count} 行文件内重复的条码，只导入第一行")
+    
+    # 同一文件有未完成的导入时，断点之前的行已提交，不再处理
+    batch = Path(excel_file).stem[:100]
+    run, resumed = start_run(SCRIPT_NAME, excel_file, batch, restart=args.restart)
+    if resumed:
+        df = df[df.index >= run.rows_committed]
+        print(f"从断点继续导入（运行记录 {run.id}）：已导入 {run.stats.get('inserted', 0)} 条，"
+              f"剩余 {len(df)} 行待处理；从头导入请加 --restart")
     
     # 检查已存在的条码
-    df, existing_barcodes = check_existing_barcodes(df)
+    before = df.index
+    df, existing_barcodes = check_existing_barcodes(df, batch)
+    skipped_index = before.difference(df.index)
     print(f"过滤后剩余 {len(df)} 条新记录")
     
     if len(df) == 0:
+        finish_run(run, {**run.stats, 'existing': run.stats.get('existing', 0) + len(skipped_index)})
         print("没有新数据需要导入")
         return
     
     # 确认导入
-    response = input(f"\n确认导入 {len(df)} 条新记录吗? (y/N): ")
-    if response.lower() != 'y':
+    if not args.yes and input(f"\n确认导入 {len(df)} 条新记录吗? (y/N): ").lower() != 'y':
+        finish_run(run, error='导入已取消')
         print("导入已取消")
         return
     
     # 导入数据
     print("开始导入数据...")
-    success_count, error_count, errors = import_data(df)
+    try:
+        stats, errors = import_data(df, run, skipped_index, batch)
+    except Exception as e:
+        finish_run(run, error=str(e))
+        print(f"导入失败: {e}（已提交的部分已记录断点，再次运行将继续导入）")
+        raise
+    finish_run(run, stats)
     
     # 输出结果
     print("\n=== 导入结果 ===")
-    print(f"成功导入: {success_count} 条")
-    print(f"导入失败: {error_count} 条")
-    print(f"跳过的已存在条码: {len(existing_barcodes)} 条")
+    print(f"成功导入: {stats['inserted']} 条")
+    print(f"导入失败: {stats['errors']} 条")
+    print(f"跳过的已存在条码: {stats['existing']} 条")
     
     if errors:
         print("\n错误详情:")
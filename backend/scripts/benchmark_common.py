@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试公共工具
+- 使用独立的临时SQLite数据库，不会影响 db.sqlite3 中的正式数据
+- 生成指定数量的模拟条码汇总数据
+- 后台线程采样进程RSS，统计峰值内存
+"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+from pathlib import Path
+
+import django
+
+project_path = Path(__file__).parent.parent
+sys.path.append(str(project_path))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'asset.settings')
+
+ASSET_TYPES = ['工厂借用', '研发样机', '']
+LOCATIONS = ['机房A-01', '机房A-02', '实验室3楼', '仓库B区', '研发中心2楼']
+SCANNERS = ['张三', '李四', '王五', '赵六']
+
+
+def setup_django(db_path=None):
+    """初始化Django并切换到临时数据库，返回数据库文件路径"""
+    from django.conf import settings
+
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix='asset_bench_'), 'bench.sqlite3')
+    settings.DATABASES['default']['NAME'] = db_path
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    return db_path
+
+
+def seed_barcode_summaries(total, batch_size=5000, start=0):
+    """批量生成模拟数据"""
+    from asset_code.models import BarcodeSummary
+
+    created = 0
+    while created < total:
+        size = min(batch_size, total - created)
+        objects = []
+        for i in range(start + created, start + created + size):
+            objects.append(BarcodeSummary(
+                barcode=f'MP{i:010d}',
+                model=f'MODEL-{i % 500:03d}',
+                location=LOCATIONS[i % len(LOCATIONS)],
+                scanner=SCANNERS[i % len(SCANNERS)],
+                scan_time=f'2025-11-{(i % 28) + 1:02d} 10:{i % 60:02d}:00',
+                remarks='' if i % 3 else f'备注{i}',
+                user=f'用户{i % 2000}',
+                asset_type=ASSET_TYPES[i % len(ASSET_TYPES)],
+                result=(i % 4 == 0),
+            ))
+        BarcodeSummary.objects.bulk_create(objects, batch_size=batch_size)
+        created += size
+    return created
+
+
+def current_rss_mb():
+    """读取当前进程的常驻内存（MB）"""
+    with open('/proc/self/statm') as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+
+
+class RssSampler:
+    """后台线程定时采样RSS，记录峰值"""
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.baseline = 0.0
+        self.peak = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, current_rss_mb())
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self.baseline = current_rss_mb()
+        self.peak = self.baseline
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss_mb())
+
+    @property
+    def growth(self):
+        return self.peak - self.baseline
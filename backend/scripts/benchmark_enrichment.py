@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+资产数据补充性能基准测试
+- 资产数据增量写入：首次写入、无变化的快照、1%变化的快照
+- 已有条码汇总按资产数据补充：全量关联与只关联有变化的资产数据
+- 条码汇总写入时补充：同步导入新数据时按资产数据补充带来的额外耗时
+使用方法: python benchmark_enrichment.py [--rows 300000] [--assets 100000]
+数据写入临时SQLite数据库，不影响正式数据
+"""
+
+import time
+import argparse
+
+from benchmark_common import setup_django, seed_barcode_summaries
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='资产数据补充性能基准测试')
+    parser.add_argument('--rows', type=int, default=300000, help='条码汇总行数')
+    parser.add_argument('--assets', type=int, default=100000, help='资产数据行数（另有十分之一不在条码汇总中）')
+    args = parser.parse_args()
+
+    db_path = setup_django()
+    print(f"临时数据库: {db_path}")
+
+    from asset_code.enrichment import load_asset_records, enrich_barcode_summaries
+    from asset_code.models import BarcodeSummary
+    from asset_code.sync import BarcodeSummarySync
+
+    seed_barcode_summaries(args.rows)
+    # 资产编号按间隔取条码汇总中的条码，另加十分之一不存在的资产编号
+    step = max(args.rows // args.assets, 1)
+    assets = [(f'MP{i:010d}', f'使用人{i % 3000}', f'DEVICE-{i % 700:03d}') for i in range(0, args.rows, step)][:args.assets]
+    assets += [(f'ZZ{i:010d}', '使用人', 'DEVICE') for i in range(args.assets // 10)]
+    changed = [(code, f'{user}-调岗' if n % 100 == 0 else user, model) for n, (code, user, model) in enumerate(assets)]
+
+    print("=" * 70)
+    seconds, stats = timed(lambda: load_asset_records(assets))
+    print(f"资产数据首次写入: {seconds:.2f}s，新增 {stats['inserted']}")
+    seconds, result = timed(lambda: enrich_barcode_summaries(since=stats['loaded_at']))
+    print(f"补充已有条码汇总: {seconds:.2f}s，关联 {result['matched']}，更新 {result['updated']}")
+    seconds, stats = timed(lambda: load_asset_records(assets))
+    print(f"资产数据无变化的快照: {seconds:.2f}s，无变化 {stats['unchanged']}")
+    seconds, stats = timed(lambda: load_asset_records(changed))
+    print(f"资产数据1%变化的快照: {seconds:.2f}s，修改 {stats['updated']}")
+    seconds, result = timed(lambda: enrich_barcode_summaries(since=stats['loaded_at']))
+    print(f"只补充有变化的资产数据: {seconds:.2f}s，关联 {result['matched']}，更新 {result['updated']}")
+    seconds, result = timed(lambda: enrich_barcode_summaries())
+    print(f"全量关联补充（无变化）: {seconds:.2f}s，关联 {result['matched']}，更新 {result['updated']}")
+
+    # 新批次写入：一半条码有资产数据
+    def sync(batch):
+        sync = BarcodeSummarySync(batch)
+        for i in range(0, args.rows, 3):
+            code = f'MP{i:010d}' if i % 2 else f'NEW{i:010d}'
+            sync.add({'barcode': code, 'model': 'M', 'location': '机房', 'scanner': '张三', 'scan_time': '', 'remarks': ''})
+        return sync.finish()
+
+    seconds, stats = timed(lambda: sync('新批次'))
+    enriched = BarcodeSummary.objects.filter(batch='新批次', asset_type='工厂借用').count()
+    print(f"同步写入新批次并补充: {seconds:.2f}s，新增 {stats['inserted']}，写入时补充 {enriched}")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
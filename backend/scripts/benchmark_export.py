@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+导出性能基准测试
+对比原 pandas 全量导出与流式导出（xlsx/csv/ndjson）在不同数据量下的首字节时间、总耗时和RSS增长
+使用方法: python benchmark_export.py [--rows 100000 1000000] [--formats xlsx csv ndjson] [--skip-legacy]
+数据写入临时SQLite数据库，不影响正式数据
+"""
+
+import io
+import gc
+import time
+import argparse
+
+from benchmark_common import setup_django, seed_barcode_summaries, RssSampler
+
+
+def legacy_export(queryset):
+    """原导出实现：全量加载到DataFrame后写入内存"""
+    import pandas as pd
+    from asset_code.exporters import EXPORT_FIELDS, EXPORT_HEADERS
+
+    data = list(queryset.values(*EXPORT_FIELDS))
+    df = pd.DataFrame(data)
+    df.columns = EXPORT_HEADERS
+    df['处理状态'] = df['处理状态'].map({True: '已完成', False: '处理中', None: '未处理'})
+    df = df.fillna('')
+    for col in ['预计处理时间', '创建时间', '更新时间']:
+        df[col] = pd.to_datetime(df[col]).dt.strftime('%Y-%m-%d %H:%M:%S')
+    output = io.BytesIO()
+    df.to_excel(output, index=False)
+    return output.getvalue()
+
+
+def run_streaming(view, request):
+    """通过导出接口流式读取响应，返回(首字节时间, 总耗时, 字节数)"""
+    start = time.perf_counter()
+    response = view(request)
+    first_byte = None
+    total_bytes = 0
+    for chunk in response.streaming_content:
+        if first_byte is None and chunk:
+            first_byte = time.perf_counter() - start
+        total_bytes += len(chunk)
+    response.close()
+    return first_byte, time.perf_counter() - start, total_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='导出性能基准测试')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000, 1000000], help='测试数据量')
+    parser.add_argument('--formats', nargs='+', default=['xlsx', 'csv', 'ndjson'], help='流式导出格式')
+    parser.add_argument('--skip-legacy', action='store_true', help='跳过原pandas导出（大数据量时很慢）')
+    args = parser.parse_args()
+
+    db_path = setup_django()
+    print(f"临时数据库: {db_path}")
+
+    from django.contrib.auth.models import User
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    from asset_code.models import BarcodeSummary
+    from asset_code.views import BarcodeSummaryViewSet
+
+    user = User.objects.create(username='benchmark')
+    factory = APIRequestFactory()
+    view = BarcodeSummaryViewSet.as_view({'get': 'export'})
+
+    seeded = 0
+    print("=" * 80)
+    print(f"{'行数':>10} {'模式':<10} {'首字节(s)':>10} {'总耗时(s)':>10} {'RSS增长(MB)':>12} {'大小(MB)':>10}")
+    print("-" * 80)
+    for rows in sorted(args.rows):
+        seeded += seed_barcode_summaries(rows - seeded, start=seeded)
+
+        for export_format in args.formats:
+            gc.collect()
+            request = factory.get('/api/asset-code/barcode-summaries/export/', {'format': export_format})
+            force_authenticate(request, user=user)
+            with RssSampler() as sampler:
+                first_byte, elapsed, size = run_streaming(view, request)
+            print(f"{rows:>10} {export_format:<10} {first_byte:>10.3f} {elapsed:>10.2f} "
+                  f"{sampler.growth:>12.1f} {size / 1024 / 1024:>10.1f}")
+
+        if not args.skip_legacy:
+            gc.collect()
+            with RssSampler() as sampler:
+                start = time.perf_counter()
+                content = legacy_export(BarcodeSummary.objects.all())
+                elapsed = time.perf_counter() - start
+            # 原实现在全部生成后才能发送第一个字节
+            print(f"{rows:>10} {'legacy':<10} {elapsed:>10.3f} {elapsed:>10.2f} "
+                  f"{sampler.growth:>12.1f} {len(content) / 1024 / 1024:>10.1f}")
+            del content
+    print("=" * 80)
+
+
+if __name__ == '__main__':
+    main()
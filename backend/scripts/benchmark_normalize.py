@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据清洗性能基准测试
+生成与 pd.read_excel 读取结果相同结构的条码汇总表（混合类型条码列、日期时间列、空值），
+对比原脚本 df.iterrows() 逐行清洗与 normalize_common 整列清洗的耗时，并核对两者结果一致
+使用方法: python benchmark_normalize.py [--rows 500000] [--xlsx]
+--xlsx 时先写入临时Excel文件再用 pd.read_excel 读回（耗时较长，列类型与真实文件完全一致）
+"""
+
+import os
+import time
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from benchmark_common import setup_django, LOCATIONS, SCANNERS
+
+
+def generate_sheet(rows):
+    """生成模拟的条码汇总表：每10行有一个被Excel存为数值的条码，每50行有一个空条码"""
+    i = np.arange(rows)
+    barcodes = pd.Series([f' MP{n:010d} ' for n in range(rows)], dtype=object)
+    numeric = i % 10 == 0
+    barcodes[numeric] = (i[numeric] + 10 ** 9).astype(float)
+    barcodes[i % 50 == 1] = np.nan
+    return pd.DataFrame({
+        '条码': barcodes,
+        '型号': pd.Series([f'MODEL-{n % 500:03d}' for n in range(rows)], dtype=object),
+        '位置': np.array(LOCATIONS, dtype=object)[i % len(LOCATIONS)],
+        '扫描人员': np.array(SCANNERS, dtype=object)[i % len(SCANNERS)],
+        '时间': pd.Timestamp('2025-11-01 08:00:00') + pd.to_timedelta(i % 86400, unit='s'),
+        '备注': np.where(i % 3 == 0, '  待确认 ', None),
+    })
+
+
+def legacy_prepare(df):
+    """原导入脚本的逐行清洗（prepare_data / import_barcode_data）"""
+    data_list = []
+    for _, row in df.iterrows():
+        barcode = str(row['条码']).strip() if pd.notna(row['条码']) else ''
+        if not barcode:
+            continue
+        data_list.append({
+            'barcode': barcode,
+            'model': str(row['型号']).strip() if pd.notna(row['型号']) else '',
+            'location': str(row['位置']).strip() if pd.notna(row['位置']) else '',
+            'scanner': str(row['扫描人员']).strip() if pd.notna(row['扫描人员']) else '',
+            'scan_time': str(row['时间']).strip() if pd.notna(row['时间']) else '',
+            'remarks': str(row['备注']).strip() if pd.notna(row['备注']) else '',
+        })
+    return data_list
+
+
+def main():
+    parser = argparse.ArgumentParser(description='数据清洗性能基准测试')
+    parser.add_argument('--rows', type=int, default=500000, help='数据行数')
+    parser.add_argument('--xlsx', action='store_true', help='经由临时Excel文件读取')
+    args = parser.parse_args()
+
+    setup_django()
+    from normalize_common import normalize_frame, drop_empty_barcodes, to_records, to_tuples
+
+    df = generate_sheet(args.rows)
+    if args.xlsx:
+        path = os.path.join(tempfile.mkdtemp(prefix='asset_bench_'), 'sheet.xlsx')
+        start = time.perf_counter()
+        df.to_excel(path, index=False)
+        df = pd.read_excel(path)
+        print(f"写入并读回Excel: {time.perf_counter() - start:.1f}s（{path}）")
+
+    fields = ['barcode', 'model', 'location', 'scanner', 'scan_time', 'remarks']
+
+    start = time.perf_counter()
+    legacy = legacy_prepare(df)
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    frame, _ = drop_empty_barcodes(normalize_frame(df, fields))
+    clean_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    records = to_records(frame, fill='')
+    records_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    to_tuples(frame, fill='')
+    tuples_seconds = time.perf_counter() - start
+
+    # 逐行清洗会把数值条码转换为 1000000000.0，整列清洗规范化为 1000000000，其余结果应一致
+    differences = sum(
+        1 for old, new in zip(legacy, records)
+        if {**old, 'barcode': old['barcode'].removesuffix('.0')} != new
+    )
+
+    print("=" * 60)
+    print(f"数据行数: {args.rows}，有效行数: {len(records)}（逐行清洗 {len(legacy)}）")
+    print(f"逐行清洗 iterrows: {legacy_seconds:.2f}s（{args.rows / legacy_seconds:,.0f} 行/秒）")
+    print(f"整列清洗: {clean_seconds:.2f}s，转换为字典 {records_seconds:.2f}s，转换为元组 {tuples_seconds:.2f}s")
+    print(f"整列清洗+字典: {args.rows / (clean_seconds + records_seconds):,.0f} 行/秒，"
+          f"提速 {legacy_seconds / (clean_seconds + records_seconds):.1f} 倍")
+    print(f"结果差异行数（不含条码 .0）: {differences}")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
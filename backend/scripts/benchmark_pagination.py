@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列表分页性能基准测试
+对比页码分页（COUNT(*) + OFFSET）与游标分页（?pagination=cursor）在第1页和深页的响应耗时
+使用方法: python benchmark_pagination.py [--rows 200000] [--pages 1 5000] [--repeat 5]
+数据写入临时SQLite数据库，不影响正式数据
+"""
+
+import time
+import argparse
+import statistics
+
+from benchmark_common import setup_django, seed_barcode_summaries
+
+
+def measure(view, factory, user, params, repeat):
+    """多次请求取中位数耗时（毫秒）"""
+    from rest_framework.test import force_authenticate
+
+    timings = []
+    for _ in range(repeat):
+        request = factory.get('/api/asset-code/barcode-summaries/', params)
+        force_authenticate(request, user=user)
+        start = time.perf_counter()
+        response = view(request)
+        response.render()
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.data
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='列表分页性能基准测试')
+    parser.add_argument('--rows', type=int, default=200000, help='测试数据量')
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 5000], help='测试的页码')
+    parser.add_argument('--repeat', type=int, default=5, help='每项重复次数')
+    args = parser.parse_args()
+
+    db_path = setup_django()
+    print(f"临时数据库: {db_path}")
+
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from rest_framework.test import APIRequestFactory
+    from asset_code.models import BarcodeSummary
+    from asset_code.pagination import KeysetPagination
+    from asset_code.views import BarcodeSummaryViewSet
+
+    print(f"生成 {args.rows} 条测试数据...")
+    seed_barcode_summaries(args.rows)
+
+    user = User.objects.create(username='benchmark')
+    factory = APIRequestFactory()
+    view = BarcodeSummaryViewSet.as_view({'get': 'list'})
+    page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    paginator = KeysetPagination()
+
+    print("=" * 60)
+    print(f"{'页码':>8} {'页码分页(ms)':>14} {'游标分页(ms)':>14}")
+    print("-" * 60)
+    for page in args.pages:
+        page_ms = measure(view, factory, user, {'page': page}, args.repeat)
+
+        # 直接定位上一页最后一行来构造游标，等价于从第1页连续翻到该页
+        cursor_params = {'pagination': 'cursor'}
+        if page > 1:
+            last = BarcodeSummary.objects.order_by('-created_at', '-id')[(page - 1) * page_size - 1]
+            cursor_params['cursor'] = paginator.encode_cursor(
+                [last.created_at.isoformat(), last.id], reverse=False
+            )
+        cursor_ms = measure(view, factory, user, cursor_params, args.repeat)
+        print(f"{page:>8} {page_ms:>14.1f} {cursor_ms:>14.1f}")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+盘点批次对比性能基准测试
+- 生成两个盘点批次：对比批次中约2%的条码为新出现、2%消失、1%位置变化、1%扫描人员变化
+- 统计批次列表、各类变化数量、每类变化第一页明细及翻到最后一页的耗时，并输出对比查询的执行计划
+使用方法: python benchmark_rounds.py [--rows 300000] [--limit 500]
+数据写入临时SQLite数据库，不影响正式数据
+"""
+
+import time
+import argparse
+
+from benchmark_common import setup_django, LOCATIONS, SCANNERS
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def seed_round(batch, rows, variant, batch_size=5000):
+    """写入一个批次；variant 为 True 时按比例生成新出现、消失、位置和扫描人员变化"""
+    from asset_code.models import BarcodeSummary
+
+    objects = []
+    for i in range(rows):
+        code = i
+        location = LOCATIONS[i % len(LOCATIONS)]
+        scanner = SCANNERS[i % len(SCANNERS)]
+        if variant:
+            if i % 50 == 0:
+                code = rows + i  # 新出现（同时原条码消失）
+            elif i % 100 == 1:
+                location = '新位置'
+            elif i % 100 == 2:
+                scanner = '新扫描人员'
+        objects.append(BarcodeSummary(batch=batch, barcode=f'MP{code:010d}', model=f'MODEL-{i % 500:03d}',
+                                      location=location, scanner=scanner))
+        if len(objects) >= batch_size:
+            BarcodeSummary.objects.bulk_create(objects)
+            objects = []
+    BarcodeSummary.objects.bulk_create(objects)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='盘点批次对比性能基准测试')
+    parser.add_argument('--rows', type=int, default=300000, help='每个批次的行数')
+    parser.add_argument('--limit', type=int, default=500, help='明细每页条数')
+    args = parser.parse_args()
+
+    db_path = setup_django()
+    print(f"临时数据库: {db_path}")
+
+    from django.db import connection, reset_queries
+    from django.test.utils import CaptureQueriesContext
+    from asset_code.rounds import DIFF_CHANGES, diff_counts, diff_rows, list_rounds
+
+    seconds, _ = timed(lambda: (seed_round('2025-11', args.rows, False), seed_round('2025-12', args.rows, True)))
+    print(f"生成两个批次各 {args.rows} 行: {seconds:.1f}s")
+
+    print("=" * 70)
+    seconds, rounds = timed(list_rounds)
+    print(f"批次列表: {seconds * 1000:.0f}ms，{[(r['batch'], r['count']) for r in rounds]}")
+    # 生成数据时的查询日志已超过上限，先清空再记录对比查询
+    reset_queries()
+    with CaptureQueriesContext(connection) as queries:
+        seconds, counts = timed(lambda: diff_counts('2025-11', '2025-12'))
+    print(f"各类变化数量: {seconds * 1000:.0f}ms，{counts}")
+    for change in DIFF_CHANGES:
+        seconds, rows = timed(lambda: diff_rows('2025-11', '2025-12', change, limit=args.limit))
+        # 从倒数第二页的位置翻到最后一页
+        after = ''
+        if counts[change] > args.limit:
+            after = diff_rows('2025-11', '2025-12', change, limit=counts[change] - 1)[-2]['barcode']
+        last_seconds, _ = timed(lambda: diff_rows('2025-11', '2025-12', change, after=after, limit=args.limit))
+        print(f"{change} 明细: 第一页 {len(rows)} 行 {seconds * 1000:.0f}ms，最后一页 {last_seconds * 1000:.0f}ms")
+
+    print("\n对比数量查询的执行计划:")
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {queries.captured_queries[0]['sql']}")
+        for row in cursor.fetchall():
+            print(f"  {row[-1]}")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列表序列化性能基准测试
+对比 ModelSerializer（模型实例 + 全部DRF字段）与只读序列化器（.values() 字典）每1000行的耗时，
+分别统计查询取数和序列化两部分，并测试 ?fields= 只取部分字段的情况
+使用方法: python benchmark_serializer.py [--rows 1000] [--repeat 20]
+数据写入临时SQLite数据库，不影响正式数据
+"""
+
+import time
+import argparse
+import statistics
+
+from benchmark_common import setup_django, seed_barcode_summaries
+
+# 列表页表格及编辑对话框用到的字段
+TABLE_FIELDS = ['id', 'barcode', 'model', 'location', 'scanner', 'scan_time', 'remarks',
+                'user', 'asset_type', 'result', 'expected_time', 'result_remarks']
+
+
+def measure(fetch, serialize, repeat):
+    """多次执行取中位数，返回 (取数耗时ms, 序列化耗时ms)"""
+    fetch_timings = []
+    serialize_timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = fetch()
+        fetched = time.perf_counter()
+        serialize(rows)
+        fetch_timings.append((fetched - start) * 1000)
+        serialize_timings.append((time.perf_counter() - fetched) * 1000)
+    return statistics.median(fetch_timings), statistics.median(serialize_timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='列表序列化性能基准测试')
+    parser.add_argument('--rows', type=int, default=1000, help='每次序列化的行数')
+    parser.add_argument('--repeat', type=int, default=20, help='每项重复次数')
+    args = parser.parse_args()
+
+    db_path = setup_django()
+    print(f"临时数据库: {db_path}")
+
+    from asset_code.models import BarcodeSummary
+    from asset_code.serializers import BarcodeSummarySerializer, BarcodeSummaryReadSerializer, READ_FIELDS
+
+    print(f"生成 {args.rows} 条测试数据...")
+    seed_barcode_summaries(args.rows)
+    base = BarcodeSummary.objects.order_by('-created_at')
+    queryset = lambda: base.all()[:args.rows]  # 每次重新查询，避免命中查询集缓存
+
+    cases = [
+        ('ModelSerializer 全部字段',
+         lambda: list(queryset()),
+         lambda rows: BarcodeSummarySerializer(rows, many=True).data),
+        ('values() 全部字段',
+         lambda: list(queryset().values(*READ_FIELDS)),
+         lambda rows: BarcodeSummaryReadSerializer(rows, many=True).data),
+        ('values() ?fields=表格字段',
+         lambda: list(queryset().values(*TABLE_FIELDS)),
+         lambda rows: BarcodeSummaryReadSerializer(rows, many=True, fields=TABLE_FIELDS).data),
+        ('values() ?fields=id,barcode',
+         lambda: list(queryset().values('id', 'barcode')),
+         lambda rows: BarcodeSummaryReadSerializer(rows, many=True, fields=['id', 'barcode']).data),
+    ]
+
+    scale = 1000 / args.rows
+    print("=" * 72)
+    print(f"{'方式':<28} {'取数(ms/千行)':>14} {'序列化(ms/千行)':>16} {'合计':>8}")
+    print("-" * 72)
+    for name, fetch, serialize in cases:
+        fetch_ms, serialize_ms = measure(fetch, serialize, args.repeat)
+        fetch_ms *= scale
+        serialize_ms *= scale
+        print(f"{name:<28} {fetch_ms:>14.2f} {serialize_ms:>16.2f} {fetch_ms + serialize_ms:>8.2f}")
+    print("=" * 72)
+
+
+if __name__ == '__main__':
+    main()
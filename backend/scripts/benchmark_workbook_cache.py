@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+工作簿解析缓存性能基准测试
+- 首次读取（解析Excel并写入缓存）与再次读取同一文件（命中缓存）的耗时
+- 文件内容改动后重新解析；缓存目录超过上限时按最近使用时间淘汰
+使用方法: python benchmark_workbook_cache.py [--rows 100000]
+Excel文件和缓存均写入临时目录，不影响正式缓存
+"""
+
+import os
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from benchmark_common import setup_django
+from benchmark_normalize import generate_sheet
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='工作簿解析缓存性能基准测试')
+    parser.add_argument('--rows', type=int, default=100000, help='数据行数')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    work_dir = Path(tempfile.mkdtemp(prefix='asset_bench_'))
+    settings.WORKBOOK_CACHE_DIR = work_dir / 'cache'
+    from workbook_cache import read_excel, evict
+
+    path = work_dir / 'sheet.xlsx'
+    seconds, _ = timed(lambda: generate_sheet(args.rows).to_excel(path, index=False))
+    print(f"生成Excel: {seconds:.1f}s（{path}，{path.stat().st_size / 1024 / 1024:.1f} MB）")
+
+    print("=" * 60)
+    direct_seconds, expected = timed(lambda: pd.read_excel(path))
+    print(f"pd.read_excel 直接解析: {direct_seconds:.2f}s")
+    seconds, _ = timed(lambda: read_excel(path))
+    print(f"首次读取（解析并写入缓存）: {seconds:.2f}s")
+    hit_seconds, cached = timed(lambda: read_excel(path))
+    print(f"再次读取（命中缓存）: {hit_seconds:.2f}s，提速 {direct_seconds / hit_seconds:.0f} 倍")
+    print(f"缓存结果与直接解析一致: {cached.equals(expected)}")
+
+    # 追加一行后文件哈希变化，应重新解析而不是读到旧缓存
+    changed = pd.concat([expected, expected.tail(1)], ignore_index=True)
+    changed.to_excel(path, index=False)
+    seconds, result = timed(lambda: read_excel(path))
+    print(f"文件改动后读取: {seconds:.2f}s，行数 {len(result)}（原 {len(expected)}）")
+
+    entries = sorted(os.listdir(settings.WORKBOOK_CACHE_DIR))
+    size = sum((settings.WORKBOOK_CACHE_DIR / name).stat().st_size for name in entries)
+    print(f"缓存文件: {len(entries)} 个，共 {size / 1024 / 1024:.1f} MB")
+    removed = evict(max_bytes=size - 1)
+    print(f"上限设为略小于总大小时淘汰: {removed} 个，剩余 {len(os.listdir(settings.WORKBOOK_CACHE_DIR))} 个")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,15 +2,17 @@
 """
 脚本功能：将条码汇总.xlsx数据导入到BarcodeSummary模型中（优化版）
 步骤：
-1. 清空现有数据
-2. 读取Excel文件
-3. 批量处理数据并导入到数据库
+1. 读取Excel文件
+2. 默认按条码与数据库比对差异：插入新条码，只更新来源字段有变化的行，保留用户填写的处理结果
+   （--reload 时先清空现有数据再全部重新导入）
+3. 按 --missing 处理Excel中已不存在的条码：保留（默认）、删除或归档
+使用方法: python import_barcode_summary.py [excel文件路径] [--reload] [--missing keep|delete|archive] [--batch 批次]
 """
 
 import os
 import sys
+import argparse
 import django
-import pandas as pd
 from datetime import datetime
 from pathlib import Path
 from tqdm import tqdm
@@ -22,21 +24,21 @@ sys.path.append(str(project_path))
 django.setup()
 
 from asset_code.models import BarcodeSummary
+from asset_code.enrichment import enrich_rows
+from asset_code.sync import BarcodeSummarySync, SOURCE_FIELDS, MISSING_KEEP, MISSING_POLICIES
+from normalize_common import normalize_frame, drop_empty_barcodes, split_too_long, to_records
+from workbook_cache import read_excel
 
-def process_batch(batch_data):
-    """批量处理数据"""
+def process_batch(batch_data, batch=''):
+    """批量处理数据；条码有资产数据时补充使用人、型号和资产类型"""
     barcode_objects = []
+    enrich_rows(batch_data)
     
     for row_data in batch_data:
         try:
             barcode_summary = BarcodeSummary(
-                barcode=row_data['barcode'],
-                model=row_data['model'],
-                location=row_data['location'],
-                scanner=row_data['scanner'],
-                scan_time=row_data['scan_time'],
-                remarks=row_data['remarks'],
-                asset_type=''  # 默认空字符串
+                **{'asset_type': '', **row_data},  # 资产类型默认空字符串
+                batch=batch
             )
             barcode_objects.append(barcode_summary)
         except Exception as e:
@@ -49,99 +51,72 @@ def process_batch(batch_data):
     
     return len(barcode_objects)
 
-def import_barcode_data():
+def import_barcode_data(excel_file, reload=False, missing=MISSING_KEEP, batch=''):
     """导入条码汇总数据（优化版）"""
     
-    # Excel文件路径
-    excel_file = '/home/007101/Asset/data/条码汇总.xlsx'
-    
     # 检查文件是否存在
     if not os.path.exists(excel_file):
         print(f"错误：Excel文件不存在: {excel_file}")
         return False
     
     try:
-        # 步骤1：清空现有数据
-        print("步骤1：清空现有数据...")
         current_count = BarcodeSummary.objects.count()
         print(f"当前数据库中有 {current_count} 条记录")
+        if reload:
+            # 全量重导会丢失用户填写的处理结果，仅在明确指定时使用
+            BarcodeSummary.objects.all().delete()
+            print("✓ 数据已清空（--reload）")
         
-        # 清空数据
-        BarcodeSummary.objects.all().delete()
-        print("✓ 数据已清空")
-        
-        # 步骤2：读取Excel文件
-        print("\n步骤2：读取Excel文件...")
-        df = pd.read_excel(excel_file)
+        # 步骤1：读取Excel文件
+        print("\n步骤1：读取Excel文件...")
+        df = read_excel(excel_file)
         print(f"Excel文件读取成功，共 {len(df)} 行数据")
         
-        # 步骤3：批量处理并导入数据
-        print("\n步骤3：批量处理并导入数据...")
+        # 步骤2：批量处理并导入数据
+        print("\n步骤2：" + ("批量导入数据..." if reload else "与数据库比对并同步..."))
+        sync = None if reload else BarcodeSummarySync(batch, missing=missing)
         
         # 统计信息
         total_rows = len(df)
         success_count = 0
-        error_count = 0
-        empty_barcode_count = 0
         
-        # 准备批量数据
-        batch_data = []
-        batch_size = 1000  # 每批处理1000条
+        # 整列清洗：列名映射、去除首尾空白、空值转为空字符串，跳过空条码和字段超长的行
+        df = normalize_frame(df, ['barcode', *SOURCE_FIELDS])
+        df, empty_barcode_count = drop_empty_barcodes(df)
+        df, errors = split_too_long(df)
+        error_count = len(errors)
+        for error in errors[:5]:  # 只显示前5个错误
+            print(f"{error}，已跳过")
+        records = to_records(df, fill='')
         
         # 使用tqdm显示进度条
-        for index, row in tqdm(df.iterrows(), total=total_rows, desc="处理进度"):
-            try:
-                # 获取数据
-                barcode = str(row['条码']).strip() if pd.notna(row['条码']) else ''
-                model = str(row['型号']).strip() if pd.notna(row['型号']) else ''
-                location = str(row['位置']).strip() if pd.notna(row['位置']) else ''
-                scan_person = str(row['扫描人员']).strip() if pd.notna(row['扫描人员']) else ''
-                time_str = str(row['时间']).strip() if pd.notna(row['时间']) else ''
-                remark = str(row['备注']).strip() if pd.notna(row['备注']) else ''
-                
-                # 跳过空条码的记录
-                if not barcode:
-                    empty_barcode_count += 1
-                    continue
-                
-                # 处理时间字段 - 保持原始字符串格式
-                scan_time = time_str if time_str else ''
-                
-                # 添加到批量数据
-                batch_data.append({
-                    'barcode': barcode,
-                    'model': model,
-                    'location': location,
-                    'scanner': scan_person,
-                    'scan_time': scan_time,
-                    'remarks': remark
-                })
-                
-                # 当批次达到指定大小时，处理该批次
-                if len(batch_data) >= batch_size:
-                    processed_count = process_batch(batch_data)
-                    success_count += processed_count
-                    batch_data = []  # 清空批次数据
-                
-            except Exception as e:
-                error_count += 1
-                if error_count <= 5:  # 只显示前5个错误
-                    print(f"处理第 {index + 1} 行时出错: {e}")
-                continue
+        if sync is not None:
+            for row_data in tqdm(records, desc="处理进度"):
+                sync.add(row_data)
+        else:
+            batch_size = 1000  # 每批处理1000条
+            for start in tqdm(range(0, len(records), batch_size), desc="处理进度"):
+                success_count += process_batch(records[start:start + batch_size], batch)
         
-        # 处理剩余的批次数据
-        if batch_data:
-            processed_count = process_batch(batch_data)
-            success_count += processed_count
-        
-        # 步骤4：统计结果
-        print(f"\n步骤4：导入完成！")
+        # 步骤3：统计结果
+        print(f"\n步骤3：导入完成！")
         print("=" * 50)
         print(f"总处理行数: {total_rows}")
-        print(f"成功导入: {success_count}")
+        if sync is not None:
+            stats = sync.finish()
+            success_count = stats['inserted'] + stats['updated']
+            print(f"新增: {stats['inserted']}")
+            print(f"更新: {stats['updated']}")
+            print(f"无变化: {stats['unchanged']}")
+            print(f"文件内重复条码: {stats['duplicates']}")
+            print(f"已删除（文件中已不存在）: {stats['deleted']}")
+            print(f"已归档（文件中已不存在）: {stats['archived']}")
+        else:
+            print(f"成功导入: {success_count}")
         print(f"空条码跳过: {empty_barcode_count}")
         print(f"错误跳过: {error_count}")
-        print(f"成功率: {(success_count/total_rows)*100:.1f}%")
+        if total_rows and sync is None:
+            print(f"成功率: {(success_count/total_rows)*100:.1f}%")
         
         # 验证导入结果
         final_count = BarcodeSummary.objects.count()
@@ -169,10 +144,18 @@ def import_barcode_data():
         return False
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='导入条码汇总数据')
+    parser.add_argument('excel_file', nargs='?', default='/home/007101/Asset/data/条码汇总.xlsx', help='Excel文件路径')
+    parser.add_argument('--reload', action='store_true', help='先清空现有数据再全部重新导入（会丢失处理结果）')
+    parser.add_argument('--missing', choices=MISSING_POLICIES, default=MISSING_KEEP,
+                        help='文件中已不存在的条码：keep 保留，delete 删除，archive 标记归档')
+    parser.add_argument('--batch', default='', help='盘点批次，只与该批次的数据比对（默认为历史数据的空批次）')
+    args = parser.parse_args()
+    
     print("开始导入条码汇总数据...")
     print("=" * 60)
     
-    success = import_barcode_data()
+    success = import_barcode_data(args.excel_file, reload=args.reload, missing=args.missing, batch=args.batch)
     
     if success:
         print("\n✅ 数据导入成功完成！")
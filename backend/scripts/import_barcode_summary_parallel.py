@@ -2,19 +2,32 @@
 """
 脚本功能：将条码汇总.xlsx数据并行导入到BarcodeSummary模型中（高性能版）
 特点：
-- 多进程并行处理
-- 批量数据库操作
-- 进度条显示
-- 错误处理和重试机制
+- 流水线处理：多个读取进程并行解析工作簿 → 多个转换进程并行转换、校验 → 主进程单一写入
+- 各工作表按行区间划分为读取任务，每个读取进程以只读模式打开工作簿，跳过区间之前的行（不解析单元格）后只解析本区间；
+  写入端按 (任务序号, 块序号) 恢复文件顺序，提前到达的块超过内存上限时暂存到临时文件
+- 只有主进程访问数据库，按大事务提交，不会出现多个进程争用SQLite写锁（database is locked）
+- 各阶段之间使用有界队列，写入跟不上时上游自动等待，内存占用不随文件大小增长
+- 默认按条码与同一批次的已有数据比对同步，只写入变化的行；--reload 时先清空现有数据
+- 断点续传：写入端按文件顺序提交，每次提交同时记录断点（ImportRun）；中途退出后再次导入同一文件时，
+  断点之前的块仍会解析（用于文件内去重和缺失数据判断），但不再写入数据库，也不会再次清空数据
+- 结束后输出各阶段的吞吐量，便于判断瓶颈
+使用方法: python import_barcode_summary_parallel.py [excel文件路径] [--reload] [--missing keep|delete|archive]
+                                                  [--readers N] [--workers N] [--chunk-rows 2000] [--commit-rows 20000]
+                                                  [--restart]
 """
 
 import os
 import sys
+import math
+import time
+import queue
+import pickle
+import shutil
+import argparse
+import tempfile
 import django
-import pandas as pd
 import multiprocessing as mp
 from pathlib import Path
-from concurrent.futures import ProcessPoolExecutor, as_completed
 from tqdm import tqdm
 import logging
 
@@ -24,185 +37,395 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'asset.settings')
 sys.path.append(str(project_path))
 django.setup()
 
+from django.db import transaction
 from asset_code.models import BarcodeSummary
+from asset_code.importers import open_workbook, find_header, iter_row_range, normalize_row, validate_row
+from asset_code.import_runs import start_run, save_checkpoint, finish_run
+from asset_code.sync import BarcodeSummarySync, MISSING_KEEP, MISSING_POLICIES
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def process_chunk(chunk_data):
-    """处理数据块"""
-    barcode_objects = []
-    empty_count = 0
-    error_count = 0
-    
-    for row_data in chunk_data:
-        try:
-            barcode = row_data.get('barcode', '').strip()
-            if not barcode:
+# 队列消息类型
+MSG_ROWS = 'rows'
+MSG_DONE = 'done'
+
+# 运行记录中的脚本名
+SCRIPT_NAME = 'import_barcode_summary_parallel'
+
+# 写入端在内存中最多暂存的乱序块数，超出的块写入临时文件
+REORDER_MEMORY_CHUNKS = 20
+
+def plan_read_tasks(excel_file, chunk_rows, num_readers):
+    """把各工作表的数据行划分为读取任务，返回 (任务列表, 估算总行数, 警告)
+
+    任务为 (工作表序号, 工作表名, 字段列, 起始行, 结束行)，每个约为总行数的 1/num_readers，工作表的最后一个任务读到表尾。
+    区间从表头下一行起按 chunk_rows 的整数倍划分，块的划分与读取进程数无关，续传时与首次运行一致。
+    """
+    workbook = open_workbook(excel_file)
+    try:
+        sheets = []
+        warnings = []
+        for index, sheet in enumerate(workbook.worksheets):
+            header_row, columns = find_header(sheet)
+            if header_row is None:
+                continue
+            if columns is None:
+                warnings.append(f'工作表「{sheet.title}」缺少条码列，已跳过')
+                continue
+            sheets.append((index, sheet.title, columns, header_row + 1, sheet.max_row))
+    finally:
+        workbook.close()
+
+    estimated = sum(max((max_row or 0) - first_row + 1, 0) for *_, first_row, max_row in sheets)
+    range_rows = max(math.ceil(estimated / num_readers / chunk_rows), 1) * chunk_rows
+    tasks = []
+    for index, title, columns, first_row, max_row in sheets:
+        start = first_row
+        # 没有记录数据范围的工作表不拆分
+        while max_row is not None and start + range_rows <= max_row:
+            tasks.append((index, title, columns, start, start + range_rows - 1))
+            start += range_rows
+        tasks.append((index, title, columns, start, None))
+    return tasks, estimated, warnings
+
+class ReorderBuffer:
+    """按块编号恢复顺序的缓冲区；内存中超过 max_memory 块时，之后到达的块暂存到临时文件"""
+
+    def __init__(self, max_memory):
+        self.max_memory = max_memory
+        self.memory = {}
+        self.spilled = {}
+        self.spill_dir = None
+
+    def put(self, key, item):
+        if len(self.memory) < self.max_memory:
+            self.memory[key] = item
+            return
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix='asset_import_')
+        path = os.path.join(self.spill_dir, f'{key[0]}-{key[1]}.pkl')
+        with open(path, 'wb') as f:
+            pickle.dump(item, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.spilled[key] = path
+
+    def pop(self, key):
+        """取出并删除指定编号的块，尚未到达时返回None"""
+        if key in self.memory:
+            return self.memory.pop(key)
+        path = self.spilled.pop(key, None)
+        if path is None:
+            return None
+        with open(path, 'rb') as f:
+            item = pickle.load(f)
+        os.remove(path)
+        return item
+
+    def close(self):
+        if self.spill_dir is not None:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+def read_workbook(excel_file, task_queue, raw_queue, out_queue, readers_left, num_workers, chunk_rows):
+    """读取进程：依次领取读取任务，解析区间内的行，按 (任务序号, 块序号) 放入原始行队列
+
+    每个任务的最后一块带结束标记（可能为空块），写入端据此转到下一个任务。最后一个结束的读取进程
+    给每个转换进程发送结束标记。统计的耗时不含队列已满时的等待时间。
+    """
+    start = time.perf_counter()
+    blocked = 0.0
+    total = 0
+
+    def put(item):
+        nonlocal blocked
+        put_start = time.perf_counter()
+        raw_queue.put(item)
+        blocked += time.perf_counter() - put_start
+
+    workbook = open_workbook(excel_file)
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            task_index, (sheet_index, sheet, columns, min_row, max_row) = task
+            chunk = []
+            chunk_index = 0
+            for row_number, row in iter_row_range(workbook.worksheets[sheet_index], min_row, max_row):
+                chunk.append((row_number, row))
+                if len(chunk) >= chunk_rows:
+                    put(((task_index, chunk_index), False, sheet, columns, chunk))
+                    total += len(chunk)
+                    chunk_index += 1
+                    chunk = []
+            put(((task_index, chunk_index), True, sheet, columns, chunk))
+            total += len(chunk)
+    finally:
+        workbook.close()
+        with readers_left.get_lock():
+            readers_left.value -= 1
+            last = readers_left.value == 0
+        if last:
+            for _ in range(num_workers):
+                raw_queue.put(None)
+    seconds = time.perf_counter() - start - blocked
+    out_queue.put((MSG_DONE, 'read', {'rows': total, 'seconds': seconds}))
+
+def normalize_worker(raw_queue, out_queue):
+    """转换进程：把原始行转换为字段字典并校验；不访问数据库"""
+    busy = 0.0
+    total = 0
+    while True:
+        task = raw_queue.get()
+        if task is None:
+            break
+        start = time.perf_counter()
+        seq, last, sheet, columns, rows = task
+        result = []
+        empty_count = 0
+        errors = []
+        for row_number, row in rows:
+            data = normalize_row(row, columns)
+            if data is None:
+                continue
+            if not data.get('barcode'):
                 empty_count += 1
                 continue
-            
-            barcode_summary = BarcodeSummary(
-                barcode=barcode,
-                model=row_data.get('model', ''),
-                location=row_data.get('location', ''),
-                scanner=row_data.get('scanner', ''),
-                scan_time=row_data.get('scan_time', ''),
-                remarks=row_data.get('remarks', ''),
-                asset_type=''
-            )
-            barcode_objects.append(barcode_summary)
-            
-        except Exception as e:
-            error_count += 1
-            logger.error(f"处理数据时出错: {e}")
-            continue
-    
-    # 批量保存
-    if barcode_objects:
+            error = validate_row(data)
+            if error:
+                errors.append(f'工作表「{sheet}」第 {row_number} 行: {error}')
+                continue
+            result.append(data)
+        total += len(rows)
+        busy += time.perf_counter() - start
+        out_queue.put((MSG_ROWS, seq, last, len(rows), result, empty_count, errors))
+    out_queue.put((MSG_DONE, 'normalize', {'rows': total, 'seconds': busy}))
+
+def wait_message(out_queue, processes):
+    """从结果队列取消息；上游进程异常退出时报错，而不是一直等待"""
+    while True:
         try:
-            BarcodeSummary.objects.bulk_create(barcode_objects, batch_size=1000, ignore_conflicts=True)
-            return len(barcode_objects), empty_count, error_count
-        except Exception as e:
-            logger.error(f"批量保存时出错: {e}")
-            return 0, empty_count, error_count + len(barcode_objects)
-    
-    return 0, empty_count, error_count
-
-def prepare_data(df):
-    """准备数据，转换为字典列表"""
-    logger.info("准备数据...")
-    data_list = []
-    
-    for _, row in df.iterrows():
-        data_list.append({
-            'barcode': str(row['条码']).strip() if pd.notna(row['条码']) else '',
-            'model': str(row['型号']).strip() if pd.notna(row['型号']) else '',
-            'location': str(row['位置']).strip() if pd.notna(row['位置']) else '',
-            'scanner': str(row['扫描人员']).strip() if pd.notna(row['扫描人员']) else '',
-            'scan_time': str(row['时间']).strip() if pd.notna(row['时间']) else '',
-            'remarks': str(row['备注']).strip() if pd.notna(row['备注']) else ''
-        })
-    
-    return data_list
-
-def split_data(data_list, num_workers):
-    """将数据分割成多个块"""
-    chunk_size = len(data_list) // num_workers
-    chunks = []
-    
-    for i in range(num_workers):
-        start_idx = i * chunk_size
-        if i == num_workers - 1:  # 最后一块包含剩余所有数据
-            end_idx = len(data_list)
-        else:
-            end_idx = (i + 1) * chunk_size
-        chunks.append(data_list[start_idx:end_idx])
-    
-    return chunks
-
-def import_barcode_data_parallel():
-    """并行导入条码汇总数据"""
-    
-    # Excel文件路径
-    excel_file = '/home/007101/Asset/data/条码汇总.xlsx'
-    
+            return out_queue.get(timeout=1)
+        except queue.Empty:
+            failed = [p.name for p in processes if p.exitcode not in (None, 0)]
+            if failed:
+                raise RuntimeError(f"进程异常退出: {', '.join(failed)}")
+
+def run_pipeline(excel_file, batch, missing, num_readers, num_workers, chunk_rows, commit_rows, run):
+    """运行流水线，返回 (同步统计, 各阶段统计)
+
+    读取和转换进程完成的顺序不固定，写入端按 (任务序号, 块序号) 恢复文件顺序后写入：文件内重复条码总是保留第一行，
+    且每次提交时已写入的正好是文件开头的连续若干块，断点记录为这些块的原始行数。
+    """
+    tasks, estimated, warnings = plan_read_tasks(excel_file, chunk_rows, num_readers)
+    num_readers = max(min(num_readers, len(tasks)), 1)
+
+    # 任务按文件顺序领取；有界队列：写入是瓶颈时，读取和转换进程在队列满时等待
+    task_queue = mp.Queue()
+    for task in enumerate(tasks):
+        task_queue.put(task)
+    for _ in range(num_readers):
+        task_queue.put(None)
+    raw_queue = mp.Queue(maxsize=num_workers * 2)
+    out_queue = mp.Queue(maxsize=num_workers * 2)
+    readers_left = mp.Value('i', num_readers)
+    # fork 出的子进程不能使用主进程的数据库连接，子进程也不访问数据库
+    processes = [mp.Process(target=read_workbook, name=f'read-{i}',
+                            args=(excel_file, task_queue, raw_queue, out_queue, readers_left, num_workers, chunk_rows))
+                 for i in range(num_readers)]
+    processes += [mp.Process(target=normalize_worker, name=f'normalize-{i}', args=(raw_queue, out_queue))
+                  for i in range(num_workers)]
+
+    # 写入端每累积 commit_rows 行在块边界比对并提交一次，同时记录断点；续传时统计从断点累计
+    sync = BarcodeSummarySync(batch, missing=missing, chunk_size=commit_rows, autoflush=False)
+    sync.stats.update({key: value for key, value in run.stats.items() if key in sync.stats})
+    empty_count = run.stats.get('empty', 0)
+    error_count = run.stats.get('error_count', 0)
+    errors = list(run.errors)
+    new_errors = []
+    consumed = 0  # 已按顺序处理的原始行数
+    buffered = ReorderBuffer(REORDER_MEMORY_CHUNKS)
+    next_seq = (0, 0)
+
+    def commit():
+        nonlocal new_errors
+        with transaction.atomic():
+            sync.flush()
+            save_checkpoint(run, consumed, {**sync.stats, 'empty': empty_count, 'error_count': error_count},
+                            new_errors)
+        new_errors = []
+
+    stages = {}
+    write_seconds = 0.0
+    start = time.perf_counter()
+    for p in processes:
+        p.start()
+    try:
+        pending_done = len(processes)
+        with tqdm(total=estimated, desc="导入进度") as progress:
+            while pending_done:
+                message = wait_message(out_queue, processes)
+                if message[0] == MSG_DONE:
+                    _, stage, stats = message
+                    if stage in stages:
+                        stages[stage]['rows'] += stats['rows']
+                        stages[stage]['seconds'] += stats['seconds']
+                        stages[stage]['workers'] += 1
+                    else:
+                        stages[stage] = {**stats, 'workers': 1}
+                    pending_done -= 1
+                    continue
+                _, seq, *result = message
+                buffered.put(seq, result)
+                write_start = time.perf_counter()
+                while True:
+                    result = buffered.pop(next_seq)
+                    if result is None:
+                        break
+                    last, row_count, rows, empty, row_errors = result
+                    next_seq = (next_seq[0] + 1, 0) if last else (next_seq[0], next_seq[1] + 1)
+                    consumed += row_count
+                    if consumed <= run.rows_committed:
+                        # 断点之前已提交的块
+                        sync.mark_seen(data['barcode'] for data in rows)
+                    else:
+                        empty_count += empty
+                        error_count += len(row_errors)
+                        errors.extend(row_errors)
+                        new_errors.extend(row_errors)
+                        for data in rows:
+                            sync.add(data)
+                        if len(sync.pending) >= commit_rows:
+                            commit()
+                    progress.update(row_count)
+                write_seconds += time.perf_counter() - write_start
+        write_start = time.perf_counter()
+        if consumed > run.rows_committed:
+            commit()
+        stats = sync.finish()
+        write_seconds += time.perf_counter() - write_start
+    finally:
+        for p in processes:
+            if p.is_alive():
+                p.terminate()
+            p.join()
+        buffered.close()
+
+    stages['write'] = {'rows': stats['inserted'] + stats['updated'] + stats['unchanged'] + stats['duplicates'],
+                       'seconds': write_seconds, 'workers': 1}
+    stages['total'] = {'rows': stages['read']['rows'], 'seconds': time.perf_counter() - start, 'workers': 1}
+    stats['empty'] = empty_count
+    stats['error_count'] = error_count + len(warnings)
+    stats['errors'] = warnings + errors
+    return stats, stages
+
+def print_stages(stages):
+    """输出各阶段吞吐量（不含等待上下游的时间）；读取和转换阶段按各进程忙碌时间之和计算单进程速度
+
+    写入端只有一个，端到端速度接近写入速度时，增加读取或转换进程不再提速。读取进程跳过区间之前的行也要耗时，
+    区间越靠后的进程越慢，读取进程的合计速度低于单进程速度乘以进程数。
+    """
+    print("\n各阶段吞吐量:")
+    labels = {'read': '读取解析', 'normalize': '转换校验', 'write': '写入数据库', 'total': '端到端'}
+    for stage in ('read', 'normalize', 'write', 'total'):
+        item = stages[stage]
+        rate = item['rows'] / item['seconds'] if item['seconds'] else 0
+        line = f"  {labels[stage]}: {item['rows']} 行，{item['seconds']:.2f}s，{rate:,.0f} 行/秒"
+        if stage in ('read', 'normalize'):
+            line += f"（单进程，共 {item['workers']} 个进程，合计约 {rate * item['workers']:,.0f} 行/秒）"
+        print(line)
+
+def import_barcode_data_parallel(excel_file, reload=False, missing=MISSING_KEEP, num_readers=None, num_workers=None,
+                                 chunk_rows=2000, commit_rows=20000, restart=False):
+    """并行导入条码汇总数据；同一文件有未完成的导入时从断点继续（restart 时从头导入）"""
+
     # 检查文件是否存在
     if not os.path.exists(excel_file):
         logger.error(f"错误：Excel文件不存在: {excel_file}")
         return False
-    
+
+    # 以文件名作为盘点批次，与该批次的已有数据比对；与其他导入方式一样截断到批次字段长度
+    batch = Path(excel_file).stem[:100]
+    run, resumed = start_run(SCRIPT_NAME, excel_file, batch,
+                             {'reload': reload, 'missing': missing, 'chunk_rows': chunk_rows}, restart=restart)
+    if resumed:
+        # 沿用首次运行的参数，块的划分必须一致
+        reload, missing, chunk_rows = run.options['reload'], run.options['missing'], run.options['chunk_rows']
+        logger.info(f"从断点继续导入（运行记录 {run.id}）：已提交 {run.chunks_committed} 次，"
+                    f"前 {run.rows_committed} 行不再写入；从头导入请加 --restart")
+
     try:
-        # 步骤1：清空现有数据
-        logger.info("步骤1：清空现有数据...")
+        # 步骤1：清空现有数据（仅 --reload）；清空与记录已清空在同一事务中，续传时不会再次清空
         current_count = BarcodeSummary.objects.count()
         logger.info(f"当前数据库中有 {current_count} 条记录")
-        
-        # 清空数据
-        BarcodeSummary.objects.all().delete()
-        logger.info("✓ 数据已清空")
-        
-        # 步骤2：读取Excel文件
-        logger.info("步骤2：读取Excel文件...")
-        df = pd.read_excel(excel_file)
-        logger.info(f"Excel文件读取成功，共 {len(df)} 行数据")
-        
-        # 步骤3：准备数据
-        logger.info("步骤3：准备数据...")
-        data_list = prepare_data(df)
-        
-        # 步骤4：并行处理数据
-        logger.info("步骤4：并行处理数据...")
-        
-        # 获取CPU核心数
-        num_workers = min(mp.cpu_count(), 8)  # 最多使用8个进程
-        logger.info(f"使用 {num_workers} 个进程并行处理")
-        
-        # 分割数据
-        chunks = split_data(data_list, num_workers)
-        logger.info(f"数据已分割为 {len(chunks)} 个块")
-        
-        # 统计信息
-        total_success = 0
-        total_empty = 0
-        total_error = 0
-        
-        # 并行处理
-        with ProcessPoolExecutor(max_workers=num_workers) as executor:
-            # 提交任务
-            futures = [executor.submit(process_chunk, chunk) for chunk in chunks]
-            
-            # 使用tqdm显示进度
-            for future in tqdm(as_completed(futures), total=len(futures), desc="并行处理进度"):
-                success_count, empty_count, error_count = future.result()
-                total_success += success_count
-                total_empty += empty_count
-                total_error += error_count
-        
-        # 步骤5：统计结果
-        logger.info("步骤5：导入完成！")
+        if reload and not run.options.get('reloaded'):
+            logger.info("步骤1：清空现有数据...")
+            with transaction.atomic():
+                BarcodeSummary.objects.all().delete()
+                run.options['reloaded'] = True
+                run.save(update_fields=['options'])
+            logger.info("✓ 数据已清空")
+
+        # 步骤2：流水线导入
+        if num_readers is None:
+            # 解析是最慢的阶段，约一半核心用于读取
+            num_readers = max(min(mp.cpu_count() // 2, 4), 1)
+        if num_workers is None:
+            # 主进程占一个核心，其余用于转换
+            num_workers = max(min(mp.cpu_count() - num_readers - 1, 8), 1)
+        logger.info(f"步骤2：流水线导入（最多 {num_readers} 个读取进程，{num_workers} 个转换进程，1 个写入）...")
+        stats, stages = run_pipeline(excel_file, batch, missing, num_readers, num_workers, chunk_rows, commit_rows, run)
+        finish_run(run, {key: value for key, value in stats.items() if key != 'errors'})
+
+        # 步骤3：统计结果
+        logger.info("步骤3：导入完成！")
         print("=" * 60)
-        print(f"总处理行数: {len(data_list)}")
-        print(f"成功导入: {total_success}")
-        print(f"空条码跳过: {total_empty}")
-        print(f"错误跳过: {total_error}")
-        print(f"成功率: {(total_success/len(data_list))*100:.1f}%")
-        
-        # 验证导入结果
-        final_count = BarcodeSummary.objects.count()
-        print(f"\n数据库验证:")
-        print(f"当前数据库中有 {final_count} 条记录")
-        
-        # 显示一些统计信息
-        print(f"\n数据统计:")
-        print(f"有型号的记录: {BarcodeSummary.objects.exclude(model='').count()}")
-        print(f"有位置的记录: {BarcodeSummary.objects.exclude(location='').count()}")
-        print(f"有扫描人员的记录: {BarcodeSummary.objects.exclude(scanner='').count()}")
-        
-        # 显示一些示例数据
-        print(f"\n示例数据（前5条）:")
-        samples = BarcodeSummary.objects.all()[:5]
-        for i, record in enumerate(samples, 1):
-            print(f"{i}. barcode: {record.barcode}, model: {record.model}, location: {record.location}")
-        
+        print(f"总处理行数: {stages['read']['rows']}")
+        print(f"新增: {stats['inserted']}")
+        print(f"更新: {stats['updated']}")
+        print(f"无变化: {stats['unchanged']}")
+        print(f"空条码跳过: {stats['empty']}")
+        print(f"文件内重复条码: {stats['duplicates']}")
+        print(f"已删除（文件中已不存在）: {stats['deleted']}")
+        print(f"已归档（文件中已不存在）: {stats['archived']}")
+        print(f"错误跳过: {stats['error_count']}")
+        for error in stats['errors'][:20]:
+            print(f"  {error}")
+        print_stages(stages)
+        print(f"\n当前数据库中有 {BarcodeSummary.objects.count()} 条记录")
+
         return True
-        
+
     except Exception as e:
-        logger.error(f"导入过程出错: {e}")
+        finish_run(run, error=str(e))
+        logger.error(f"导入过程出错: {e}（已提交的部分已记录断点，再次运行将继续导入）")
         import traceback
         traceback.print_exc()
         return False
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='并行导入条码汇总数据')
+    parser.add_argument('excel_file', nargs='?', default='/home/007101/Asset/data/条码汇总.xlsx', help='Excel文件路径')
+    parser.add_argument('--reload', action='store_true', help='先清空现有数据再全量导入（会丢失处理结果）')
+    parser.add_argument('--missing', choices=MISSING_POLICIES, default=MISSING_KEEP,
+                        help='本批次中文件里已不存在的条码：keep 保留，delete 删除，archive 标记归档')
+    parser.add_argument('--readers', type=int, default=None, help='读取进程数（默认CPU核心数的一半，最多4个）')
+    parser.add_argument('--workers', type=int, default=None, help='转换进程数（默认按CPU核心数，最多8个）')
+    parser.add_argument('--chunk-rows', type=int, default=2000, help='读取进程每块发送的行数')
+    parser.add_argument('--commit-rows', type=int, default=20000, help='写入端每个事务提交的行数')
+    parser.add_argument('--restart', action='store_true', help='忽略未完成导入的断点，从头导入')
+    args = parser.parse_args()
+
     print("开始并行导入条码汇总数据...")
     print("=" * 60)
-    
-    success = import_barcode_data_parallel()
-    
+
+    success = import_barcode_data_parallel(args.excel_file, reload=args.reload, missing=args.missing,
+                                           num_readers=args.readers, num_workers=args.workers, chunk_rows=args.chunk_rows,
+                                           commit_rows=args.commit_rows, restart=args.restart)
+
     if success:
         print("\n✅ 数据并行导入成功完成！")
     else:
         print("\n❌ 数据并行导入失败！")
-    
-    print("=" * 60)
\ No newline at end of file
+
+    print("=" * 60)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+实时推送（SSE）负载测试
+在本进程内启动 uvicorn 提供 asset.asgi，建立大量空闲订阅连接，统计：
+- 建立连接耗时、空闲期间的CPU占用和内存增长
+- 每次写入后所有订阅者收到事件的延迟
+- 连接断开后订阅者是否全部释放
+使用方法: python loadtest_live.py [--clients 500] [--writes 10] [--idle 10]
+数据写入临时SQLite数据库，不影响正式数据
+"""
+
+import json
+import time
+import socket
+import asyncio
+import argparse
+import threading
+import statistics
+from urllib.parse import urlencode
+
+from benchmark_common import setup_django, seed_barcode_summaries, current_rss_mb
+
+
+class SseClient:
+    """基于原始socket的最小SSE客户端，记录每个变更序号的到达时间"""
+
+    def __init__(self, port, cookie, query):
+        self.port = port
+        self.cookie = cookie
+        self.query = query
+        self.received = {}
+        self.writer = None
+
+    async def connect(self):
+        reader, self.writer = await asyncio.open_connection('127.0.0.1', self.port)
+        # 使用HTTP/1.0，响应体不分块，直接按SSE文本解析
+        self.writer.write((
+            f'GET /api/asset-code/live/?{self.query} HTTP/1.0\r\n'
+            f'Host: 127.0.0.1\r\nAccept: text/event-stream\r\nCookie: sessionid={self.cookie}\r\n\r\n'
+        ).encode('ascii'))
+        await self.writer.drain()
+        status_line = await reader.readline()
+        assert b' 200 ' in status_line, status_line
+        while (await reader.readline()) not in (b'\r\n', b''):
+            pass
+        return reader
+
+    async def listen(self, reader):
+        event = {}
+        async for line in reader:
+            line = line.decode('utf-8').rstrip('\n')
+            if not line:
+                if event.get('event') == 'change':
+                    data = json.loads(event['data'])
+                    self.received[data['seq']] = (time.perf_counter(), data['op'])
+                event = {}
+            elif not line.startswith(':'):
+                name, _, value = line.partition(': ')
+                event[name] = value
+
+    def close(self):
+        self.writer.close()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+async def run(args, cookie, record_ids):
+    import uvicorn
+    from asgiref.sync import sync_to_async
+    from asset.asgi import application
+    from asset_code.live import broker
+    from asset_code.models import BarcodeSummary, BarcodeSummaryChange
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(application, host='127.0.0.1', port=port,
+                                           log_level='warning', lifespan='off'))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    # 一半连接订阅全部数据，一半按使用人筛选
+    rss_before = current_rss_mb()
+    start = time.perf_counter()
+    filtered = urlencode({'user': '用户1'})
+    clients = [SseClient(port, cookie, 'fields=barcode,result' if i % 2 else filtered)
+               for i in range(args.clients)]
+    readers = await asyncio.gather(*(client.connect() for client in clients))
+    listeners = [asyncio.create_task(client.listen(reader)) for client, reader in zip(clients, readers)]
+    connect_seconds = time.perf_counter() - start
+    while len(broker.subscribers) < args.clients:
+        await asyncio.sleep(0.05)
+
+    cpu_start = time.process_time()
+    await asyncio.sleep(args.idle)
+    idle_cpu = (time.process_time() - cpu_start) / args.idle * 100
+    rss_idle = current_rss_mb()
+    threads = threading.active_count()
+
+    latencies = []
+    for record_id in record_ids[:args.writes]:
+        written = time.perf_counter()
+        await sync_to_async(BarcodeSummary.objects.filter(id=record_id).update)(result_remarks=f'负载测试{written}')
+        seq = await sync_to_async(
+            lambda: BarcodeSummaryChange.objects.get(record_id=record_id).change_seq)()
+        while not all(seq in client.received for client in clients):
+            await asyncio.sleep(0.01)
+        latencies.append(max(client.received[seq][0] for client in clients) - written)
+
+    for client in clients:
+        client.close()
+    deadline = time.perf_counter() + 10
+    while broker.subscribers and time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+    remaining = len(broker.subscribers)
+    for listener in listeners:
+        listener.cancel()
+    server.should_exit = True
+    await server_task
+
+    print("=" * 60)
+    print(f"订阅连接数: {args.clients}")
+    print(f"建立连接耗时: {connect_seconds:.2f}s")
+    print(f"空闲内存增长: {rss_idle - rss_before:.1f} MB（约 {(rss_idle - rss_before) * 1024 / args.clients:.1f} KB/连接）")
+    print(f"进程线程数: {threads}（Django中间件的同步适配会为每个请求保留一个线程）")
+    print(f"空闲CPU占用: {idle_cpu:.1f}%（{args.idle}s 内平均）")
+    print(f"写入到全部订阅者收到的延迟: 中位数 {statistics.median(latencies) * 1000:.0f} ms，"
+          f"最大 {max(latencies) * 1000:.0f} ms（{len(latencies)} 次写入）")
+    print(f"断开后残留订阅者: {remaining}")
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='实时推送负载测试')
+    parser.add_argument('--clients', type=int, default=500, help='订阅连接数')
+    parser.add_argument('--writes', type=int, default=10, help='写入次数')
+    parser.add_argument('--idle', type=float, default=10, help='空闲观察时长（秒）')
+    args = parser.parse_args()
+
+    db_path = setup_django()
+    print(f"临时数据库: {db_path}")
+
+    from django.contrib.auth.models import User
+    from django.test import Client
+    from asset_code.models import BarcodeSummary
+
+    seed_barcode_summaries(1000)
+    user = User.objects.create(username='loadtest')
+    client = Client()
+    client.force_login(user, backend='django.contrib.auth.backends.ModelBackend')
+    record_ids = list(BarcodeSummary.objects.order_by('id').values_list('id', flat=True)[:args.writes])
+
+    asyncio.run(run(args, client.cookies['sessionid'].value, record_ids))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+导入脚本公共的数据清洗（pandas 向量化）
+- 列名去除首尾空白后按别名映射到模型字段，别名与上传导入接口一致（asset_code.importers.COLUMN_ALIASES）
+- 单元格统一转换为去除首尾空白的字符串，空值、空字符串转换为 None
+- 日期时间格式为 %Y-%m-%d %H:%M:%S；整数值的数值列去掉 .0，条码列中被存为数值的条码同样处理
+- 整列运算，不逐行调用 Python 代码；输出可直接写入数据库的字典或元组
+需在 django.setup() 之后导入
+"""
+
+import pandas as pd
+
+from asset_code.importers import COLUMN_ALIASES, DATETIME_FORMAT, FIELD_LABELS, FIELD_MAX_LENGTHS
+
+
+def normalize_columns(df, aliases=COLUMN_ALIASES):
+    """列名去除首尾空白并按别名映射；多个列映射到同一字段时保留第一列"""
+    df = df.rename(columns=lambda name: str(name).strip())
+    df = df.rename(columns=aliases)
+    return df.loc[:, ~df.columns.duplicated()]
+
+
+def clean_column(series):
+    """转换为去除首尾空白的字符串列，空值和空字符串为 NA"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        text = series.dt.strftime(DATETIME_FORMAT).astype('string')
+    elif pd.api.types.is_float_dtype(series):
+        # 整数值（如被Excel存为数值的条码）去掉 .0
+        whole = series.notna() & (series % 1 == 0) & (series.abs() < 2 ** 63)
+        text = series.astype('string')
+        text[whole] = series[whole].astype('int64').astype('string')
+    else:
+        text = series.astype('string')
+    text = text.str.strip()
+    return text.mask(text == '')
+
+
+def canonicalize_barcodes(series):
+    """条码列：混合类型列中被存为数值的条码转换为字符串后会带 .0，统一去掉"""
+    return series.str.replace(r'^(\d+)\.0$', r'\1', regex=True)
+
+
+def normalize_frame(df, fields, aliases=COLUMN_ALIASES, barcode_fields=('barcode',)):
+    """映射列名并清洗，返回只包含 fields 的 DataFrame（文件中没有的字段为 NA）
+
+    barcode_fields 中的字段按条码规则规范化（如资产数据中与条码匹配的资产编号）。
+    """
+    df = normalize_columns(df, aliases)
+    result = pd.DataFrame(index=df.index)
+    for field in fields:
+        result[field] = clean_column(df[field]) if field in df.columns else pd.Series(pd.NA, index=df.index, dtype='string')
+    for field in barcode_fields:
+        if field in result.columns:
+            result[field] = canonicalize_barcodes(result[field])
+    return result
+
+
+def drop_empty_barcodes(df):
+    """去掉条码为空的行，返回 (DataFrame, 去掉的行数)"""
+    empty = df['barcode'].isna()
+    return df[~empty], int(empty.sum())
+
+
+def split_too_long(df, row_offset=2):
+    """按模型字段长度校验，返回 (有效行, 错误说明列表)
+
+    错误说明中的行号为索引加 row_offset，默认对应 read_excel 读取时的Excel行号（表头为第1行）。
+    """
+    too_long = pd.Series(False, index=df.index)
+    messages = pd.Series('', index=df.index, dtype='string')
+    for field, max_length in FIELD_MAX_LENGTHS.items():
+        if field in df.columns:
+            over = (df[field].str.len() > max_length).fillna(False) & ~too_long
+            messages[over] = f'{FIELD_LABELS[field]}超过{max_length}个字符'
+            too_long |= over
+    errors = [f'第 {index + row_offset} 行: {message}' for index, message in messages[too_long].items()]
+    return df[~too_long], errors
+
+
+def to_records(df, fill=None):
+    """转换为字段字典列表，NA 转换为 fill（默认 None）"""
+    return df.astype(object).where(df.notna(), fill).to_dict('records')
+
+
+def to_tuples(df, fill=None):
+    """转换为元组列表，列顺序与 df 一致"""
+    return list(df.astype(object).where(df.notna(), fill).itertuples(index=False, name=None))
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+导入脚本公共的工作簿读取（带解析缓存）
+- read_excel() 与 pd.read_excel 用法相同，解析结果按 (文件内容哈希, 工作表, 读取参数) 缓存到 WORKBOOK_CACHE_DIR
+- 文件内容不变时直接读取缓存，不再用 openpyxl 解析；文件改动后哈希变化，自动重新解析
+- 缓存格式为 pandas pickle：按列块存储，读取很快，且完整保留 read_excel 的列类型
+  （条码列常为数值与文本混合的 object 列，parquet 需要统一类型，还依赖未安装的 pyarrow）
+- 缓存只由本机脚本写入和读取，不要把其他来源的文件放入缓存目录
+- 缓存目录超过 WORKBOOK_CACHE_MAX_BYTES 时按最近使用时间删除最旧的缓存
+需在 django.setup() 之后导入
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+from django.conf import settings
+
+from asset_code.files import file_hash, evict_directory
+
+logger = logging.getLogger(__name__)
+
+
+def cache_path(path, sheet_name, kwargs):
+    """缓存文件路径；读取参数不同（如 header、dtype）解析结果不同，一并计入键"""
+    key = json.dumps({'sheet': sheet_name, 'kwargs': kwargs}, sort_keys=True, default=str, ensure_ascii=False)
+    key_hash = hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+    return Path(settings.WORKBOOK_CACHE_DIR) / f'{file_hash(path)}-{key_hash}.pkl'
+
+
+def _save(df, target):
+    # 先写临时文件再重命名，并发运行的脚本不会读到写了一半的缓存
+    fd, temp_path = tempfile.mkstemp(dir=target.parent, suffix='.tmp')
+    os.close(fd)
+    try:
+        df.to_pickle(temp_path)
+        os.replace(temp_path, target)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def evict(max_bytes=None):
+    """缓存目录超过上限时，按最近使用时间从旧到新删除缓存，返回删除的文件数"""
+    if max_bytes is None:
+        max_bytes = settings.WORKBOOK_CACHE_MAX_BYTES
+    return evict_directory(settings.WORKBOOK_CACHE_DIR, max_bytes)
+
+
+def read_excel(path, sheet_name=0, use_cache=True, **kwargs):
+    """读取一个工作表，参数与 pd.read_excel 相同（sheet_name 须为工作表名或序号）"""
+    if not use_cache:
+        return pd.read_excel(path, sheet_name=sheet_name, **kwargs)
+    if sheet_name is None or isinstance(sheet_name, list):
+        raise ValueError('缓存读取每次只支持一个工作表')
+
+    target = cache_path(path, sheet_name, kwargs)
+    if target.exists():
+        try:
+            df = pd.read_pickle(target)
+            # 修改时间作为最近使用时间，供淘汰时排序
+            os.utime(target)
+            return df
+        except Exception:
+            # 缓存损坏或格式不兼容时重新解析
+            target.unlink(missing_ok=True)
+
+    df = pd.read_excel(path, sheet_name=sheet_name, **kwargs)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        _save(df, target)
+    except Exception as e:
+        # 缓存写入失败（如磁盘已满）只影响下次读取速度
+        logger.warning(f"工作簿缓存写入失败，已跳过: {e}")
+    else:
+        evict()
+    return df
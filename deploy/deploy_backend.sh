@@ -18,6 +18,22 @@ if [ -f "/home/007101/Asset/logs/backend.pid" ]; then
     fi
 fi
 
+if [ -f "/home/007101/Asset/logs/export_worker.pid" ]; then
+    OLD_PID=$(cat /home/007101/Asset/logs/export_worker.pid)
+    if ps -p $OLD_PID > /dev/null; then
+        echo "停止之前的导出worker进程: $OLD_PID" >> /home/007101/Asset/logs/backend_deploy.log
+        kill $OLD_PID
+    fi
+fi
+
+if [ -f "/home/007101/Asset/logs/live.pid" ]; then
+    OLD_PID=$(cat /home/007101/Asset/logs/live.pid)
+    if ps -p $OLD_PID > /dev/null; then
+        echo "停止之前的实时推送进程: $OLD_PID" >> /home/007101/Asset/logs/backend_deploy.log
+        kill $OLD_PID
+    fi
+fi
+
 # 启动后端服务
 echo "启动后端服务..." >> /home/007101/Asset/logs/backend_deploy.log
 nohup python manage.py runserver 0.0.0.0:8002 > /home/007101/Asset/logs/backend.log 2>&1 &
@@ -25,4 +41,19 @@ BACKEND_PID=$!
 echo $BACKEND_PID > /home/007101/Asset/logs/backend.pid
 
 echo "后端服务启动成功，PID: $BACKEND_PID，日志文件: /home/007101/Asset/logs/backend.log" >> /home/007101/Asset/logs/backend_deploy.log
+
+# 启动后台导出worker
+echo "启动导出worker..." >> /home/007101/Asset/logs/backend_deploy.log
+nohup python manage.py run_export_worker > /home/007101/Asset/logs/export_worker.log 2>&1 &
+WORKER_PID=$!
+echo $WORKER_PID > /home/007101/Asset/logs/export_worker.pid
+
+echo "导出worker启动成功，PID: $WORKER_PID，日志文件: /home/007101/Asset/logs/export_worker.log" >> /home/007101/Asset/logs/backend_deploy.log
+# 启动实时推送服务（SSE长连接由ASGI服务承载，前端代理 /api/asset-code/live/ 到此端口）
+echo "启动实时推送服务..." >> /home/007101/Asset/logs/backend_deploy.log
+nohup python -m uvicorn asset.asgi:application --host 0.0.0.0 --port 8004 > /home/007101/Asset/logs/live.log 2>&1 &
+LIVE_PID=$!
+echo $LIVE_PID > /home/007101/Asset/logs/live.pid
+
+echo "实时推送服务启动成功，PID: $LIVE_PID，日志文件: /home/007101/Asset/logs/live.log" >> /home/007101/Asset/logs/backend_deploy.log
 echo "后端部署完成！"
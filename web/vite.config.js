@@ -12,6 +12,11 @@ export default defineConfig(({ mode }) => {
       port: 3000,
       host: '0.0.0.0',
       proxy: {
+        // 实时推送由单独的ASGI服务提供，需放在通用API代理之前
+        [`${env.VITE_API_PREFIX || '/api'}/asset-code/live/`]: {
+          target: env.VITE_LIVE_BASE_URL || 'http://localhost:8004',
+          changeOrigin: true
+        },
         [env.VITE_API_PREFIX || '/api']: {
           target: env.VITE_API_BASE_URL || 'http://localhost:8002',
           changeOrigin: true